@@ -1,82 +1,145 @@
-import json
+import os
 import random
+import sys
 import time
 import uuid
-from locust import HttpUser, task, between, events
+from locust import task, between, events
+
+# Shared harness modules live next to the other locustfiles
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "locust"))
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, stats_complete
+from targets import FUNCTIONS_URL
+from clients import ScenarioUser
+from account_pool import load_default_pool
+from token_manager import TokenManager, token_manager
+from payload_pool import JSON_HEADERS, TIMESTAMP, PayloadPool
+from response_checks import auth_result
+from task_list import OK_STATUSES, TaskListFetcher
 
 # Constants
-FRONTEND_URL = "http://35.239.33.10"  # Your GKE deployed frontend URL
-AUTH_FUNCTION_URL = "https://us-central1-todo-cloud-app-20250521.cloudfunctions.net"  # Base URL for auth functions
-TASK_FUNCTION_URL = "https://us-central1-todo-cloud-app-20250521.cloudfunctions.net"  # Base URL for task functions
+AUTH_FUNCTION_URL = FUNCTIONS_URL  # Base URL for auth functions
+TASK_FUNCTION_URL = FUNCTIONS_URL  # Base URL for task functions
 
 # Names for signup
 FIRST_NAMES = ["Alex", "Jamie", "Taylor", "Jordan", "Casey", "Riley", "Morgan", "Avery", "Peyton", "Quinn", "Blake", "Dakota"]
 LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Wilson", "Anderson", "Taylor", "Thomas", "Garcia"]
 
+# Accounts created up front by locust/provision_accounts.py (ACCOUNT_POOL=path)
+account_pool = load_default_pool()
+
+# With a pool, auth traffic is its own explicit mix: relative task weights of
+# re-login and fresh-signup calls next to the task traffic below (weights 1-3)
+LOGIN_WEIGHT = int(os.environ.get("AUTH_LOGIN_WEIGHT", "0"))
+SIGNUP_WEIGHT = int(os.environ.get("AUTH_SIGNUP_WEIGHT", "0"))
+
+task_payloads = PayloadPool(lambda rng: {
+    "title": f"Task {rng.randint(1, 1000)}",
+    "description": f"Task created during load test at {TIMESTAMP}",
+    "completed": False,
+    "dueDate": None
+})
+
+# Outcomes of login()/signup() that are not a (token, user_id) pair
+ACCOUNT_MISSING = "missing"
+ACCOUNT_EXISTS = "exists"
+
+def random_email():
+    first_name = random.choice(FIRST_NAMES)
+    last_name = random.choice(LAST_NAMES)
+    rand_id = str(uuid.uuid4())[:8]
+    return f"{first_name.lower()}.{last_name.lower()}.{rand_id}@example.com"
+
 # Global stats for measuring performance
-class AuthStats:
-    def __init__(self):
-        self.signup_times = []
-        self.login_times = []
-        self.token_verify_times = []
-        self.create_task_times = []
-        self.get_tasks_times = []
-        
-    def clear(self):
-        self.signup_times = []
-        self.login_times = []
-        self.token_verify_times = []
-        self.create_task_times = []
-        self.get_tasks_times = []
-        
-    def get_avg(self, times_list):
-        return sum(times_list) / len(times_list) if times_list else 0
+class AuthStats(ScenarioStats):
+    metrics = {
+        "signup_times": "Signup Time",
+        "login_times": "Login Time",
+        "token_verify_times": "Token Verification Time",
+        "create_task_times": "Create Task Time",
+        "get_tasks_times": "Get Tasks Time",
+    }
 
 stats = AuthStats()
+share_with_master(stats, "auth_stats")
 
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
     print(f"Starting Authentication Load Test with {environment.runner.user_count} users")
     stats.clear()
 
-@events.test_stop.add_listener
-def on_test_stop(environment, **kwargs):
-    print("\n=== Authentication Load Test Results ===")
-    print(f"Average Signup Time: {stats.get_avg(stats.signup_times):.4f} seconds")
-    print(f"Average Login Time: {stats.get_avg(stats.login_times):.4f} seconds")
-    print(f"Average Token Verification Time: {stats.get_avg(stats.token_verify_times):.4f} seconds")
-    print(f"Average Create Task Time: {stats.get_avg(stats.create_task_times):.4f} seconds")
-    print(f"Average Get Tasks Time: {stats.get_avg(stats.get_tasks_times):.4f} seconds")
-    print("====================================\n")
+@stats_complete.add_listener
+def on_stats_complete(environment, **kwargs):
+    stats.print_report("Authentication Load Test Results")
 
-class AuthenticatedUser(HttpUser):
+class AuthenticatedUser(ScenarioUser):
     """This user class tests the full authentication and task flow"""
     wait_time = between(1, 3)  # Realistic wait between actions
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.auth_token = None
-        self.user_id = None
         self.email = None
         self.password = "TestPassword123!"
+        self.tokens = None
+        self.task_list = TaskListFetcher()
+    
+    @property
+    def auth_token(self):
+        return self.tokens.token if self.tokens else None
+    
+    @property
+    def user_id(self):
+        return self.tokens.user_id if self.tokens else None
+    
+    def use_account(self, email, token=None, user_id=None, shared=True):
+        """Switch to ``email``, sharing its token state with other users of the account
+
+        One-off accounts (``shared=False``) get a TokenManager of their own,
+        which goes away with the user instead of piling up in the registry.
+        """
+        self.email = email
+        self.tokens = token_manager(email) if shared else TokenManager(email)
+        if token and not self.tokens.token:
+            self.tokens.update(token, user_id)
     
     def on_start(self):
-        """Each user either signs up or logs in at the start"""
+        """Each user takes a provisioned account, or else signs up or logs in at the start"""
+        if account_pool:
+            account = account_pool.checkout()
+            self.password = account.password
+            self.use_account(account.email, account.token, account.user_id)
+            return
+        
         # Generate a random user for this session
-        first_name = random.choice(FIRST_NAMES)
-        last_name = random.choice(LAST_NAMES)
-        rand_id = str(uuid.uuid4())[:8]
-        self.email = f"{first_name.lower()}.{last_name.lower()}.{rand_id}@example.com"
+        self.use_account(random_email(), shared=False)
         
         # Randomly decide whether to sign up or log in
-        # 20% of users will sign up, 80% will try to log in
+        # 20% of users will sign up, 80% will try to log in (falling back to signup)
         if random.random() < 0.2:
-            self.signup()
-        else:
-            self.login()
+            outcome = self.signup()
+            if isinstance(outcome, tuple):
+                self.tokens.update(*outcome)
+        self.ensure_token()
+    
+    def ensure_token(self):
+        """Valid token for this user's account, renewed (once per account) when needed"""
+        return self.tokens.get_token(self.authenticate)
+    
+    def authenticate(self):
+        """One bounded login/signup round: (token, user_id), or None on failure"""
+        outcome = self.login()
+        if outcome == ACCOUNT_MISSING:
+            outcome = self.signup()
+            if outcome == ACCOUNT_EXISTS:
+                # Created concurrently by another user of the same account
+                outcome = self.login()
+        return outcome if isinstance(outcome, tuple) else None
     
     def signup(self):
-        """Test the signup endpoint"""
+        """Test the signup endpoint
+        
+        Returns (token, user_id) on success, ACCOUNT_EXISTS on 409, else None.
+        """
         # Create a new user
         user_data = {
             "name": f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}",
@@ -91,26 +154,29 @@ class AuthenticatedUser(HttpUser):
             catch_response=True
         ) as response:
             signup_time = time.time() - start_time
-            stats.signup_times.append(signup_time)
+            stats.signup_times.record(signup_time)
             
             if response.status_code == 201:
                 # Successfully signed up
                 try:
-                    data = response.json()
-                    self.auth_token = data.get("token")
-                    self.user_id = data.get("user", {}).get("id")
+                    result = auth_result(response)
                     response.success()
-                except json.JSONDecodeError:
+                    return result
+                except ValueError:
                     response.failure("Invalid JSON response from signup")
             elif response.status_code == 409:
-                # User already exists, try to log in instead
+                # User already exists, the caller may log in instead
                 response.success()
-                self.login()
+                return ACCOUNT_EXISTS
             else:
                 response.failure(f"Signup failed: {response.status_code} - {response.text}")
+        return None
     
     def login(self):
-        """Test the login endpoint"""
+        """Test the login endpoint
+        
+        Returns (token, user_id) on success, ACCOUNT_MISSING on 401, else None.
+        """
         # Log in with existing credentials
         login_data = {
             "email": self.email,
@@ -124,30 +190,31 @@ class AuthenticatedUser(HttpUser):
             catch_response=True
         ) as response:
             login_time = time.time() - start_time
-            stats.login_times.append(login_time)
+            stats.login_times.record(login_time)
             
             if response.status_code == 200:
                 # Successfully logged in
                 try:
-                    data = response.json()
-                    self.auth_token = data.get("token")
-                    self.user_id = data.get("user", {}).get("id")
+                    result = auth_result(response)
                     response.success()
-                except json.JSONDecodeError:
+                    return result
+                except ValueError:
                     response.failure("Invalid JSON response from login")
             elif response.status_code == 401:
-                # Invalid credentials, try signing up
+                # Invalid credentials, the caller may sign up instead
                 response.success()
-                self.signup()
+                return ACCOUNT_MISSING
             else:
                 response.failure(f"Login failed: {response.status_code} - {response.text}")
+        return None
     
     def verify_token(self):
         """Test the token verification endpoint"""
-        if not self.auth_token:
+        token = self.ensure_token()
+        if not token:
             return
             
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        headers = {"Authorization": f"Bearer {token}"}
         
         start_time = time.time()
         with self.client.get(
@@ -156,15 +223,31 @@ class AuthenticatedUser(HttpUser):
             catch_response=True
         ) as response:
             verify_time = time.time() - start_time
-            stats.token_verify_times.append(verify_time)
+            stats.token_verify_times.record(verify_time)
             
             if response.status_code == 200:
                 # Token is valid
                 response.success()
             else:
-                # Token is invalid, try logging in again
+                # Token is invalid, the next task renews it
                 response.failure(f"Token verification failed: {response.status_code}")
-                self.login()
+                if response.status_code == 401:
+                    self.tokens.invalidate(token)
+    
+    @task(LOGIN_WEIGHT)
+    def relogin(self):
+        """Explicit login load, independent of user spawning"""
+        outcome = self.login()
+        if isinstance(outcome, tuple):
+            self.tokens.update(*outcome)
+    
+    @task(SIGNUP_WEIGHT)
+    def signup_new_account(self):
+        """Explicit signup load; the user carries on as the new account"""
+        self.use_account(random_email(), shared=False)
+        outcome = self.signup()
+        if isinstance(outcome, tuple):
+            self.tokens.update(*outcome)
     
     @task(1)
     def test_token_verification(self):
@@ -174,62 +257,55 @@ class AuthenticatedUser(HttpUser):
     @task(3)
     def get_user_tasks(self):
         """Test getting the user's tasks"""
-        if not self.auth_token:
-            self.login()
+        token = self.ensure_token()
+        if not token:
             return
             
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
-        
+        # Fetched as TASK_LIST_MODE says (whole list, pages, projection or conditional GET)
         start_time = time.time()
-        with self.client.get(
+        with self.task_list.get(
+            self.client,
             f"{TASK_FUNCTION_URL}/getUserTasks",
-            headers=headers,
-            catch_response=True
+            token
         ) as response:
             get_time = time.time() - start_time
-            stats.get_tasks_times.append(get_time)
+            stats.get_tasks_times.record(get_time)
             
-            if response.status_code == 200:
+            if response.status_code in OK_STATUSES:
                 response.success()
             elif response.status_code == 401:
-                # Token expired or invalid
+                # Token expired or invalid, the next task renews it
                 response.success()
-                self.login()
+                self.tokens.invalidate(token)
             else:
                 response.failure(f"Failed to get tasks: {response.status_code} - {response.text}")
     
     @task(2)
     def create_task(self):
         """Test creating a new task"""
-        if not self.auth_token:
-            self.login()
+        token = self.ensure_token()
+        if not token:
             return
             
-        # Generate a random task
-        task_data = {
-            "title": f"Task {random.randint(1, 1000)}",
-            "description": f"Task created during load test at {time.time()}",
-            "completed": False,
-            "dueDate": None
-        }
-        
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        index, body = task_payloads.checkout()
+        headers = {**JSON_HEADERS, "Authorization": f"Bearer {token}"}
         
         start_time = time.time()
         with self.client.post(
             f"{TASK_FUNCTION_URL}/validateTask",
-            json=task_data,
+            data=body,
+            context=task_payloads.context(index),
             headers=headers,
             catch_response=True
         ) as response:
             create_time = time.time() - start_time
-            stats.create_task_times.append(create_time)
+            stats.create_task_times.record(create_time)
             
             if response.status_code == 200:
                 response.success()
             elif response.status_code == 401:
-                # Token expired or invalid
+                # Token expired or invalid, the next task renews it
                 response.success()
-                self.login()
+                self.tokens.invalidate(token)
             else:
                 response.failure(f"Failed to create task: {response.status_code} - {response.text}") 
\ No newline at end of file
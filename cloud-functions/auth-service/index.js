@@ -1,5 +1,6 @@
 const functions = require('@google-cloud/functions-framework');
 const { MongoClient, ServerApiVersion } = require('mongodb');
+const crypto = require('crypto');
 const bcrypt = require('bcryptjs');
 const jwt = require('jsonwebtoken');
 
@@ -13,6 +14,11 @@ const SALT_ROUNDS = 10;
 let client;
 let db;
 
+// Cold-start marker: every response names the instance that served it and
+// whether it was that instance's first invocation
+const INSTANCE_ID = crypto.randomUUID();
+let invocations = 0;
+
 // Initialize MongoDB connection
 async function connectToMongoDB() {
   if (client) return client;
@@ -54,12 +60,14 @@ function generateToken(user) {
   );
 }
 
-// Helper to set CORS headers
+// Helper to set CORS and cold-start marker headers
 function setCorsHeaders(res) {
   res.set('Access-Control-Allow-Origin', '*');
   res.set('Access-Control-Allow-Methods', 'GET, POST, OPTIONS');
   res.set('Access-Control-Allow-Headers', 'Content-Type, Authorization');
   res.set('Access-Control-Max-Age', '3600');
+  res.set('X-Instance-Id', INSTANCE_ID);
+  res.set('X-Cold-Start', invocations++ === 0 ? '1' : '0');
 }
 
 // User Signup Endpoint
@@ -1,17 +1,33 @@
 const functions = require('@google-cloud/functions-framework');
 const { v4: uuidv4 } = require('uuid');
 const { MongoClient, ServerApiVersion, ObjectId } = require('mongodb');
+const crypto = require('crypto');
 const jwt = require('jsonwebtoken');
 
 // Configuration
 const JWT_SECRET = process.env.JWT_SECRET || 'your-super-secret-key-for-development-only';
 const MONGO_URI = process.env.MONGO_URI || 'mongodb://35.232.144.78:27017'; // Replace with your VM's actual IP
 const DB_NAME = 'todo_app';
+// getUserTasks page size cap and the task fields a projection may ask for
+const MAX_PAGE_SIZE = 1000;
+const PROJECTABLE_FIELDS = ['title', 'description', 'completed', 'createdAt', 'dueDate', 'userId'];
+// Most tasks one validateTasks call accepts
+const MAX_BATCH_SIZE = 500;
 
 // MongoDB client
 let client;
 let db;
 
+// Cold-start marker: every response names the instance that served it and
+// whether it was that instance's first invocation
+const INSTANCE_ID = uuidv4();
+let invocations = 0;
+
+function setInstanceHeaders(res) {
+  res.set('X-Instance-Id', INSTANCE_ID);
+  res.set('X-Cold-Start', invocations++ === 0 ? '1' : '0');
+}
+
 // Initialize MongoDB connection
 async function connectToMongoDB() {
   if (client) return client;
@@ -28,6 +44,9 @@ async function connectToMongoDB() {
     await client.connect();
     console.log('Connected to MongoDB');
     db = client.db(DB_NAME);
+    // Serves getUserTasks' sort and cursor without scanning the user's whole list
+    db.collection('tasks').createIndex({ userId: 1, createdAt: -1, _id: -1 })
+      .catch(err => console.error('Failed to create the tasks index:', err));
     return client;
   } catch (err) {
     console.error('Failed to connect to MongoDB:', err);
@@ -45,6 +64,54 @@ function verifyToken(token) {
   }
 }
 
+/**
+ * Validate and format one task: { task } or { error }
+ */
+function validateTaskData(taskData, userId) {
+  // Basic validation
+  if (!taskData || typeof taskData.title !== 'string' || taskData.title.trim() === '') {
+    return { error: 'Task title is required' };
+  }
+  
+  // Check if due date is valid
+  if (taskData.dueDate && isNaN(new Date(taskData.dueDate).getTime())) {
+    return { error: 'Invalid due date format' };
+  }
+  
+  return {
+    task: {
+      title: formatTitle(taskData.title),
+      description: taskData.description ? taskData.description.trim() : '',
+      completed: taskData.completed || false,
+      createdAt: new Date(),
+      dueDate: taskData.dueDate ? new Date(taskData.dueDate) : null,
+      userId: userId // Associate task with user if authenticated
+    }
+  };
+}
+
+// Task as returned by validateTask(s)
+function formatValidatedTask(task, id) {
+  return {
+    ...task,
+    id,
+    createdAt: task.createdAt.toISOString(),
+    dueDate: task.dueDate ? task.dueDate.toISOString() : null
+  };
+}
+
+// User id of a valid Bearer token, else null (validation works without one)
+function userIdFrom(req) {
+  const authHeader = req.headers.authorization;
+  if (authHeader && authHeader.startsWith('Bearer ')) {
+    const decoded = verifyToken(authHeader.split(' ')[1]);
+    if (decoded) {
+      return decoded.id;
+    }
+  }
+  return null;
+}
+
 /**
  * HTTP Cloud Function to validate and format task data
  * 
@@ -57,6 +124,7 @@ functions.http('validateTask', async (req, res) => {
   res.set('Access-Control-Allow-Methods', 'POST, OPTIONS');
   res.set('Access-Control-Allow-Headers', 'Content-Type, Authorization');
   res.set('Access-Control-Max-Age', '3600');
+  setInstanceHeaders(res);
   
   // Handle OPTIONS requests (preflight)
   if (req.method === 'OPTIONS') {
@@ -72,41 +140,12 @@ functions.http('validateTask', async (req, res) => {
   
   try {
     // Extract authentication token
-    const authHeader = req.headers.authorization;
-    let userId = null;
-    
-    if (authHeader && authHeader.startsWith('Bearer ')) {
-      const token = authHeader.split(' ')[1];
-      const decoded = verifyToken(token);
-      
-      if (decoded) {
-        userId = decoded.id;
-      }
-    }
-    
-    const taskData = req.body;
-    
-    // Basic validation
-    if (!taskData.title || taskData.title.trim() === '') {
-      return res.status(400).json({ error: 'Task title is required' });
-    }
+    const userId = userIdFrom(req);
     
     // Format and validate the task
-    const validatedTask = {
-      title: formatTitle(taskData.title),
-      description: taskData.description ? taskData.description.trim() : '',
-      completed: taskData.completed || false,
-      createdAt: new Date(),
-      dueDate: taskData.dueDate ? new Date(taskData.dueDate) : null,
-      userId: userId // Associate task with user if authenticated
-    };
-    
-    // Check if due date is valid
-    if (taskData.dueDate) {
-      const dueDate = new Date(taskData.dueDate);
-      if (isNaN(dueDate.getTime())) {
-        return res.status(400).json({ error: 'Invalid due date format' });
-      }
+    const { task: validatedTask, error } = validateTaskData(req.body, userId);
+    if (error) {
+      return res.status(400).json({ error });
     }
     
     // Connect to MongoDB if user is authenticated
@@ -118,32 +157,16 @@ functions.http('validateTask', async (req, res) => {
         const result = await db.collection('tasks').insertOne(validatedTask);
         
         // Return the created task with database ID
-        res.status(200).json({
-          ...validatedTask,
-          id: result.insertedId,
-          createdAt: validatedTask.createdAt.toISOString(),
-          dueDate: validatedTask.dueDate ? validatedTask.dueDate.toISOString() : null
-        });
+        res.status(200).json(formatValidatedTask(validatedTask, result.insertedId));
         
       } catch (dbError) {
         console.error('Database error:', dbError);
         // If DB fails, fall back to returning the validated task without saving
-        res.status(200).json({
-          ...validatedTask,
-          id: `task_${uuidv4()}`,
-          createdAt: validatedTask.createdAt.toISOString(),
-          dueDate: validatedTask.dueDate ? validatedTask.dueDate.toISOString() : null
-        });
+        res.status(200).json(formatValidatedTask(validatedTask, `task_${uuidv4()}`));
       }
     } else {
       // For unauthenticated users, just return the validated task with a UUID
-      res.status(200).json({
-        ...validatedTask,
-        id: `task_${uuidv4()}`,
-        createdAt: validatedTask.createdAt.toISOString(),
-        dueDate: validatedTask.dueDate ? validatedTask.dueDate.toISOString() : null,
-        userId: null
-      });
+      res.status(200).json(formatValidatedTask(validatedTask, `task_${uuidv4()}`));
     }
     
   } catch (error) {
@@ -153,14 +176,136 @@ functions.http('validateTask', async (req, res) => {
 });
 
 /**
- * Function to get tasks for a specific user
+ * Validate and create up to MAX_BATCH_SIZE tasks in one invocation
+ *
+ * Body: { tasks: [...] }. Valid tasks of an authenticated user are written
+ * with a single unordered insertMany, so one bad task fails alone. The
+ * response lists every task in order, as { index, task } or { index, error }:
+ *   { created, failed, results }
+ */
+functions.http('validateTasks', async (req, res) => {
+  res.set('Access-Control-Allow-Origin', '*');
+  res.set('Access-Control-Allow-Methods', 'POST, OPTIONS');
+  res.set('Access-Control-Allow-Headers', 'Content-Type, Authorization');
+  res.set('Access-Control-Max-Age', '3600');
+  setInstanceHeaders(res);
+  
+  if (req.method === 'OPTIONS') {
+    res.status(204).send('');
+    return;
+  }
+  
+  if (req.method !== 'POST') {
+    res.status(405).json({ error: 'Method not allowed' });
+    return;
+  }
+  
+  try {
+    const tasks = req.body && req.body.tasks;
+    if (!Array.isArray(tasks) || tasks.length === 0) {
+      return res.status(400).json({ error: 'tasks must be a non-empty array' });
+    }
+    if (tasks.length > MAX_BATCH_SIZE) {
+      return res.status(413).json({ error: `At most ${MAX_BATCH_SIZE} tasks per batch` });
+    }
+    
+    // The token is verified once for the whole batch
+    const userId = userIdFrom(req);
+    const results = tasks.map((taskData, index) => ({ index, ...validateTaskData(taskData, userId) }));
+    const valid = results.filter(result => result.task);
+    
+    if (userId && valid.length) {
+      const ids = new Map();
+      try {
+        await connectToMongoDB();
+        const inserted = await db.collection('tasks').insertMany(valid.map(result => result.task), { ordered: false });
+        Object.entries(inserted.insertedIds).forEach(([i, id]) => ids.set(Number(i), id));
+      } catch (dbError) {
+        console.error('Database error:', dbError);
+        if (!dbError.writeErrors && !dbError.insertedIds) {
+          // As in validateTask: if DB fails, return the validated tasks without saving
+          valid.forEach((result, i) => ids.set(i, `task_${uuidv4()}`));
+        } else {
+          // Unordered bulk write: the other tasks were still inserted
+          Object.entries(dbError.insertedIds || {}).forEach(([i, id]) => ids.set(Number(i), id));
+          const failed = new Set([].concat(dbError.writeErrors || []).map(writeError => writeError.index));
+          failed.forEach(i => ids.delete(i));
+        }
+      }
+      valid.forEach((result, i) => {
+        if (ids.has(i)) {
+          result.task = formatValidatedTask(result.task, ids.get(i));
+        } else {
+          delete result.task;
+          result.error = 'Failed to save task';
+        }
+      });
+    } else {
+      valid.forEach(result => {
+        result.task = formatValidatedTask(result.task, `task_${uuidv4()}`);
+      });
+    }
+    
+    const created = results.filter(result => result.task).length;
+    res.status(200).json({ created, failed: results.length - created, results });
+    
+  } catch (error) {
+    console.error('Error validating tasks:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
+// Opaque getUserTasks cursor: createdAt and id of the last task of the previous page
+function encodeCursor(task) {
+  return Buffer.from(JSON.stringify([task.createdAt.toISOString(), task._id.toString()])).toString('base64url');
+}
+
+function decodeCursor(cursor) {
+  try {
+    const [createdAt, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString());
+    const date = new Date(createdAt);
+    if (isNaN(date.getTime()) || !ObjectId.isValid(id)) return null;
+    return { createdAt: date, id: new ObjectId(id) };
+  } catch (error) {
+    return null;
+  }
+}
+
+// Task as returned to clients: ISO dates, id instead of _id, only the requested fields
+// Weak comparison (RFC 9110 13.1.2): a W/ prefix on either tag is ignored, and * matches any representation
+function etagMatches(ifNoneMatch, etag) {
+  const opaque = tag => tag.trim().replace(/^W\//, '');
+  return ifNoneMatch.trim() === '*' || ifNoneMatch.split(',').some(tag => opaque(tag) === opaque(etag));
+}
+
+function formatTask(task, fields) {
+  const formatted = {};
+  for (const [key, value] of Object.entries(task)) {
+    if (key === '_id' || (fields && !fields.includes(key))) continue;
+    formatted[key] = value instanceof Date ? value.toISOString() : value;
+  }
+  if ((!fields || fields.includes('dueDate')) && formatted.dueDate === undefined) formatted.dueDate = null;
+  formatted.id = task._id;
+  return formatted;
+}
+
+/**
+ * Function to get tasks for a specific user, newest first
+ *
+ * Without query parameters the whole list is returned as an array. Optional:
+ *   limit   page size (at most MAX_PAGE_SIZE); the response becomes { nextCursor, tasks }
+ *   cursor  nextCursor of the previous page
+ *   fields  comma-separated fields to return besides id, e.g. "title,completed"
+ * Every response carries an ETag; a matching If-None-Match gets an empty 304.
  */
 functions.http('getUserTasks', async (req, res) => {
   // Set CORS headers
   res.set('Access-Control-Allow-Origin', '*');
   res.set('Access-Control-Allow-Methods', 'GET, OPTIONS');
-  res.set('Access-Control-Allow-Headers', 'Content-Type, Authorization');
+  res.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, If-None-Match');
+  res.set('Access-Control-Expose-Headers', 'ETag');
   res.set('Access-Control-Max-Age', '3600');
+  setInstanceHeaders(res);
   
   // Handle OPTIONS requests
   if (req.method === 'OPTIONS') {
@@ -188,25 +333,60 @@ functions.http('getUserTasks', async (req, res) => {
       return res.status(401).json({ error: 'Invalid token' });
     }
     
+    const paginated = req.query.limit !== undefined || req.query.cursor !== undefined;
+    const limit = paginated ? parseInt(req.query.limit || MAX_PAGE_SIZE, 10) : 0;
+    if (paginated && !(limit > 0 && limit <= MAX_PAGE_SIZE)) {
+      return res.status(400).json({ error: `limit must be between 1 and ${MAX_PAGE_SIZE}` });
+    }
+    const cursor = req.query.cursor ? decodeCursor(req.query.cursor) : null;
+    if (req.query.cursor && !cursor) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
+    const fields = req.query.fields ? req.query.fields.split(',').map(field => field.trim()) : null;
+    if (fields && fields.some(field => !PROJECTABLE_FIELDS.includes(field))) {
+      return res.status(400).json({ error: `fields must be among ${PROJECTABLE_FIELDS.join(', ')}` });
+    }
+    
     // Connect to MongoDB
     await connectToMongoDB();
     
-    // Get tasks for this user
-    const tasks = await db.collection('tasks')
-      .find({ userId: decoded.id })
-      .sort({ createdAt: -1 })
-      .toArray();
+    // Get tasks for this user, after the cursor if one is given
+    const query = { userId: decoded.id };
+    if (cursor) {
+      query.$or = [
+        { createdAt: { $lt: cursor.createdAt } },
+        { createdAt: cursor.createdAt, _id: { $lt: cursor.id } }
+      ];
+    }
+    let find = db.collection('tasks').find(query).sort({ createdAt: -1, _id: -1 });
+    if (fields) {
+      // createdAt is always read, the cursor needs it
+      find = find.project(Object.fromEntries([...fields, 'createdAt'].map(field => [field, 1])));
+    }
+    if (paginated) {
+      // One extra task tells whether there is a next page
+      find = find.limit(limit + 1);
+    }
+    const tasks = await find.toArray();
     
-    // Format dates for JSON response
-    const formattedTasks = tasks.map(task => ({
-      ...task,
-      id: task._id,
-      _id: undefined,
-      createdAt: task.createdAt.toISOString(),
-      dueDate: task.dueDate ? task.dueDate.toISOString() : null
-    }));
+    let body;
+    if (paginated) {
+      const page = tasks.slice(0, limit);
+      const nextCursor = tasks.length > limit ? encodeCursor(page[page.length - 1]) : null;
+      // nextCursor first, so clients can read it without parsing the page
+      body = JSON.stringify({ nextCursor, tasks: page.map(task => formatTask(task, fields)) });
+    } else {
+      body = JSON.stringify(tasks.map(task => formatTask(task, fields)));
+    }
     
-    res.status(200).json(formattedTasks);
+    const etag = `"${crypto.createHash('sha1').update(body).digest('base64url')}"`;
+    res.set('ETag', etag);
+    res.set('Cache-Control', 'private, no-cache');
+    const ifNoneMatch = req.headers['if-none-match'];
+    if (ifNoneMatch && etagMatches(ifNoneMatch, etag)) {
+      return res.status(304).end();
+    }
+    res.status(200).type('application/json').send(body);
     
   } catch (error) {
     console.error('Error fetching tasks:', error);
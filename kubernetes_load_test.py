@@ -1,53 +1,59 @@
-import json
+import os
 import random
+import sys
 import time
 import uuid
-from locust import HttpUser, task, between, events
+from locust import task, between, events
 
-# The frontend URL running on GKE
-FRONTEND_URL = "http://35.239.33.10"
+# Shared harness modules live next to the other locustfiles
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "locust"))
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, stats_complete
+from targets import FRONTEND_URL, FUNCTIONS_URL
+from clients import ScenarioUser
+from account_pool import load_default_pool
+from payload_pool import JSON_HEADERS, TIMESTAMP, PayloadPool
+from response_checks import auth_result
+from task_list import OK_STATUSES, TaskListFetcher
+from browser_cache import page_load
 
 # Names for signup
 FIRST_NAMES = ["Alex", "Jamie", "Taylor", "Jordan", "Casey", "Riley", "Morgan", "Avery"]
 LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Wilson"]
 
+# Accounts created up front by locust/provision_accounts.py (ACCOUNT_POOL=path)
+account_pool = load_default_pool()
+
+task_payloads = PayloadPool(lambda rng: {
+    "title": f"Task {rng.randint(1, 1000)}",
+    "description": f"Created during K8s test at {TIMESTAMP}",
+    "completed": False,
+    "dueDate": None
+})
+
 # Global stats for measuring performance
-class KubernetesStats:
-    def __init__(self):
-        self.homepage_times = []
-        self.login_page_times = []
-        self.full_login_times = []
-        self.task_create_times = []
-        self.task_list_times = []
-        
-    def clear(self):
-        self.homepage_times = []
-        self.login_page_times = []
-        self.full_login_times = []
-        self.task_create_times = []
-        self.task_list_times = []
-        
-    def get_avg(self, times_list):
-        return sum(times_list) / len(times_list) if times_list else 0
+class KubernetesStats(ScenarioStats):
+    metrics = {
+        "homepage_times": "Homepage Load Time",
+        "login_page_times": "Login Page Time",
+        "full_login_times": "Full Login Flow Time",
+        "task_create_times": "Task Creation Time",
+        "task_list_times": "Task List Time",
+    }
 
 stats = KubernetesStats()
+share_with_master(stats, "kubernetes_stats")
 
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
     print(f"Starting Kubernetes Cluster Test with {environment.runner.user_count} users")
     stats.clear()
 
-@events.test_stop.add_listener
-def on_test_stop(environment, **kwargs):
-    print("\n=== Kubernetes Cluster Test Results ===")
-    print(f"Average Homepage Load Time: {stats.get_avg(stats.homepage_times):.4f} seconds")
-    print(f"Average Login Page Time: {stats.get_avg(stats.login_page_times):.4f} seconds")
-    print(f"Average Full Login Flow Time: {stats.get_avg(stats.full_login_times):.4f} seconds")
-    print(f"Average Task Creation Time: {stats.get_avg(stats.task_create_times):.4f} seconds")
-    print(f"Average Task List Time: {stats.get_avg(stats.task_list_times):.4f} seconds")
-    print("=======================================\n")
+@stats_complete.add_listener
+def on_stats_complete(environment, **kwargs):
+    stats.print_report("Kubernetes Cluster Test Results")
 
-class FrontendUser(HttpUser):
+class FrontendUser(ScenarioUser):
     """This user class tests the frontend application running in GKE"""
     wait_time = between(1, 3)  # Realistic wait between actions
     host = FRONTEND_URL
@@ -56,8 +62,18 @@ class FrontendUser(HttpUser):
         super().__init__(*args, **kwargs)
         self.auth_token = None
         self.user_id = None
+        self.task_list = TaskListFetcher()
         self.email = None
         self.password = "TestPassword123!"
+        if account_pool:
+            # Provisioned accounts log in successfully and start with a valid token
+            account = account_pool.checkout()
+            self.email = account.email
+            self.password = account.password
+            self.user_name = account.name
+            self.user_id = account.user_id
+            self.auth_token = account.token
+            return
         # Generate a random user for this session
         first_name = random.choice(FIRST_NAMES)
         last_name = random.choice(LAST_NAMES)
@@ -68,28 +84,14 @@ class FrontendUser(HttpUser):
     @task(1)
     def load_homepage(self):
         """Test the frontend homepage load time"""
-        start_time = time.time()
-        with self.client.get("/", catch_response=True) as response:
-            load_time = time.time() - start_time
-            stats.homepage_times.append(load_time)
-            
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Failed to load homepage: {response.status_code}")
+        page_load(self, stats.homepage_times, "Failed to load homepage")
     
     @task(2)
     def login_flow(self):
         """Simulate the full login flow through the frontend"""
         # First load the login page
-        start_page_time = time.time()
-        with self.client.get("/", catch_response=True) as response:
-            page_load_time = time.time() - start_page_time
-            stats.login_page_times.append(page_load_time)
-            
-            if response.status_code != 200:
-                response.failure(f"Failed to load login page: {response.status_code}")
-                return
+        if not page_load(self, stats.login_page_times, "Failed to load login page"):
+            return
         
         # Now try the full login process
         # We'll make the request directly to the API endpoint that the frontend would call
@@ -111,7 +113,7 @@ class FrontendUser(HttpUser):
             endpoint = "login"
         
         # Send the request to the authentication endpoint
-        auth_url = f"https://us-central1-todo-cloud-app-20250521.cloudfunctions.net/{endpoint}"
+        auth_url = f"{FUNCTIONS_URL}/{endpoint}"
         with self.client.post(
             auth_url,
             json=credentials,
@@ -119,14 +121,13 @@ class FrontendUser(HttpUser):
             name=f"API: {endpoint}"
         ) as response:
             full_time = time.time() - start_full_time
-            stats.full_login_times.append(full_time)
+            stats.full_login_times.record(full_time)
             
             if response.status_code in [200, 201]:
                 try:
-                    data = response.json()
-                    self.auth_token = data.get("token")
+                    self.auth_token, _ = auth_result(response)
                     response.success()
-                except json.JSONDecodeError:
+                except ValueError:
                     response.failure(f"Invalid JSON in {endpoint} response")
             elif response.status_code == 409 and endpoint == "signup":
                 # User already exists, this is fine for our test
@@ -145,20 +146,19 @@ class FrontendUser(HttpUser):
             self.login_flow()
             return
         
-        # Now fetch the task list through the API that the frontend would call
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        # Now fetch the task list through the API that the frontend would call (TASK_LIST_MODE)
         start_time = time.time()
         
-        with self.client.get(
-            "https://us-central1-todo-cloud-app-20250521.cloudfunctions.net/getUserTasks",
-            headers=headers,
-            catch_response=True,
+        with self.task_list.get(
+            self.client,
+            f"{FUNCTIONS_URL}/getUserTasks",
+            self.auth_token,
             name="API: getUserTasks"
         ) as response:
             list_time = time.time() - start_time
-            stats.task_list_times.append(list_time)
+            stats.task_list_times.record(list_time)
             
-            if response.status_code == 200:
+            if response.status_code in OK_STATUSES:
                 response.success()
             elif response.status_code == 401:
                 # Token expired, clear it so we re-login next time
@@ -176,26 +176,21 @@ class FrontendUser(HttpUser):
             return
         
         # Create a random task
-        task_data = {
-            "title": f"Task {random.randint(1, 1000)}",
-            "description": f"Created during K8s test at {time.time()}",
-            "completed": False,
-            "dueDate": None
-        }
-        
-        headers = {"Authorization": f"Bearer {self.auth_token}"}
+        index, body = task_payloads.checkout()
+        headers = {**JSON_HEADERS, "Authorization": f"Bearer {self.auth_token}"}
         start_time = time.time()
         
         # Call the task validation function
         with self.client.post(
-            "https://us-central1-todo-cloud-app-20250521.cloudfunctions.net/validateTask",
-            json=task_data,
+            f"{FUNCTIONS_URL}/validateTask",
+            data=body,
+            context=task_payloads.context(index),
             headers=headers,
             catch_response=True,
             name="API: validateTask"
         ) as response:
             create_time = time.time() - start_time
-            stats.task_create_times.append(create_time)
+            stats.task_create_times.record(create_time)
             
             if response.status_code == 200:
                 response.success()
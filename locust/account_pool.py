@@ -0,0 +1,63 @@
+"""Pre-provisioned test accounts shared by all Locust processes
+
+``provision_accounts.py`` writes one tab-separated line per account
+(email, password, name, user id, token). Every worker loads the same file and
+its users check accounts out round-robin, so spawning a user costs no signup
+or login request.
+"""
+import itertools
+import os
+import random
+from collections import namedtuple
+
+Account = namedtuple("Account", "email password name user_id token")
+
+FIELDS = Account._fields
+
+
+def write_accounts(path, accounts):
+    with open(path, "w") as f:
+        f.write("# " + "\t".join(FIELDS) + "\n")
+        for account in accounts:
+            f.write("\t".join(account) + "\n")
+
+
+def read_accounts(path):
+    accounts = []
+    with open(path) as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            accounts.append(Account(*line.rstrip("\n").split("\t")))
+    return accounts
+
+
+class AccountPool:
+    """Hands out provisioned accounts round-robin
+
+    Each process starts at a random offset, so with at least as many accounts
+    as simulated users an account is rarely shared. Sharing is harmless since
+    tokens are stateless JWTs.
+    """
+
+    def __init__(self, accounts):
+        if not accounts:
+            raise ValueError("Account pool is empty")
+        self.accounts = accounts
+        self._next = itertools.count(random.randrange(len(accounts)))
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(read_accounts(path))
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def checkout(self):
+        return self.accounts[next(self._next) % len(self.accounts)]
+
+
+def load_default_pool():
+    """Pool named by the ACCOUNT_POOL environment variable, or None when unset"""
+    path = os.environ.get("ACCOUNT_POOL")
+    return AccountPool.from_file(path) if path else None
@@ -0,0 +1,190 @@
+"""Steady-state throughput, percentile series and saturation knees from Locust stats_history CSVs
+
+Reads any number of ``*_stats_history.csv`` files in chunks (multi-GB
+histories of long runs never sit in memory whole) and writes a markdown
+report plus the per-endpoint time series of each run:
+
+    python3 analyze_results.py combined_results_stats_history.csv locust_results_stats_history.csv \\
+        --output analysis_report.md
+
+Rows are grouped by load level (user count). The first ``--settle`` seconds
+after every change of the user count are dropped, which trims the spawn ramp
+and lets Locust's rolling 10 s window catch up with the new level. The knee
+is the first level where adding users stops adding throughput, or p95 grows
+past ``--knee-factor`` x its value at the lowest level.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Timestamp", "User Count", "Name", "Requests/s", "Failures/s", "50%", "95%", "99%"]
+# History columns -> names used in the summaries
+METRICS = {"Requests/s": "rps", "Failures/s": "failures", "50%": "p50", "95%": "p95", "99%": "p99"}
+AGGREGATED = "Aggregated"
+
+
+def read_chunks(path, chunksize, columns=COLUMNS):
+    return pd.read_csv(path, usecols=columns, na_values=["N/A"], chunksize=chunksize)
+
+
+def load_levels(path, chunksize):
+    """(start timestamps, user counts, last timestamp) of the run's user-count levels"""
+    starts, users = [], []
+    previous, last = None, None
+    for chunk in read_chunks(path, chunksize, ["Timestamp", "User Count", "Name"]):
+        agg = chunk[chunk["Name"] == AGGREGATED]
+        if agg.empty:
+            continue
+        ts = agg["Timestamp"].to_numpy()
+        count = agg["User Count"].to_numpy()
+        before = np.concatenate(([-1 if previous is None else previous], count[:-1]))
+        changed = np.flatnonzero(count != before)
+        starts.append(ts[changed])
+        users.append(count[changed])
+        previous, last = count[-1], ts[-1]
+    if last is None:
+        raise ValueError(f"No Aggregated rows in {path}")
+    return np.concatenate(starts), np.concatenate(users), last
+
+
+def summarize_run(path, chunksize, settle, bucket_seconds):
+    """Per (endpoint, users) steady-state means and per (endpoint, bucket) time series of one history file"""
+    starts, users, last = load_levels(path, chunksize)
+    first = starts[0]
+    level_sums, series_sums = [], []
+    for chunk in read_chunks(path, chunksize):
+        ts = chunk["Timestamp"].to_numpy()
+        level = np.searchsorted(starts, ts, side="right") - 1
+        steady = (ts >= starts[level] + settle) & (users[level] > 0) & chunk["50%"].notna().to_numpy()
+        if not steady.any():
+            continue
+        frame = chunk.loc[steady, ["Name", *METRICS]].rename(columns=METRICS)
+        frame["Users"] = users[level[steady]]
+        frame["Bucket"] = (ts[steady] - first) // bucket_seconds * bucket_seconds
+        frame["Samples"] = 1
+        level_sums.append(frame.groupby(["Name", "Users"])[[*METRICS.values(), "Samples"]].sum())
+        series_sums.append(frame.groupby(["Name", "Bucket"])[[*METRICS.values(), "Users", "Samples"]].sum())
+    if not level_sums:
+        raise ValueError(f"No steady-state rows in {path}; lower --settle")
+
+    # Partial sums from every chunk -> means per group
+    levels = pd.concat(level_sums).groupby(level=[0, 1]).sum()
+    series = pd.concat(series_sums).groupby(level=[0, 1]).sum()
+    for frame in (levels, series):
+        columns = [c for c in (*METRICS.values(), "Users") if c in frame]
+        frame[columns] = frame[columns].div(frame["Samples"], axis=0)
+    # The spawn ramp ends once a level with users holds longer than the settle time
+    durations = np.diff(np.append(starts, last + 1))
+    held = np.flatnonzero((users > 0) & (durations > settle))
+    ramp_end = starts[held[0]] + settle if len(held) else last
+    return {
+        "levels": levels.reset_index(),
+        "series": series.reset_index(),
+        "duration": int(last - first),
+        "peak_users": int(users.max()),
+        "ramp_trimmed": int(ramp_end - first),
+    }
+
+
+def find_knee(levels, knee_factor, min_efficiency):
+    """Aggregated level rows plus the index of the knee level (or None)"""
+    agg = levels[levels["Name"] == AGGREGATED].sort_values("Users").reset_index(drop=True)
+    if len(agg) < 2:
+        return agg, None
+    x = agg["Users"].to_numpy(dtype=float)
+    rps = agg["rps"].to_numpy()
+    p95 = agg["p95"].to_numpy()
+    # Throughput each extra user adds, relative to the throughput per user at the lowest level
+    marginal = np.diff(rps) / np.diff(x)
+    baseline = rps[0] / x[0] if x[0] else marginal[0]
+    flat = np.concatenate(([False], marginal < min_efficiency * baseline))
+    slow = p95 > knee_factor * p95[0]
+    knees = np.flatnonzero(flat | slow)
+    return agg, int(knees[0]) if len(knees) else None
+
+
+def format_run(path, run, args):
+    levels, series = run["levels"], run["series"]
+    lines = [
+        f"## {os.path.basename(path)}",
+        "",
+        f"- Duration: {run['duration']} s, peak users: {run['peak_users']}",
+        f"- Spawn ramp trimmed: {run['ramp_trimmed']} s (plus {args.settle:g} s after each later change of the user count)",
+        "",
+        "### Steady state by load level",
+        "",
+        "| Users | Endpoint | Req/s | Failures (%) | p50 (ms) | p95 (ms) | p99 (ms) |",
+        "|-------|----------|-------|--------------|----------|----------|----------|",
+    ]
+    ordered = levels.assign(is_agg=levels["Name"] == AGGREGATED).sort_values(["Users", "is_agg", "Name"])
+    for row in ordered.itertuples(index=False):
+        fail_pct = 100 * row.failures / row.rps if row.rps else 0.0
+        name = f"**{row.Name}**" if row.Name == AGGREGATED else row.Name
+        lines.append(
+            f"| {row.Users:.0f} | {name} | {row.rps:.1f} | {fail_pct:.2f} | {row.p50:.0f} | {row.p95:.0f} | {row.p99:.0f} |"
+        )
+
+    agg, knee = find_knee(levels, args.knee_factor, args.min_efficiency)
+    lines += ["", "### Saturation", ""]
+    if len(agg) < 2:
+        lines.append("Only one load level; run a stepped load to locate the knee.")
+    elif knee is None:
+        lines.append(f"No knee up to {agg['Users'].iloc[-1]:.0f} users; throughput still scales.")
+    else:
+        knee_row = agg.iloc[knee]
+        lines.append(
+            f"Knee at {knee_row['Users']:.0f} users: {knee_row['rps']:.1f} req/s, p95 {knee_row['p95']:.0f} ms."
+        )
+        if knee > 0:
+            before = agg.iloc[knee - 1]
+            lines.append(
+                f"Last level before saturation: {before['Users']:.0f} users at {before['rps']:.1f} req/s "
+                f"(p95 {before['p95']:.0f} ms)."
+            )
+
+    agg_series = series[series["Name"] == AGGREGATED].sort_values("Bucket")
+    step = max(1, -(-len(agg_series) // args.max_rows))
+    lines += [
+        "",
+        f"### Aggregated percentiles over time ({args.bucket:g} s buckets)",
+        "",
+        "| t (s) | Users | Req/s | p50 (ms) | p95 (ms) | p99 (ms) |",
+        "|-------|-------|-------|----------|----------|----------|",
+    ]
+    for row in agg_series.iloc[::step].itertuples(index=False):
+        lines.append(
+            f"| {row.Bucket:.0f} | {row.Users:.0f} | {row.rps:.1f} | {row.p50:.0f} | {row.p95:.0f} | {row.p99:.0f} |"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("histories", nargs="+", help="Locust *_stats_history.csv files")
+    parser.add_argument("--output", default="analysis_report.md")
+    parser.add_argument("--settle", type=float, default=10, help="Seconds dropped after each user-count change")
+    parser.add_argument("--bucket", type=float, default=10, help="Time-series bucket in seconds")
+    parser.add_argument("--chunksize", type=int, default=500_000, help="CSV rows per chunk")
+    parser.add_argument("--knee-factor", type=float, default=1.5)
+    parser.add_argument("--min-efficiency", type=float, default=0.5,
+                        help="Knee once an extra user adds less than this share of the baseline req/s per user")
+    parser.add_argument("--max-rows", type=int, default=40, help="Rows of the time-series table per run")
+    args = parser.parse_args()
+
+    report = ["# Load test analysis", ""]
+    for path in args.histories:
+        run = summarize_run(path, args.chunksize, args.settle, args.bucket)
+        series_path = f"{os.path.splitext(args.output)[0]}_{os.path.basename(path).replace('.csv', '')}_series.csv"
+        run["series"].to_csv(series_path, index=False)
+        report += format_run(path, run, args)
+        report += ["", f"Per-endpoint series: `{os.path.basename(series_path)}`", ""]
+
+    with open(args.output, "w") as f:
+        f.write("\n".join(report))
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Open-model (arrival-rate) scheduling for Locust users
+
+A closed model (``wait_time = between(...)``) lowers the offered load as soon
+as the system slows down. Here every user instead owns a share of an
+endpoint's arrival rate and issues requests at pre-computed intended start
+times, whatever the previous response took. Latency is measured from the
+intended start, so time spent queued behind a slow response still counts
+(coordinated-omission correction).
+"""
+import itertools
+import os
+import random
+
+
+class RateProfile:
+    """Arrival-rate multiplier over time, as piecewise-constant segments
+
+    ``segments`` is a sorted list of (start_second, multiplier); the profile
+    ends after ``duration`` seconds.
+    """
+
+    def __init__(self, segments, duration):
+        self.segments = segments
+        self.duration = duration
+
+    @classmethod
+    def constant(cls, duration):
+        return cls([(0, 1.0)], duration)
+
+    @classmethod
+    def step(cls, steps, step_seconds):
+        """Climb to the full rate in ``steps`` equal increments"""
+        return cls([(i * step_seconds, (i + 1) / steps) for i in range(steps)], steps * step_seconds)
+
+    @classmethod
+    def spike(cls, duration, spike_at, spike_seconds, factor):
+        """Full rate, multiplied by ``factor`` for ``spike_seconds`` starting at ``spike_at``"""
+        return cls([(0, 1.0), (spike_at, factor), (spike_at + spike_seconds, 1.0)], duration)
+
+    def multiplier(self, t):
+        current = 0.0
+        for start, multiplier in self.segments:
+            if start > t:
+                break
+            current = multiplier
+        return current if t < self.duration else 0.0
+
+    def next_change(self, t):
+        """Start of the first segment after ``t`` (or the end of the profile)"""
+        for start, _ in self.segments:
+            if start > t:
+                return start
+        return self.duration
+
+
+def profile_from_env():
+    """Profile configured by ARRIVAL_PROFILE (constant|step|spike) and its ARRIVAL_* settings"""
+    kind = os.environ.get("ARRIVAL_PROFILE", "constant")
+    duration = float(os.environ.get("ARRIVAL_DURATION", "300"))
+    if kind == "constant":
+        return RateProfile.constant(duration)
+    if kind == "step":
+        steps = int(os.environ.get("ARRIVAL_STEPS", "5"))
+        return RateProfile.step(steps, duration / steps)
+    if kind == "spike":
+        return RateProfile.spike(
+            duration,
+            float(os.environ.get("ARRIVAL_SPIKE_AT", str(duration / 2))),
+            float(os.environ.get("ARRIVAL_SPIKE_SECONDS", "30")),
+            float(os.environ.get("ARRIVAL_SPIKE_FACTOR", "5")),
+        )
+    raise ValueError(f"Unknown ARRIVAL_PROFILE '{kind}', expected constant, step or spike")
+
+
+def parse_rates(spec):
+    """``"validateTask=50,getUserTasks=20"`` -> {"validateTask": 50.0, "getUserTasks": 20.0}"""
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, rps = entry.split("=")
+        rates[name.strip()] = float(rps)
+    return rates
+
+
+class EndpointAssigner:
+    """Weighted round-robin assignment of a process's users to endpoints
+
+    Users land on endpoints in proportion to their base rates, so each user of
+    endpoint ``e`` carries ``rate_e / (total_users * share_e)``.
+    """
+
+    def __init__(self, rates):
+        total = sum(rates.values())
+        self.shares = {name: rps / total for name, rps in rates.items()}
+        self._assigned = dict.fromkeys(rates, 0)
+        self._count = itertools.count(1)
+
+    def assign(self):
+        n = next(self._count)
+        # Pick the endpoint furthest below its target share
+        name = max(self.shares, key=lambda e: self.shares[e] * n - self._assigned[e])
+        self._assigned[name] += 1
+        return name
+
+
+class ArrivalPacer:
+    """Intended start times of one user's requests
+
+    ``rate_fn(t)`` is the user's own arrival rate (requests/sec) ``t`` seconds
+    after ``start``. Gaps are exponential (Poisson arrivals) or fixed.
+    """
+
+    def __init__(self, rate_fn, start, end=None, poisson=True):
+        self.rate_fn = rate_fn
+        self.start = start
+        self.end = end
+        self.poisson = poisson
+        # Random phase so users do not fire in lockstep
+        self.next_time = start + random.random() * (self._gap(0) or 0)
+
+    def _gap(self, t):
+        rate = self.rate_fn(t)
+        if rate <= 0:
+            return None
+        return random.expovariate(rate) if self.poisson else 1 / rate
+
+    def next_intended(self, next_change=None):
+        """Next intended start (epoch seconds), or None once the schedule is over
+
+        ``next_change(t)`` returns when the rate may next change, used to skip
+        periods with a zero rate.
+        """
+        while True:
+            t = self.next_time - self.start
+            if self.end is not None and t >= self.end:
+                return None
+            gap = self._gap(t)
+            if gap is not None:
+                break
+            resume = next_change(t) if next_change else t
+            if resume <= t:
+                return None
+            self.next_time = self.start + resume
+        intended = self.next_time
+        self.next_time = intended + gap
+        return intended
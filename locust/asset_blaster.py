@@ -0,0 +1,274 @@
+"""Static-asset load for the frontend service on pooled keep-alive connections
+
+Replaces the curl loops of heavy_load_test.sh: every worker coroutine owns one
+HTTP/1.1 keep-alive connection and requests the frontend's assets in turn, so
+the load box spends its CPU on requests rather than on fork/exec and
+connection setup. Two modes:
+
+    --concurrency N   N workers, each sending its next request as soon as the last completes
+    --rate R          R requests/s in total, at fixed intended start times; latency is
+                      measured from the intended start, so queueing behind slow responses counts
+
+Latency, bytes and throughput are recorded per asset; --processes spreads the
+workers over several cores. Example:
+
+    python3 asset_blaster.py --host http://35.239.33.10 --rate 5000 --duration 300 --cache-bust
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import queue
+import random
+import resource
+import signal
+import time
+from urllib.parse import urlsplit
+
+from latency_histogram import REPORT_PERCENTILES, ScenarioStats
+from targets import FRONTEND_URL
+
+ASSETS = ("/", "/static/js/main.js", "/static/css/main.css", "/static/media/logo.png")
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection, reopened after errors or when the server closes it"""
+
+    def __init__(self, host, port, hostname):
+        self.address = (host, port)
+        self.hostname = hostname
+        self.reader = self.writer = None
+
+    async def get(self, path, retry=True):
+        """(status, body bytes) of GET ``path``"""
+        reused = self.writer is not None
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(*self.address)
+        self.writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {self.hostname}\r\nUser-Agent: asset-blaster\r\n"
+            "Accept-Encoding: identity\r\n\r\n".encode()
+        )
+        try:
+            head = await self.reader.readuntil(b"\r\n\r\n")
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            if not (reused and retry) or getattr(e, "partial", b""):
+                raise
+            # The server closed the idle connection before reading the request: send it once more on a new one
+            self.close()
+            return await self.get(path, retry=False)
+        lines = head.decode("latin-1").split("\r\n")
+        version, status = lines[0].split(" ", 2)[:2]
+        status = int(status)
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            size = 0
+            while True:
+                chunk = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await self.reader.readexactly(chunk + 2)
+                size += chunk
+                if not chunk:
+                    break
+        elif "content-length" in headers:
+            size = int(headers["content-length"])
+            await self.reader.readexactly(size)
+        elif status in (204, 304) or status < 200:
+            size = 0
+        else:
+            # Body delimited by the connection closing
+            size = len(await self.reader.read())
+            headers["connection"] = "close"
+        tokens = {token.strip() for token in headers.get("connection", "").lower().split(",")}
+        # HTTP/1.0 servers close after every response unless they agreed to keep-alive
+        if "close" in tokens or (version == "HTTP/1.0" and "keep-alive" not in tokens):
+            self.close()
+        return status, size
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class AssetStats(ScenarioStats):
+    """Latency histogram per asset (successful requests), plus failures and body bytes"""
+
+    def __init__(self, assets):
+        super().__init__()
+        for asset in assets:
+            self.histogram(asset)
+        self.failures = dict.fromkeys(assets, 0)
+        self.bytes = dict.fromkeys(assets, 0)
+
+    def summary(self):
+        return {"histograms": super().summary(), "failures": self.failures, "bytes": self.bytes}
+
+    def merge_summary(self, summary):
+        super().merge_summary(summary["histograms"])
+        for asset, failures in summary["failures"].items():
+            self.failures[asset] = self.failures.get(asset, 0) + failures
+        for asset, size in summary["bytes"].items():
+            self.bytes[asset] = self.bytes.get(asset, 0) + size
+
+    def rows(self, seconds):
+        rows = []
+        for asset, hist in self.histograms.items():
+            row = {
+                "asset": asset,
+                "requests": hist.count + self.failures[asset],
+                "failures": self.failures[asset],
+                "rps": (hist.count + self.failures[asset]) / seconds,
+                "bytes": self.bytes[asset],
+                "mb_per_s": self.bytes[asset] / seconds / 1e6,
+            }
+            for p in REPORT_PERCENTILES:
+                row[f"p{p:g}_ms"] = hist.percentile(p) * 1000 if hist.count else None
+            rows.append(row)
+        return rows
+
+
+async def blast(args, workers, rate, stats, progress, slot):
+    """Run ``workers`` connections (sending ``rate`` requests/s in total if set) until the duration or a signal"""
+    parts = urlsplit(args.host)
+    if parts.scheme != "http":
+        raise ValueError("Only plain http:// frontends are supported")
+    host, port = parts.hostname, parts.port or 80
+    assets = args.assets.split(",")
+    bust = f"{random.getrandbits(32):08x}"
+    counter = itertools.count()
+    slots = itertools.count()
+    start = time.perf_counter()
+    deadline = start + args.duration if args.duration else None
+    stop = asyncio.Event()
+
+    async def worker(index):
+        connection = Connection(host, port, parts.netloc)
+        # Each worker starts at a different asset so the mix stays even
+        order = itertools.cycle(assets[index % len(assets):] + assets[:index % len(assets)])
+        try:
+            while not stop.is_set():
+                if rate:
+                    # Open loop: take the next intended send time, however late this worker is for it
+                    intended = start + next(slots) / rate
+                    if deadline is not None and intended >= deadline:
+                        break
+                    delay = intended - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                        if stop.is_set():
+                            break
+                else:
+                    intended = time.perf_counter()
+                asset = next(order)
+                path = f"{asset}?nocache={bust}-{next(counter)}" if args.cache_bust else asset
+                try:
+                    async with asyncio.timeout(args.timeout):
+                        status, size = await connection.get(path)
+                    ok = 200 <= status < 400
+                except (OSError, EOFError, ValueError, asyncio.TimeoutError, asyncio.LimitOverrunError):
+                    connection.close()
+                    ok, size = False, 0
+                if ok:
+                    stats.histograms[asset].record(time.perf_counter() - intended)
+                else:
+                    stats.failures[asset] += 1
+                stats.bytes[asset] += size
+                progress[2 * slot] += 1
+                progress[2 * slot + 1] += not ok
+        finally:
+            connection.close()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    tasks = [loop.create_task(worker(i)) for i in range(workers)]
+    try:
+        async with asyncio.timeout(args.duration or None):
+            await stop.wait()
+    except TimeoutError:
+        stop.set()
+    # Workers finish their request in flight (bounded by its timeout); whatever is still waiting is cancelled
+    _, pending = await asyncio.wait(tasks, timeout=args.timeout)
+    for t in pending:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def run_process(args, workers, rate, progress, slot, results):
+    stats = AssetStats(args.assets.split(","))
+    asyncio.run(blast(args, workers, rate, stats, progress, slot))
+    results.put(stats.summary())
+
+
+def split(total, parts):
+    return [total // parts + (i < total % parts) for i in range(parts)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=FRONTEND_URL, help="Base URL of the frontend")
+    parser.add_argument("--assets", default=",".join(ASSETS), help="Comma-separated asset paths, requested in turn")
+    parser.add_argument("--concurrency", type=int, default=500, help="Keep-alive connections in total")
+    parser.add_argument("--rate", type=float, default=0, help="Requests/s in total (0 = as fast as the connections allow)")
+    parser.add_argument("--duration", type=float, default=0, help="Seconds to run (0 = until Ctrl+C)")
+    parser.add_argument("--cache-bust", action="store_true", help="Add a unique ?nocache= query to every request")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--processes", type=int, default=1, help="Processes to spread the connections over")
+    parser.add_argument("--output", help="Write the per-asset results as JSON to this file")
+    args = parser.parse_args()
+    processes = max(1, min(args.processes, args.concurrency))
+
+    mode = f"{args.rate:g} requests/s over up to {args.concurrency}" if args.rate else f"{args.concurrency}"
+    print(f"Blasting {args.host} with {mode} keep-alive connections in {processes} process(es)"
+          f"{', cache-busting' if args.cache_bust else ''}; Ctrl+C to stop")
+
+    # Per process: requests and failures so far, written by that process only
+    progress = multiprocessing.Array("q", 2 * processes, lock=False)
+    results = multiprocessing.Queue()
+    children = [
+        multiprocessing.Process(target=run_process, args=(args, workers, args.rate / processes, progress, slot, results))
+        for slot, workers in enumerate(split(args.concurrency, processes))
+    ]
+    # Ctrl+C reaches the children, which stop and report; the parent waits for them
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    start = time.perf_counter()
+    for child in children:
+        child.start()
+
+    stats = AssetStats(args.assets.split(","))
+    received, last = 0, 0
+    while received < processes:
+        try:
+            stats.merge_summary(results.get(timeout=5))
+            received += 1
+        except queue.Empty:
+            if not any(child.is_alive() for child in children):
+                break
+            requests = sum(progress[0::2])
+            print(f"{time.perf_counter() - start:7.0f}s {requests:>10} requests "
+                  f"({(requests - last) / 5:.0f}/s) {sum(progress[1::2])} failures")
+            last = requests
+    elapsed = time.perf_counter() - start
+    for child in children:
+        child.join()
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_seconds = usage.ru_utime + usage.ru_stime
+    rows = stats.rows(elapsed)
+    total = sum(row["requests"] for row in rows)
+    report = [f"{elapsed:.0f}s, {total} requests ({total / elapsed:.0f}/s), "
+              f"{cpu_seconds:.1f} CPU seconds ({total / cpu_seconds if cpu_seconds else 0:.0f} requests per CPU second)"]
+    for row in rows:
+        report.append(f"{row['asset']}: {row['requests']} requests, {row['failures']} failures, "
+                      f"{row['rps']:.0f}/s, {row['mb_per_s']:.2f} MB/s")
+    stats.print_report("Static Asset Blast", report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"host": args.host, "seconds": elapsed, "cpu_seconds": cpu_seconds, "assets": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import time
+from locust import LoadTestShape, task, constant, events
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, stats_complete
+from targets import FUNCTIONS_URL
+from clients import ScenarioUser
+from account_pool import load_default_pool
+from payload_pool import JSON_HEADERS, TIMESTAMP, PayloadPool
+
+# Sweeps the batch size of validateTasks, one stage per size, against the one-at-a-time
+# validateTask path (batch size 1), to measure tasks/s and cost per invocation:
+#   BATCH_SIZES=1,10,50,100,500 BATCH_STAGE_SECONDS=60 locust -f batch_validate_test.py --headless
+# With ACCOUNT_POOL set the users are authenticated and the tasks are written to the database;
+# anonymous batches are validated only.
+BATCH_SIZES = [int(size) for size in os.environ.get("BATCH_SIZES", "1,10,50,100,500").split(",")]
+STAGE_SECONDS = float(os.environ.get("BATCH_STAGE_SECONDS", "60"))
+BATCH_USERS = int(os.environ.get("BATCH_USERS", "20"))
+
+account_pool = load_default_pool()
+
+task_payloads = PayloadPool(lambda rng: {
+    "title": f"imported task {rng.randint(1, 100000)}",
+    "description": f"Bulk import from load test at {TIMESTAMP}",
+    "completed": rng.random() < 0.3,
+    "dueDate": None
+})
+
+class BatchStats(ScenarioStats):
+    """Per batch size: "batch <n> invocation" (per request) and "batch <n> per task" (request time / n, once per task)"""
+
+    def record(self, size, seconds):
+        self.histogram(f"batch {size} invocation").record(seconds)
+        self.histogram(f"batch {size} per task").record_value(seconds * 1_000_000 / size, size)
+
+    def sweep_lines(self):
+        lines = [f"{'batch':>6} {'calls':>8} {'tasks':>9} {'tasks/s':>9} {'calls/s':>8} {'call p50':>9} {'call p99':>9} {'per task p50':>13}"]
+        for size in BATCH_SIZES:
+            calls = self.histograms.get(f"batch {size} invocation")
+            per_task = self.histograms.get(f"batch {size} per task")
+            if not calls or not calls.count:
+                lines.append(f"{size:>6} {'no successful calls':>30}")
+                continue
+            lines.append(
+                f"{size:>6} {calls.count:>8} {per_task.count:>9} {per_task.count / STAGE_SECONDS:>9.1f} "
+                f"{calls.count / STAGE_SECONDS:>8.1f} {calls.percentile(50):>8.4f}s {calls.percentile(99):>8.4f}s "
+                f"{per_task.percentile(50):>12.5f}s"
+            )
+        return lines
+
+stats = BatchStats()
+share_with_master(stats, "batch_stats")
+sweep = {"start": None}
+
+def current_batch_size():
+    """Batch size of the running stage (every process counts from its own test start)"""
+    stage = int((time.time() - sweep["start"]) // STAGE_SECONDS)
+    return BATCH_SIZES[min(stage, len(BATCH_SIZES) - 1)]
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    sweep["start"] = time.time()
+    stats.clear()
+
+@stats_complete.add_listener
+def on_stats_complete(environment, **kwargs):
+    print("\n=== Batch Validation Sweep ===")
+    for line in stats.sweep_lines():
+        print(line)
+    print("==============================\n")
+
+class BatchSweepShape(LoadTestShape):
+    """BATCH_USERS users for one stage of STAGE_SECONDS per batch size"""
+
+    def tick(self):
+        if self.get_run_time() >= STAGE_SECONDS * len(BATCH_SIZES):
+            return None
+        return BATCH_USERS, BATCH_USERS
+
+class BatchImportUser(ScenarioUser):
+    """Imports tasks back to back, in batches of the current stage's size"""
+    wait_time = constant(0)
+    host = FUNCTIONS_URL
+
+    def on_start(self):
+        self.headers = dict(JSON_HEADERS)
+        if account_pool:
+            self.headers["Authorization"] = f"Bearer {account_pool.checkout().token}"
+
+    @task
+    def import_tasks(self):
+        size = current_batch_size()
+        if size == 1:
+            # The one-at-a-time path, as the baseline
+            index, body = task_payloads.checkout()
+            context = task_payloads.context(index)
+            path, name, expected = "/validateTask", "/validateTask (batch 1)", b'{"title":"'
+        else:
+            # Pre-encoded task bodies joined into one batch body
+            body = b'{"tasks":[' + b",".join(task_payloads.checkout()[1] for _ in range(size)) + b"]}"
+            context = {}
+            path, name, expected = "/validateTasks", f"/validateTasks (batch {size})", b'{"created":%d,"failed":0,' % size
+
+        start = time.time()
+        with self.client.post(path, data=body, headers=self.headers, name=name, context=context, catch_response=True) as response:
+            elapsed = time.time() - start
+            if response.status_code != 200:
+                response.failure(f"{path} failed: {response.status_code}")
+            elif not response.content.startswith(expected):
+                response.failure(f"Unexpected response: {response.content[:60]!r}")
+            else:
+                stats.record(size, elapsed)
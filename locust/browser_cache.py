@@ -0,0 +1,283 @@
+"""Frontend page loads as a browser makes them, with an emulated HTTP cache
+
+By default the FrontendUser classes GET "/" and nothing else. With
+FRONTEND_MODE=browser every page load is a visit instead: the user fetches
+index.html, parses it for the built script, stylesheet, icon and manifest
+URLs and fetches those too, advertising gzip/deflate (and br when a brotli
+decoder is installed). Each user keeps its own cache that honours
+Cache-Control (max-age, no-cache, no-store), Expires and the heuristic
+freshness browsers apply to responses with only Last-Modified; stale entries
+are revalidated with If-None-Match/If-Modified-Since.
+
+A user's first visit starts with an empty cache; before every later visit the
+cache is kept with probability BROWSER_RETURNING (default 0.8), otherwise the
+user comes back as a new visitor. Requests are named "<path> (first visit)" or
+"<path> (repeat visit)", and the run ends with a report of latency, requests,
+wire and decoded bytes, 304s and cache hits per visit kind.
+"""
+import importlib.util
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from locust import events
+
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, stats_complete
+
+MODE = os.environ.get("FRONTEND_MODE", "page")
+RETURNING = float(os.environ.get("BROWSER_RETURNING", "0.8"))
+
+if MODE not in ("page", "browser"):
+    raise ValueError(f"Unknown FRONTEND_MODE '{MODE}', expected 'page' or 'browser'")
+
+_BROTLI = any(importlib.util.find_spec(name) for name in ("brotli", "brotlicffi"))
+ACCEPT_ENCODING = "gzip, deflate, br" if _BROTLI else "gzip, deflate"
+# Link relations a browser fetches while loading the page
+LINK_RELS = {"stylesheet", "icon", "shortcut", "apple-touch-icon", "manifest", "preload", "modulepreload"}
+# Share of the time since Last-Modified a response without explicit freshness stays fresh (RFC 9111 4.2.2)
+HEURISTIC_FRACTION = 0.1
+VISIT_KINDS = ("first", "repeat")
+COUNTERS = ("visits", "requests", "not_modified", "cache_hits", "wire_bytes", "body_bytes")
+
+
+class AssetParser(HTMLParser):
+    """Same-origin URLs of the scripts, stylesheets, icons and images of a page"""
+
+    def __init__(self, page_path):
+        super().__init__()
+        self.page_path = page_path
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("script", "img"):
+            url = attrs.get("src")
+        elif tag == "link" and LINK_RELS & set((attrs.get("rel") or "").lower().split()):
+            url = attrs.get("href")
+        else:
+            return
+        if not url or url.startswith("data:"):
+            return
+        parts = urlsplit(urljoin(self.page_path, url))
+        if parts.netloc or parts.scheme:
+            return
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        if path not in self.urls:
+            self.urls.append(path)
+
+
+def parse_assets(html, page_path="/"):
+    parser = AssetParser(page_path)
+    parser.feed(html)
+    return parser.urls
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def fresh_until(headers, now):
+    """Time until which a response may be reused without revalidation; None if it must not be stored"""
+    directives = {}
+    for directive in headers.get("Cache-Control", "").lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name] = value.strip('"')
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return now
+    age = float(headers.get("Age") or 0)
+    if directives.get("max-age", "").isdigit():
+        return now + int(directives["max-age"]) - age
+    date = _http_date(headers.get("Date")) or now
+    if "Expires" in headers:
+        # An invalid date (e.g. "0") means already expired
+        expires = _http_date(headers["Expires"])
+        return now + (expires - date) - age if expires is not None else now
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if last_modified is not None and last_modified < date:
+        return now + HEURISTIC_FRACTION * (date - last_modified) - age
+    return now
+
+
+def wire_size(response):
+    """Body bytes as transferred, before the client decoded any Content-Encoding"""
+    declared = response.headers.get("Content-Length")
+    if declared and declared.isdigit():
+        return int(declared)
+    raw = getattr(response, "raw", None)
+    if hasattr(raw, "tell"):
+        try:
+            return raw.tell()
+        except (OSError, ValueError):
+            pass
+    return len(response.content or b"")
+
+
+class VisitStats(ScenarioStats):
+    """Visit load times plus request, byte and cache counters per visit kind"""
+    metrics = {
+        "first_visit_times": "First visit load time",
+        "repeat_visit_times": "Repeat visit load time",
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.counters = {kind: dict.fromkeys(COUNTERS, 0) for kind in VISIT_KINDS}
+
+    def count(self, kind, **values):
+        for name, value in values.items():
+            self.counters[kind][name] += value
+
+    def clear(self):
+        super().clear()
+        self.counters = {kind: dict.fromkeys(COUNTERS, 0) for kind in VISIT_KINDS}
+
+    def summary(self):
+        if not any(counters["visits"] for counters in self.counters.values()):
+            return {}
+        return {"histograms": super().summary(), "counters": self.counters}
+
+    def merge_summary(self, summary):
+        super().merge_summary(summary["histograms"])
+        for kind, counters in summary["counters"].items():
+            self.count(kind, **counters)
+
+    def visit_lines(self):
+        lines = []
+        for kind in VISIT_KINDS:
+            c = self.counters[kind]
+            if not c["visits"]:
+                lines.append(f"{kind.capitalize()} visits: none")
+                continue
+            visits = c["visits"]
+            ratio = f", {c['body_bytes'] / c['wire_bytes']:.1f}x" if c["wire_bytes"] else ""
+            lines.append(
+                f"{kind.capitalize()} visits: {visits}, {c['requests'] / visits:.1f} requests, "
+                f"{c['wire_bytes'] / visits / 1024:.1f} KB on the wire ({c['body_bytes'] / visits / 1024:.1f} KB decoded{ratio}), "
+                f"{c['not_modified'] / visits:.1f} 304s and {c['cache_hits'] / visits:.1f} cache hits per visit"
+            )
+        first, repeat = (self.counters[kind] for kind in VISIT_KINDS)
+        if first["visits"] and repeat["visits"] and first["wire_bytes"]:
+            saved = 1 - (repeat["wire_bytes"] / repeat["visits"]) / (first["wire_bytes"] / first["visits"])
+            lines.append(f"Repeat visits transfer {100 * saved:.0f}% fewer bytes than first visits")
+        return lines
+
+
+stats = VisitStats()
+
+
+class BrowserCache:
+    """One user's HTTP cache: path -> validators, freshness and, for pages, the assets they reference"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def fetch(self, client, path, kind, failure):
+        """Cache entry of ``path``, from the cache if fresh, else by a (conditional) GET; None on failure"""
+        now = time.time()
+        entry = self.entries.get(path)
+        if entry is not None and now < entry["fresh_until"]:
+            stats.count(kind, cache_hits=1)
+            return entry
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}
+        if entry is not None and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        with client.get(path, headers=headers, name=f"{path} ({kind} visit)", catch_response=True) as response:
+            stats.count(kind, requests=1)
+            if response.status_code == 304 and entry is not None:
+                stats.count(kind, not_modified=1)
+                response.success()
+                entry["fresh_until"] = fresh_until(response.headers, now) or now
+                return entry
+            if response.status_code != 200:
+                response.failure(f"{failure}: {path} returned {response.status_code}")
+                return None
+            response.success()
+            body = response.content or b""
+            stats.count(kind, wire_bytes=wire_size(response), body_bytes=len(body))
+            entry = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fresh_until": fresh_until(response.headers, now),
+                "assets": [],
+            }
+            if "html" in response.headers.get("Content-Type", ""):
+                entry["assets"] = parse_assets(body.decode("utf-8", "replace"), path)
+            if entry["fresh_until"] is None:
+                self.entries.pop(path, None)
+            else:
+                self.entries[path] = entry
+            return entry
+
+    def visit(self, client, failure, path="/"):
+        """Load the page and its assets; the elapsed seconds, or None if the page failed"""
+        if self.entries and random.random() >= RETURNING:
+            self.entries.clear()
+        kind = "repeat" if self.entries else "first"
+        start = time.time()
+        page = self.fetch(client, path, kind, failure)
+        if page is None:
+            return None
+        for asset in page["assets"]:
+            self.fetch(client, asset, kind, failure)
+        elapsed = time.time() - start
+        stats.count(kind, visits=1)
+        stats.histogram(f"{kind}_visit_times").record(elapsed)
+        return elapsed
+
+
+def page_load(user, histogram, failure):
+    """Load the frontend page for a scenario task and record the load time in ``histogram``
+
+    A plain GET of "/" by default, a full browser visit with FRONTEND_MODE=browser.
+    Returns False if the page failed to load.
+    """
+    if MODE == "browser":
+        cache = getattr(user, "browser_cache", None)
+        if cache is None:
+            cache = user.browser_cache = BrowserCache()
+        elapsed = cache.visit(user.client, failure)
+        if elapsed is None:
+            return False
+        histogram.record(elapsed)
+        return True
+
+    start_time = time.time()
+    with user.client.get("/", catch_response=True) as response:
+        histogram.record(time.time() - start_time)
+        if response.status_code == 200:
+            response.success()
+            return True
+        response.failure(f"{failure}: {response.status_code}")
+        return False
+
+
+_installed = False
+
+
+def install_browser_cache():
+    """Report first and repeat visits at the end of the run, if FRONTEND_MODE=browser"""
+    global _installed
+    if MODE != "browser" or _installed:
+        return
+    _installed = True
+    share_with_master(stats, "browser_visits")
+
+    @events.test_start.add_listener
+    def on_test_start(environment, **kwargs):
+        stats.clear()
+
+    @stats_complete.add_listener
+    def on_stats_complete(environment, **kwargs):
+        stats.print_report("Browser Visits", stats.visit_lines())
@@ -0,0 +1,260 @@
+"""Find the maximum sustainable request rate of one scenario task under a latency/error SLO
+
+Runs Locust in-process and replays a single task of a scenario as an open
+model (see arrival_shapes.py) at a controlled arrival rate. Each offered-load
+level is held until its p95 settles, then judged against the SLO. The rate
+grows geometrically until the first failing level, then is bisected until the
+gap between passing and failing levels is small or the time budget runs out.
+
+    python3 capacity_search.py cloud_function_test.py CloudFunctionUser.validate_task \\
+        --slo-p95-ms 800 --max-error-rate 1 --budget 1200
+
+Latency is measured from each request's intended start, so queueing behind a
+saturated backend counts against the SLO. One process drives the load; point
+--users above the expected rate x latency.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import gevent
+from locust import events
+from locust.env import Environment
+
+from arrival_shapes import ArrivalPacer
+from latency_histogram import LatencyHistogram
+
+
+def load_task(locustfile, target):
+    """User class and task function for ``"UserClass.task_name"`` in ``locustfile``"""
+    path = os.path.abspath(locustfile)
+    sys.path.insert(0, os.path.dirname(path))
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    class_name, task_name = target.split(".")
+    user_class = getattr(module, class_name)
+    return user_class, getattr(user_class, task_name)
+
+
+class LoadController:
+    """Offered rate shared by every search user, plus the measurements of the current window"""
+
+    def __init__(self, users):
+        self.users = users
+        self.rps = 0.0
+        self.generation = 0
+        self.new_window()
+
+    def set_rate(self, rps):
+        self.rps = rps
+        # Users rebuild their pacers so backlog from the previous level is dropped
+        self.generation += 1
+
+    def new_window(self):
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.failures = 0
+        self.window_start = time.time()
+
+
+def make_search_user(user_class, task_fn, controller):
+    """Subclass of the scenario user that runs only ``task_fn``, paced by ``controller``"""
+
+    def paced_task(user):
+        if user.search_generation != controller.generation:
+            user.search_generation = controller.generation
+            user.search_pacer = ArrivalPacer(lambda t: controller.rps / controller.users, time.time())
+        intended = user.search_pacer.next_intended()
+        if intended is None:
+            gevent.sleep(0.1)
+            return
+        delay = intended - time.time()
+        if delay > 0:
+            gevent.sleep(delay)
+        task_fn(user)
+        controller.latency.record(time.time() - intended)
+
+    return type(
+        f"Search{user_class.__name__}",
+        (user_class,),
+        {
+            "tasks": [paced_task],
+            "wait_time": lambda self: 0,
+            "search_generation": -1,
+            "search_pacer": None,
+        },
+    )
+
+
+def summarize(offered, hist, requests, failures, seconds, stable):
+    return {
+        "offered_rps": offered,
+        "achieved_rps": hist.count / seconds if seconds else 0.0,
+        "requests": requests,
+        "error_rate": 100.0 * failures / requests if requests else 0.0,
+        "p50_ms": hist.percentile(50) * 1000,
+        "p95_ms": hist.percentile(95) * 1000,
+        "p99_ms": hist.percentile(99) * 1000,
+        "max_ms": hist.max / 1000,
+        "stable": stable,
+        "histogram": hist.to_dict(),
+    }
+
+
+def run_level(controller, rps, args, deadline):
+    """Hold ``rps`` until p95 settles (or max hold / budget runs out) and summarize the settled windows"""
+    controller.set_rate(rps)
+    gevent.sleep(args.warmup)
+    windows = []
+    level_start = time.time()
+    while True:
+        controller.new_window()
+        gevent.sleep(args.window)
+        windows.append((controller.latency, controller.requests, controller.failures, time.time() - controller.window_start))
+        recent = windows[-args.stable_windows:]
+        p95s = [w[0].percentile(95) for w in recent]
+        stable = len(recent) == args.stable_windows and max(p95s) - min(p95s) <= args.tolerance * (sum(p95s) / len(p95s))
+        hopeless = len(windows) >= 2 and min(p95s[-2:]) * 1000 > 3 * args.slo_p95_ms
+        if stable or hopeless or time.time() - level_start >= args.max_hold or time.time() >= deadline:
+            break
+
+    merged = LatencyHistogram()
+    for hist, _, _, _ in recent:
+        merged.merge(hist)
+    result = summarize(
+        rps, merged, sum(w[1] for w in recent), sum(w[2] for w in recent), sum(w[3] for w in recent), stable
+    )
+    result["passed"] = (
+        result["p95_ms"] < args.slo_p95_ms
+        and result["error_rate"] < args.max_error_rate
+        and result["achieved_rps"] >= 0.95 * rps
+    )
+    return result
+
+
+def find_knee(levels, factor):
+    """Lowest offered rate whose p95 exceeds ``factor`` x the p95 at the lowest level, or throughput falls behind"""
+    ordered = sorted(levels, key=lambda level: level["offered_rps"])
+    baseline = ordered[0]["p95_ms"] if ordered else 0
+    for level in ordered:
+        if level["p95_ms"] > factor * baseline or level["achieved_rps"] < 0.95 * level["offered_rps"]:
+            return level
+    return None
+
+
+def write_report(args, levels, knee, best):
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(os.path.join(args.output_dir, "levels.json"), "w") as f:
+        json.dump({"target": args.target, "levels": levels}, f, indent=2)
+
+    lines = [
+        f"# Capacity search: {args.target}",
+        "",
+        f"SLO: p95 < {args.slo_p95_ms:g} ms, error rate < {args.max_error_rate:g}%",
+        "",
+        f"- Max sustainable throughput: {best['achieved_rps']:.1f} req/s (offered {best['offered_rps']:.1f})"
+        if best else "- No level met the SLO",
+        f"- Knee: {knee['offered_rps']:.1f} req/s offered (p95 {knee['p95_ms']:.0f} ms)"
+        if knee else "- No knee within the levels tested",
+        "",
+        "| Offered rps | Achieved rps | p50 (ms) | p95 (ms) | p99 (ms) | Errors | Stable | SLO |",
+        "|-------------|--------------|----------|----------|----------|--------|--------|-----|",
+    ]
+    for level in levels:
+        lines.append(
+            f"| {level['offered_rps']:.1f} | {level['achieved_rps']:.1f} | {level['p50_ms']:.0f} | {level['p95_ms']:.0f} "
+            f"| {level['p99_ms']:.0f} | {level['error_rate']:.2f}% | {'yes' if level['stable'] else 'no'} "
+            f"| {'pass' if level['passed'] else 'fail'} |"
+        )
+    lines.append("\nPer-level latency histograms are in levels.json.")
+    report = "\n".join(lines) + "\n"
+    with open(os.path.join(args.output_dir, "capacity_report.md"), "w") as f:
+        f.write(report)
+    print(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("locustfile")
+    parser.add_argument("target", help="UserClass.task_name, e.g. CloudFunctionUser.validate_task")
+    parser.add_argument("--slo-p95-ms", type=float, required=True)
+    parser.add_argument("--max-error-rate", type=float, default=1.0, help="Percent")
+    parser.add_argument("--budget", type=float, default=900, help="Total search time in seconds")
+    parser.add_argument("--start-rps", type=float, default=10)
+    parser.add_argument("--max-rps", type=float, default=10000)
+    parser.add_argument("--growth", type=float, default=2.0, help="Rate multiplier while no level has failed")
+    parser.add_argument("--resolution", type=float, default=0.05, help="Stop when pass/fail rates are this close")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--host")
+    parser.add_argument("--request-name", help="Only count errors of requests with this name")
+    parser.add_argument("--warmup", type=float, default=10)
+    parser.add_argument("--window", type=float, default=10)
+    parser.add_argument("--stable-windows", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative p95 spread of a settled level")
+    parser.add_argument("--max-hold", type=float, default=120)
+    parser.add_argument("--knee-factor", type=float, default=1.5)
+    parser.add_argument("--output-dir", default="capacity_results")
+    args = parser.parse_args()
+
+    user_class, task_fn = load_task(args.locustfile, args.target)
+    controller = LoadController(args.users)
+
+    @events.request.add_listener
+    def on_request(name, exception, **kwargs):
+        if args.request_name and name != args.request_name:
+            return
+        controller.requests += 1
+        if exception:
+            controller.failures += 1
+
+    env = Environment(user_classes=[make_search_user(user_class, task_fn, controller)], events=events, host=args.host)
+    runner = env.create_local_runner()
+    events.init.fire(environment=env, runner=runner, web_ui=None)
+    runner.start(args.users, spawn_rate=args.users)
+
+    deadline = time.time() + args.budget
+    levels = []
+    passed, failed = None, None
+    rps = args.start_rps
+    try:
+        while time.time() < deadline:
+            print(f"Holding {rps:.1f} req/s ...")
+            level = run_level(controller, rps, args, deadline)
+            levels.append(level)
+            print(
+                f"  p95={level['p95_ms']:.0f}ms errors={level['error_rate']:.2f}% "
+                f"achieved={level['achieved_rps']:.1f} -> {'pass' if level['passed'] else 'fail'}"
+            )
+            if level["passed"]:
+                passed = level
+            else:
+                failed = level
+                if level["achieved_rps"] < 0.95 * rps and level["p95_ms"] < args.slo_p95_ms:
+                    print("  Throughput fell short at low latency; the generator may be saturated, raise --users")
+
+            if failed is None:
+                if rps >= args.max_rps:
+                    break
+                rps = min(rps * args.growth, args.max_rps)
+            elif passed is None:
+                if rps <= args.start_rps / 64:
+                    break
+                rps = rps / args.growth
+            else:
+                low, high = passed["offered_rps"], failed["offered_rps"]
+                if high <= low or (high - low) / low <= args.resolution:
+                    break
+                rps = (low + high) / 2
+    finally:
+        runner.quit()
+
+    best = max((level for level in levels if level["passed"]), key=lambda level: level["achieved_rps"], default=None)
+    write_report(args, levels, find_knee(levels, args.knee_factor), best)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""HTTP client selection shared by every scenario user class"""
+import itertools
+import os
+from locust import FastHttpUser, HttpUser
+from event_sink import install_event_sink
+from request_trace import install_trace_recorder
+from cold_start import install_cold_start_tracker
+from failure_fingerprints import install_failure_fingerprints
+from metrics_exporter import install_metrics_exporter
+from browser_cache import install_browser_cache
+import connection_strategy
+import phase_timing
+
+# LOADTEST_CLIENT=fast runs the scenarios on geventhttpclient instead of python-requests
+CLIENT = os.environ.get("LOADTEST_CLIENT", "requests")
+
+_CLIENT_USERS = {
+    "requests": HttpUser,
+    "fast": FastHttpUser,
+}
+
+if CLIENT not in _CLIENT_USERS:
+    raise ValueError(f"Unknown LOADTEST_CLIENT '{CLIENT}', expected one of {', '.join(_CLIENT_USERS)}")
+if phase_timing.ENABLED and CLIENT != "requests":
+    raise ValueError("PHASE_TIMING=1 instruments python-requests; use it with LOADTEST_CLIENT=requests")
+if connection_strategy.STRATEGY != "keepalive" and CLIENT != "requests":
+    raise ValueError("CONNECTION_STRATEGY configures python-requests sessions; use it with LOADTEST_CLIENT=requests")
+if connection_strategy.STRATEGY == "http2" and phase_timing.ENABLED:
+    raise ValueError("PHASE_TIMING=1 times urllib3 connections, which CONNECTION_STRATEGY=http2 bypasses")
+
+# Every scenario imports this module, so per-request logging (EVENT_SINK=path),
+# trace recording (RECORD_TRACE=path), phase timing (PHASE_TIMING=1),
+# Cloud Function cold-start tracking (on unless COLD_START_TRACKING=0), failure
+# fingerprinting, the live metrics endpoint (METRICS_PORT=port), the browser
+# visit report (FRONTEND_MODE=browser) and connection stats (CONNECTION_STRATEGY)
+# are wired up here
+install_event_sink()
+install_trace_recorder()
+phase_timing.install_phase_timing()
+install_cold_start_tracker()
+install_failure_fingerprints()
+install_metrics_exporter()
+install_browser_cache()
+connection_strategy.install_connection_stats()
+
+
+class ScenarioUser(_CLIENT_USERS[CLIENT]):
+    """Base class of the scenario users; same tasks and catch_response semantics on either client"""
+    abstract = True
+    _user_ids = itertools.count()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user_id_in_process = next(ScenarioUser._user_ids)
+        if phase_timing.ENABLED:
+            phase_timing.mount_phase_timing(self.client)
+        if CLIENT == "requests":
+            connection_strategy.configure_session(self.client)
+
+    def context(self):
+        # Merged into every request's event context, e.g. to attribute recorded requests to users
+        return {"user_id": self.user_id_in_process}
@@ -1,36 +1,43 @@
-import random
 import time
 import uuid
-from locust import HttpUser, task, between, events
+from locust import task, between, events
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, stats_complete
+from targets import FUNCTIONS_URL
+from clients import ScenarioUser
+from payload_pool import JSON_HEADERS, TIMESTAMP, PayloadPool
+from response_checks import validated_task_failure
 
 # Constants
-CLOUD_FUNCTION_URL = "https://us-central1-todo-cloud-app-20250521.cloudfunctions.net"
+CLOUD_FUNCTION_URL = FUNCTIONS_URL
 
 # Global stats
-class CustomStats:
-    def __init__(self):
-        self.validation_times = []
-        
-    def clear(self):
-        self.validation_times = []
-        
-    def get_avg_validation_time(self):
-        return sum(self.validation_times) / len(self.validation_times) if self.validation_times else 0
+class CustomStats(ScenarioStats):
+    metrics = {
+        "validation_times": "Validation Time",
+    }
 
 stats = CustomStats()
+share_with_master(stats, "cloud_function_stats")
+
+# Random task data with a mix of capitalization, encoded once up front
+task_payloads = PayloadPool(lambda rng: {
+    "title": f"{rng.choice(['task', 'Task', 'TASK'])} {rng.randint(1, 1000)}",
+    "description": f"Auto-generated task from load test at {TIMESTAMP}",
+    "completed": rng.choice([True, False]),
+    "dueDate": None
+})
 
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
     print(f"Starting Cloud Function load test with {environment.runner.user_count} users")
     stats.clear()
 
-@events.test_stop.add_listener
-def on_test_stop(environment, **kwargs):
-    print("\n=== Cloud Function Test Results ===")
-    print(f"Average validation time: {stats.get_avg_validation_time():.4f} seconds")
-    print("==================================\n")
+@stats_complete.add_listener
+def on_stats_complete(environment, **kwargs):
+    stats.print_report("Cloud Function Test Results")
 
-class CloudFunctionUser(HttpUser):
+class CloudFunctionUser(ScenarioUser):
     """This user class tests the Cloud Function directly with high load"""
     wait_time = between(0.1, 1)  # More aggressive timing to stress test
     host = CLOUD_FUNCTION_URL
@@ -38,37 +45,26 @@ class CloudFunctionUser(HttpUser):
     @task
     def validate_task(self):
         """Directly test the serverless function under load"""
-        # Generate random task data with a mix of capitalization
-        title_options = [
-            f"task {random.randint(1, 1000)}",  # lowercase
-            f"Task {random.randint(1, 1000)}",  # Title case
-            f"TASK {random.randint(1, 1000)}",  # ALL CAPS
-        ]
-        
-        task_data = {
-            "title": random.choice(title_options),
-            "description": f"Auto-generated task from load test at {time.time()}",
-            "completed": random.choice([True, False]),
-            "dueDate": None
-        }
+        index, body = task_payloads.checkout()
         
         # Directly call the Cloud Function
         start_time = time.time()
         with self.client.post(
             "/validateTask",
-            json=task_data,
+            data=body,
+            context=task_payloads.context(index),
+            headers=JSON_HEADERS,
             catch_response=True
         ) as response:
             validation_time = time.time() - start_time
-            stats.validation_times.append(validation_time)
+            stats.validation_times.record(validation_time)
             
             if response.status_code == 200:
-                validated_task = response.json()
-                # Verify the task title has been capitalized correctly
-                if validated_task['title'][0].isupper():
-                    response.success()
-                    print(f"Task validated: {validated_task['title']} (in {validation_time:.3f}s)")
+                # Verify the task title has been capitalized correctly (fully parsed on a sample)
+                failure = validated_task_failure(response)
+                if failure:
+                    response.failure(failure)
                 else:
-                    response.failure(f"Task title not properly capitalized: {validated_task['title']}")
+                    response.success()
             else:
                 response.failure(f"Cloud Function failed: {response.text}") 
\ No newline at end of file
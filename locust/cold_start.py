@@ -0,0 +1,309 @@
+"""Cold-start detection and separate reporting for the Cloud Function endpoints
+
+Requests to the functions (signup, login, verifyToken, validateTask(s),
+getUserTasks) are classified cold or warm by the X-Cold-Start marker the
+functions and the stand-in send. Responses without it (older deployments,
+STANDIN_COLD_START_MARKERS=0) are classified afterwards instead: only if the
+function's latencies hold a clearly separate slow mode (a two-component
+log-normal fit beating one component, with a valley between the modes) is
+the split between the two modes used; otherwise they all count as warm.
+
+The end-of-run report gives, per function, the cold-start rate, the cold-start
+latency distribution and the warm-only percentiles, for the whole run and per
+COLD_START_WINDOW seconds, so a warm p99 is no longer inflated by a burst of
+instance starts. COLD_START_CSV=path also writes the per-window table.
+Disable with COLD_START_TRACKING=0.
+"""
+import csv
+import math
+import os
+import time
+from urllib.parse import urlsplit
+
+from locust import events
+
+from latency_histogram import REPORT_PERCENTILES, LatencyHistogram, ScenarioStats
+from stats_sync import share_with_master, stats_complete
+
+ENABLED = os.environ.get("COLD_START_TRACKING", "1") == "1"
+WINDOW = float(os.environ.get("COLD_START_WINDOW", "60"))
+REPORT_CSV = os.environ.get("COLD_START_CSV")
+# Unmarked latencies count as a separate slow mode only if its mean is this many times the fast one's
+MIN_MODE_RATIO = float(os.environ.get("COLD_START_MIN_RATIO", "3"))
+
+FUNCTIONS = ("signup", "login", "verifyToken", "validateTask", "validateTasks", "getUserTasks")
+# Floor of a component's log-latency variance, so a mode in a single bucket stays finite
+MIN_LOG_VARIANCE = 0.01 ** 2
+EM_ITERATIONS = 30
+# Fast-class shares the two-component fit is also started from
+START_FAST_SHARES = (0.9, 0.99)
+# Per-window histograms are many, so they are kept coarser (3% error)
+WINDOW_PRECISION_BITS = 5
+
+
+def function_of(url):
+    """Cloud Function a request URL (or path) calls, or None"""
+    name = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return name if name in FUNCTIONS else None
+
+
+def classify(response):
+    """"cold", "warm" or "unmarked" by the response's X-Cold-Start header"""
+    headers = getattr(response, "headers", None)
+    marker = headers.get("X-Cold-Start") if headers is not None else None
+    if marker is None:
+        return "unmarked"
+    return "cold" if marker == "1" else "warm"
+
+
+def _log_points(hist):
+    """(highest value, log of the midpoint, count) of every non-empty bucket"""
+    points = []
+    for i, c in enumerate(hist.counts):
+        if c:
+            low, high = hist.bucket_bounds(i)
+            points.append((high, math.log(max((low + high) / 2, 1)), c))
+    return points
+
+
+def _otsu_split(points):
+    """Index of the last point of the fast class by Otsu's method (max between-class variance), or None"""
+    total = sum(c for _, _, c in points)
+    total_sum = sum(x * c for _, x, c in points)
+    best, split = 0, None
+    count = weighted = 0
+    for i, (_, x, c) in enumerate(points[:-1]):
+        count += c
+        weighted += x * c
+        fast_mean = weighted / count
+        slow_mean = (total_sum - weighted) / (total - count)
+        variance = count * (total - count) * (slow_mean - fast_mean) ** 2
+        if variance > best:
+            best, split = variance, i
+    return split
+
+
+def _log_pdf(x, mean, variance):
+    return -0.5 * (math.log(2 * math.pi * variance) + (x - mean) ** 2 / variance)
+
+
+def _moments(points, weights):
+    n = sum(w * c for (_, _, c), w in zip(points, weights))
+    mean = sum(w * c * x for (_, x, c), w in zip(points, weights)) / n
+    variance = sum(w * c * (x - mean) ** 2 for (_, x, c), w in zip(points, weights)) / n
+    return n, mean, max(variance, MIN_LOG_VARIANCE)
+
+
+def _fit_two(points, split, total):
+    """EM fit of two log-normal components, started from the classes split after point ``split``
+
+    Returns (log-likelihood, (fast weight, fast mean, fast variance, slow mean,
+    slow variance), fast membership of every point), or None if a component empties.
+    """
+    fast_share = [1.0 if i <= split else 0.0 for i in range(len(points))]
+    for _ in range(EM_ITERATIONS):
+        n_fast, m_fast, v_fast = _moments(points, fast_share)
+        n_slow, m_slow, v_slow = _moments(points, [1 - w for w in fast_share])
+        if n_fast < 1 or n_slow < 1:
+            return None
+        w_fast = n_fast / total
+        fast_share = []
+        log_likelihood = 0.0
+        for _, x, c in points:
+            fast = math.log(w_fast) + _log_pdf(x, m_fast, v_fast)
+            slow = math.log(1 - w_fast) + _log_pdf(x, m_slow, v_slow)
+            top = max(fast, slow)
+            likelihood = top + math.log(math.exp(fast - top) + math.exp(slow - top))
+            log_likelihood += c * likelihood
+            fast_share.append(math.exp(fast - likelihood))
+    return log_likelihood, (w_fast, m_fast, v_fast, m_slow, v_slow), fast_share
+
+
+def slow_mode_threshold(hist):
+    """Split point between a fast and a separate slow mode of ``hist``, or None if there is no such mode
+
+    Fits one and two log-normal components to the latencies (EM on the
+    log-latency histogram, started from Otsu's split and from a few tail
+    shares, best fit kept). A slow mode is only accepted if the two-component
+    fit wins on BIC, the components are clearly separated (Ashman's D > 2, a
+    near-empty valley between them), the slow one is MIN_MODE_RATIO times
+    slower and holds the minority of requests; a single skewed or long-tailed
+    distribution fails these. Returns the highest value still more likely to
+    belong to the fast mode.
+    """
+    points = _log_points(hist)
+    if len(points) < 2:
+        return None
+    total, mean, variance = _moments(points, [1] * len(points))
+    one_component = sum(c * _log_pdf(x, mean, variance) for _, x, c in points)
+
+    # Otsu favours balanced classes, so also start from splits leaving a small slow tail
+    starts = {_otsu_split(points)}
+    cumulative = 0
+    shares = iter(START_FAST_SHARES)
+    share = next(shares)
+    for i, (_, _, c) in enumerate(points[:-1]):
+        cumulative += c
+        while share is not None and cumulative >= share * total:
+            starts.add(i)
+            share = next(shares, None)
+    fits = [fit for fit in (_fit_two(points, split, total) for split in starts if split is not None) if fit]
+    if not fits:
+        return None
+    two_components, (w_fast, m_fast, v_fast, m_slow, v_slow), fast_share = max(fits, key=lambda fit: fit[0])
+
+    # BIC: 2 parameters for one component, 5 for two
+    if -2 * two_components + 5 * math.log(total) >= -2 * one_component + 2 * math.log(total):
+        return None
+    if abs(m_slow - m_fast) * math.sqrt(2 / (v_fast + v_slow)) <= 2:
+        return None
+    # A slow mode made of most requests is the service being slow, not cold starts
+    if m_slow - m_fast < math.log(MIN_MODE_RATIO) or w_fast < 0.5:
+        return None
+    threshold = None
+    for (high, x, _), share in zip(points, fast_share):
+        if x < m_slow and share >= 0.5:
+            threshold = high
+    return threshold
+
+
+def split_histogram(hist, threshold):
+    """(fast, slow) histograms of the buckets at or below and above ``threshold``"""
+    fast, slow = LatencyHistogram(hist.precision_bits), LatencyHistogram(hist.precision_bits)
+    for i, c in enumerate(hist.counts):
+        if c:
+            low, high = hist.bucket_bounds(i)
+            (fast if high <= threshold else slow).record_value(min(high, hist.max), c)
+    return fast, slow
+
+
+def _combined(first, second):
+    hist = LatencyHistogram(first.precision_bits)
+    hist.merge(first)
+    hist.merge(second)
+    return hist
+
+
+class ColdStartStats(ScenarioStats):
+    """Histograms named "<function> <cold|warm|unmarked>", per window with an " @<n>" suffix"""
+
+    def record(self, function, kind, seconds, window):
+        self.histogram(f"{function} {kind}").record(seconds)
+        self.histogram(f"{function} {kind} @{window}", WINDOW_PRECISION_BITS).record(seconds)
+
+    def functions(self):
+        return [f for f in FUNCTIONS if any(self._get(f, kind).count for kind in ("cold", "warm", "unmarked"))]
+
+    def windows(self):
+        return sorted({int(name.rsplit(" @", 1)[1]) for name in self.histograms if " @" in name})
+
+    def _get(self, function, kind, window=None):
+        if window is None:
+            return self.histograms.get(f"{function} {kind}") or LatencyHistogram()
+        return self.histograms.get(f"{function} {kind} @{window}") or LatencyHistogram(WINDOW_PRECISION_BITS)
+
+    def cold_warm(self, function, window=None):
+        """(cold, warm, method) histograms of ``function``, whole run or one window"""
+        cold, warm = self._get(function, "cold", window), self._get(function, "warm", window)
+        unmarked = self._get(function, "unmarked", window)
+        if not unmarked.count:
+            return cold, warm, "X-Cold-Start"
+        # Split every window at the threshold of the whole run
+        threshold = slow_mode_threshold(self._get(function, "unmarked"))
+        if threshold is None:
+            unmarked_cold, unmarked_warm = LatencyHistogram(unmarked.precision_bits), unmarked
+            method = "no slow mode in the unmarked latencies"
+        else:
+            unmarked_warm, unmarked_cold = split_histogram(unmarked, threshold)
+            method = f"unmarked latencies split at {threshold / 1_000_000:.3f}s"
+        if not cold.count and not warm.count:
+            return unmarked_cold, unmarked_warm, method
+        # Marked and unmarked responses mixed, e.g. while a deployment rolls out
+        return _combined(cold, unmarked_cold), _combined(warm, unmarked_warm), f"X-Cold-Start and {method}"
+
+    def window_rows(self, function):
+        rows = []
+        for window in self.windows():
+            cold, warm, _ = self.cold_warm(function, window)
+            requests = cold.count + warm.count
+            if requests:
+                rows.append({
+                    "function": function,
+                    "window_start": window * WINDOW,
+                    "requests": requests,
+                    "cold_starts": cold.count,
+                    "cold_rate": cold.count / requests,
+                    "warm_p50": warm.percentile(50),
+                    "warm_p99": warm.percentile(99),
+                    "cold_p50": cold.percentile(50),
+                    "cold_max": cold.max / 1_000_000,
+                })
+        return rows
+
+    def report_lines(self):
+        lines = []
+        for function in self.functions():
+            cold, warm, method = self.cold_warm(function)
+            requests = cold.count + warm.count
+            lines.append(
+                f"{function}: {requests} requests, {cold.count} cold starts "
+                f"({100 * cold.count / requests:.2f}%) [{method}]"
+            )
+            for label, hist in (("cold", cold), ("warm", warm)):
+                if hist.count:
+                    percentiles = " ".join(f"p{p:g}={hist.percentile(p):.4f}s" for p in REPORT_PERCENTILES)
+                    lines.append(f"  {label}: n={hist.count} {percentiles} max={hist.max / 1_000_000:.4f}s")
+            rows = self.window_rows(function)
+            if len(rows) > 1:
+                lines.append(f"  {'from':>7} {'requests':>9} {'cold':>6} {'cold %':>7} {'warm p50':>9} {'warm p99':>9} {'cold p50':>9}")
+                for row in rows:
+                    lines.append(
+                        f"  {row['window_start']:>6.0f}s {row['requests']:>9} {row['cold_starts']:>6} "
+                        f"{100 * row['cold_rate']:>6.2f}% {row['warm_p50']:>8.4f}s {row['warm_p99']:>8.4f}s "
+                        f"{row['cold_p50']:>8.4f}s"
+                    )
+        return lines
+
+    def write_csv(self, path):
+        rows = [row for function in self.functions() for row in self.window_rows(function)]
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["function"])
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+stats = ColdStartStats()
+
+_installed = False
+
+
+def install_cold_start_tracker():
+    """Classify and report Cloud Function cold starts (safe to call from several locustfiles)"""
+    global _installed
+    if not ENABLED or _installed:
+        return
+    _installed = True
+    share_with_master(stats, "cold_start_stats")
+    run = {"start": time.time()}
+
+    @events.request.add_listener
+    def on_request(name, response_time, response=None, url=None, **kwargs):
+        function = function_of(url or name)
+        # Requests that got no response at all say nothing about the instance
+        if function is None or not getattr(response, "status_code", None):
+            return
+        window = int((time.time() - run["start"]) // WINDOW)
+        stats.record(function, classify(response), response_time / 1000, window)
+
+    @events.test_start.add_listener
+    def on_test_start(environment, **kwargs):
+        run["start"] = time.time()
+        stats.clear()
+
+    @stats_complete.add_listener
+    def on_stats_complete(environment, **kwargs):
+        if not stats.functions():
+            return
+        stats.print_report("Cloud Function Cold Starts")
+        if REPORT_CSV:
+            stats.write_csv(REPORT_CSV)
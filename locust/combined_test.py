@@ -1,47 +1,43 @@
-import random
 import time
 import uuid
-from locust import HttpUser, task, between, events
+from locust import task, between, events
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, stats_complete
+from targets import FRONTEND_URL, FUNCTIONS_URL
+from clients import ScenarioUser
+from browser_cache import page_load
+from payload_pool import JSON_HEADERS, TIMESTAMP, PayloadPool
 
 # Constants
-FRONTEND_URL = "http://35.239.33.10"  # GKE Frontend URL
-CLOUD_FUNCTION_URL = "https://us-central1-todo-cloud-app-20250521.cloudfunctions.net"  # Cloud Function
+CLOUD_FUNCTION_URL = FUNCTIONS_URL  # Cloud Function
 
 # Global stats
-class CombinedStats:
-    def __init__(self):
-        self.frontend_times = []
-        self.cloud_function_times = []
-        
-    def clear(self):
-        self.frontend_times = []
-        self.cloud_function_times = []
-        
-    def get_avg_frontend_time(self):
-        return sum(self.frontend_times) / len(self.frontend_times) if self.frontend_times else 0
-        
-    def get_avg_cloud_function_time(self):
-        return sum(self.cloud_function_times) / len(self.cloud_function_times) if self.cloud_function_times else 0
-        
-    def get_total_requests(self):
-        return len(self.frontend_times) + len(self.cloud_function_times)
+class CombinedStats(ScenarioStats):
+    metrics = {
+        "frontend_times": "Frontend Response Time",
+        "cloud_function_times": "Cloud Function Response Time",
+    }
 
 stats = CombinedStats()
+share_with_master(stats, "combined_stats")
+
+task_payloads = PayloadPool(lambda rng: {
+    "title": f"Task {rng.randint(1, 1000)}",
+    "description": f"Test task created at {TIMESTAMP}",
+    "completed": rng.choice([True, False]),
+    "dueDate": None
+})
 
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
     print(f"Starting Combined Test with {environment.runner.user_count} users")
     stats.clear()
 
-@events.test_stop.add_listener
-def on_test_stop(environment, **kwargs):
-    print("\n=== Combined Test Results ===")
-    print(f"Total Requests: {stats.get_total_requests()}")
-    print(f"Average Frontend Response Time: {stats.get_avg_frontend_time():.4f} seconds")
-    print(f"Average Cloud Function Response Time: {stats.get_avg_cloud_function_time():.4f} seconds")
-    print("=============================\n")
+@stats_complete.add_listener
+def on_stats_complete(environment, **kwargs):
+    stats.print_report("Combined Test Results", [f"Total Requests: {stats.total_count()}"])
 
-class FrontendUser(HttpUser):
+class FrontendUser(ScenarioUser):
     """This user class tests the frontend running on GKE"""
     wait_time = between(1, 3)  # More realistic user behavior
     host = FRONTEND_URL
@@ -49,30 +45,14 @@ class FrontendUser(HttpUser):
     @task(4)
     def view_homepage(self):
         """Test loading the homepage - most common operation"""
-        start_time = time.time()
-        with self.client.get("/", catch_response=True) as response:
-            load_time = time.time() - start_time
-            stats.frontend_times.append(load_time)
-            
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Failed to load homepage: {response.status_code}")
+        page_load(self, stats.frontend_times, "Failed to load homepage")
     
     @task(1)
     def simulate_task_actions(self):
         """Simulate various task actions"""
-        start_time = time.time()
-        with self.client.get("/", catch_response=True) as response:
-            action_time = time.time() - start_time
-            stats.frontend_times.append(action_time)
-            
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Failed to simulate task action: {response.status_code}")
+        page_load(self, stats.frontend_times, "Failed to simulate task action")
 
-class CloudFunctionUser(HttpUser):
+class CloudFunctionUser(ScenarioUser):
     """This user class tests the Cloud Function directly"""
     wait_time = between(0.5, 2)  # Slightly more frequent than frontend
     host = CLOUD_FUNCTION_URL
@@ -80,19 +60,13 @@ class CloudFunctionUser(HttpUser):
     @task
     def validate_task(self):
         """Test the serverless task validation function"""
-        # Generate random task data
-        task_data = {
-            "title": f"Task {random.randint(1, 1000)}",
-            "description": f"Test task created at {time.time()}",
-            "completed": random.choice([True, False]),
-            "dueDate": None
-        }
+        index, body = task_payloads.checkout()
         
         # Call the Cloud Function
         start_time = time.time()
-        with self.client.post("/validateTask", json=task_data, catch_response=True) as response:
+        with self.client.post("/validateTask", data=body, headers=JSON_HEADERS, context=task_payloads.context(index), catch_response=True) as response:
             cf_time = time.time() - start_time
-            stats.cloud_function_times.append(cf_time)
+            stats.cloud_function_times.record(cf_time)
             
             if response.status_code == 200:
                 response.success()
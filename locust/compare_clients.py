@@ -0,0 +1,123 @@
+"""Compare requests/sec per generator core of the python-requests and geventhttpclient clients
+
+Runs the same locustfile headless once per client (LOADTEST_CLIENT=requests|fast)
+against the same host and reports achieved throughput, latency and CPU cost.
+Point it at the local stand-in (LOADTEST_TARGET=local) to measure the generator
+rather than the backend:
+
+    python3 compare_clients.py cloud_function_test.py --users 200 --run-time 60s
+"""
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import time
+
+CLIENTS = ("requests", "fast")
+
+
+def read_aggregated_row(stats_csv):
+    """Aggregated row of a Locust <prefix>_stats.csv file"""
+    with open(stats_csv, newline="") as f:
+        for row in csv.DictReader(f):
+            if row["Name"] == "Aggregated":
+                return row
+    raise ValueError(f"No Aggregated row in {stats_csv}")
+
+
+def column(row, *names):
+    """First present column among ``names`` (header names differ between Locust versions)"""
+    for name in names:
+        if name in row and row[name] not in ("", "N/A"):
+            return float(row[name])
+    return 0.0
+
+
+def run_locust(locustfile, csv_prefix, users, spawn_rate, run_time, host=None, env_overrides=None, extra_args=()):
+    """Run one headless Locust process and return its aggregated results and CPU usage
+
+    Locust runs in the directory of ``csv_prefix``: it always reads ./locust.conf,
+    and the one next to the locustfiles would override the scenario's host.
+    Paths passed in ``env_overrides`` must therefore be absolute.
+    """
+    csv_prefix = os.path.abspath(csv_prefix)
+    cmd = [
+        sys.executable, "-m", "locust", "-f", os.path.abspath(locustfile), "--headless",
+        "--users", str(users), "--spawn-rate", str(spawn_rate), "--run-time", run_time,
+        "--csv", csv_prefix, "--only-summary", *extra_args,
+    ]
+    if host:
+        cmd += ["--host", host]
+    env = {**os.environ, **(env_overrides or {})}
+
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.time()
+    subprocess.run(cmd, env=env, check=False, cwd=os.path.dirname(csv_prefix))
+    wall = time.time() - started
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+    row = read_aggregated_row(f"{csv_prefix}_stats.csv")
+    requests = column(row, "Request Count", "# requests")
+    return {
+        "requests": int(requests),
+        "failures": int(column(row, "Failure Count", "# failures")),
+        "rps": column(row, "Requests/s"),
+        "p50": column(row, "50%", "Median Response Time"),
+        "p95": column(row, "95%"),
+        "p99": column(row, "99%"),
+        "cpu_seconds": cpu,
+        "wall_seconds": wall,
+        # Requests one fully busy core would push at this per-request cost
+        "rps_per_core": requests / cpu if cpu else 0.0,
+    }
+
+
+def format_table(results):
+    lines = [
+        "| Client | Requests | Failures | RPS | p50 (ms) | p95 (ms) | p99 (ms) | CPU (s) | RPS per core |",
+        "|--------|----------|----------|-----|----------|----------|----------|---------|--------------|",
+    ]
+    for name, r in results.items():
+        lines.append(
+            f"| {name} | {r['requests']} | {r['failures']} | {r['rps']:.1f} | {r['p50']:.0f} | {r['p95']:.0f} "
+            f"| {r['p99']:.0f} | {r['cpu_seconds']:.1f} | {r['rps_per_core']:.1f} |"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("locustfile")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--spawn-rate", type=float, default=50)
+    parser.add_argument("--run-time", default="60s")
+    parser.add_argument("--host", help="Override the scenario's host")
+    parser.add_argument("--output-dir", default="client_comparison")
+    parser.add_argument("--clients", default=",".join(CLIENTS), help="Comma-separated clients to run")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    results = {}
+    for client in args.clients.split(","):
+        print(f"=== Running {args.locustfile} with the '{client}' client ===")
+        results[client] = run_locust(
+            args.locustfile,
+            os.path.join(args.output_dir, client),
+            args.users,
+            args.spawn_rate,
+            args.run_time,
+            host=args.host,
+            env_overrides={"LOADTEST_CLIENT": client},
+        )
+
+    table = format_table(results)
+    with open(os.path.join(args.output_dir, "comparison.md"), "w") as f:
+        f.write(f"# Client comparison: {args.locustfile}\n\n{table}\n")
+    print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare connection strategies: a new connection per request, pooled keep-alive, HTTP/2 streams
+
+Runs the same locustfile headless once per CONNECTION_STRATEGY (see
+connection_strategy.py) and reports throughput, latency, connections opened,
+open sockets and negotiated protocols side by side, to see how much of the latency is
+connection setup and what multiplexing saves:
+
+    python3 compare_connections.py cloud_function_test.py --users 200 --run-time 120s
+"""
+import argparse
+import json
+import os
+
+from compare_clients import run_locust
+
+# connection_strategy.STRATEGIES, without importing Locust into this process
+STRATEGIES = ("new", "keepalive", "http2")
+
+
+def format_table(results):
+    lines = [
+        "| Strategy | Requests | Failures | RPS | p50 (ms) | p95 (ms) | p99 (ms) | Connections opened | Open sockets (mean) | Open sockets (peak) | Protocols | CPU (s) |",
+        "|----------|----------|----------|-----|----------|----------|----------|--------------------|---------------------|---------------------|-----------|---------|",
+    ]
+    for name, r in results.items():
+        versions = r["versions"]
+        total = sum(versions.values())
+        protocols = ", ".join(f"{v} {100 * c / total:.0f}%" for v, c in sorted(versions.items())) if total else "-"
+        sockets = (f"{r['mean_sockets']:.1f} | {r['peak_sockets']}" if r["mean_sockets"] is not None else "- | -")
+        lines.append(
+            f"| {name} | {r['requests']} | {r['failures']} | {r['rps']:.1f} | {r['p50']:.0f} | {r['p95']:.0f} "
+            f"| {r['p99']:.0f} | {r['opened'] if r['opened'] is not None else '-'} | {sockets} | {protocols} | {r['cpu_seconds']:.1f} |"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("locustfile")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--spawn-rate", type=float, default=50)
+    parser.add_argument("--run-time", default="60s")
+    parser.add_argument("--host", help="Override the scenario's host")
+    parser.add_argument("--output-dir", default="connection_comparison")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES), help="Comma-separated strategies to run")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    results = {}
+    for strategy in args.strategies.split(","):
+        print(f"=== Running {args.locustfile} with the '{strategy}' connection strategy ===")
+        prefix = os.path.abspath(os.path.join(args.output_dir, strategy))
+        summary_path = f"{prefix}_connections.json"
+        if os.path.exists(summary_path):
+            os.remove(summary_path)
+        result = run_locust(
+            args.locustfile, prefix, args.users, args.spawn_rate, args.run_time, host=args.host,
+            env_overrides={"LOADTEST_CLIENT": "requests", "CONNECTION_STRATEGY": strategy, "CONNECTION_SUMMARY": summary_path},
+        )
+        connections = {"mean_sockets": None, "peak_sockets": None, "samples": 0, "opened": None, "versions": {}}
+        if os.path.exists(summary_path):
+            with open(summary_path) as f:
+                connections.update(json.load(f))
+        if not connections["samples"]:
+            # Nothing sampled (no psutil); a peak of 0 sockets is a real measurement
+            connections["mean_sockets"] = connections["peak_sockets"] = None
+        results[strategy] = {**result, **connections}
+
+    table = format_table(results)
+    with open(os.path.join(args.output_dir, "comparison.md"), "w") as f:
+        f.write(f"# Connection strategy comparison: {args.locustfile}\n\n{table}\n")
+    print(table)
+
+
+if __name__ == "__main__":
+    main()
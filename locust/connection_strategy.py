@@ -0,0 +1,275 @@
+"""How the scenario users connect: a new connection per request, pooled keep-alive, or HTTP/2
+
+CONNECTION_STRATEGY selects it for every ScenarioUser (python-requests client):
+
+    new        every request carries "Connection: close", so each one pays DNS, TCP and TLS setup
+    keepalive  each user's session pools connections per host (the default, as before)
+    http2      requests go through one httpx client per process, so all users of the process share
+               one connection per origin and multiplex their requests as HTTP/2 streams (needs
+               httpx[http2]); HTTP/2 is negotiated over TLS, plain http:// hosts stay on HTTP/1.1
+
+Setting CONNECTION_STRATEGY explicitly also samples the process's open TCP
+sockets every SOCKET_SAMPLE_INTERVAL seconds (needs psutil), counts the
+connections opened (short-lived "new" connections rarely survive until a
+sample) and the negotiated HTTP versions; all are merged on the master,
+reported at the end of the run and, with CONNECTION_SUMMARY=path, written as
+JSON for compare_connections.py.
+"""
+import json
+import os
+import socket
+
+import gevent
+from locust import events
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError, Timeout
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util import connection as urllib3_connection
+
+from stats_sync import share_with_master, stats_complete
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+STRATEGIES = ("new", "keepalive", "http2")
+STRATEGY = os.environ.get("CONNECTION_STRATEGY", "keepalive")
+SAMPLING = "CONNECTION_STRATEGY" in os.environ
+SAMPLE_INTERVAL = float(os.environ.get("SOCKET_SAMPLE_INTERVAL", "1"))
+SUMMARY_PATH = os.environ.get("CONNECTION_SUMMARY")
+
+if STRATEGY not in STRATEGIES:
+    raise ValueError(f"Unknown CONNECTION_STRATEGY '{STRATEGY}', expected one of {', '.join(STRATEGIES)}")
+if STRATEGY == "http2" and httpx is None:
+    raise ValueError("CONNECTION_STRATEGY=http2 needs httpx with HTTP/2 support: pip install 'httpx[http2]'")
+
+# Connection-specific headers, not allowed in HTTP/2 requests
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"}
+
+_http2_client = None
+
+
+def http2_client():
+    """The process-wide httpx client every user's HTTP2Adapter sends through"""
+    global _http2_client
+    if _http2_client is None:
+        _http2_client = httpx.Client(
+            http2=True, timeout=None, follow_redirects=False,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+        )
+    return _http2_client
+
+
+class HTTP2Adapter(BaseAdapter):
+    """requests adapter sending through the shared httpx client
+
+    Locust's HttpSession still times the request, fires the request event and
+    handles catch_response; only the transport changes. Responses carry
+    ``http_version`` ("HTTP/2" or "HTTP/1.1").
+    """
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP]
+        try:
+            r = http2_client().request(
+                request.method, request.url, headers=headers, content=request.body, timeout=timeout,
+                extensions={"trace": trace_connects},
+            )
+        except httpx.TimeoutException as e:
+            raise Timeout(e, request=request)
+        except httpx.HTTPError as e:
+            raise ConnectionError(e, request=request)
+
+        response = Response()
+        response.status_code = r.status_code
+        response.reason = r.reason_phrase
+        response.headers = CaseInsensitiveDict(r.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = r.content
+        response.url = str(r.url)
+        response.request = request
+        response.connection = self
+        response.elapsed = r.elapsed
+        response.http_version = r.http_version
+        return response
+
+    def close(self):
+        pass
+
+
+def trace_connects(event, info):
+    """httpcore trace callback counting the connections httpx opens"""
+    if event == "connection.connect_tcp.complete":
+        stats.count_opened()
+
+
+def counting_connects(create_connection):
+    """urllib3's create_connection, counting every connection python-requests opens"""
+
+    def create_counted_connection(*args, **kwargs):
+        sock = create_connection(*args, **kwargs)
+        stats.count_opened()
+        return sock
+
+    return create_counted_connection
+
+
+def configure_session(session):
+    """Apply the strategy to one user's python-requests session"""
+    if STRATEGY == "new":
+        session.headers["Connection"] = "close"
+    elif STRATEGY == "http2":
+        adapter = HTTP2Adapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+
+def open_sockets():
+    process = psutil.Process()
+    connections = process.net_connections if hasattr(process, "net_connections") else process.connections
+    return len(connections(kind="tcp"))
+
+
+class ConnectionStats:
+    """Open-socket samples per generator process and responses per HTTP version"""
+
+    def __init__(self):
+        self.process = f"{socket.gethostname()}:{os.getpid()}"
+        self.clear()
+
+    def clear(self):
+        # process -> [samples, sum of samples, peak]
+        self.sockets = {}
+        self.versions = {}
+        self.opened = 0
+
+    def sample(self, count):
+        samples = self.sockets.setdefault(self.process, [0, 0, 0])
+        samples[0] += 1
+        samples[1] += count
+        samples[2] = max(samples[2], count)
+
+    def count_opened(self):
+        self.opened += 1
+
+    def count_version(self, version):
+        self.versions[version] = self.versions.get(version, 0) + 1
+
+    def pop_summary(self):
+        if not self.sockets and not self.versions and not self.opened:
+            return None
+        summary = {"sockets": self.sockets, "versions": self.versions, "opened": self.opened}
+        self.clear()
+        return summary
+
+    def merge_summary(self, summary):
+        for process, (samples, total, peak) in summary["sockets"].items():
+            merged = self.sockets.setdefault(process, [0, 0, 0])
+            merged[0] += samples
+            merged[1] += total
+            merged[2] = max(merged[2], peak)
+        for version, count in summary["versions"].items():
+            self.versions[version] = self.versions.get(version, 0) + count
+        self.opened += summary["opened"]
+
+    def samples(self):
+        return sum(samples for samples, _, _ in self.sockets.values())
+
+    def mean_sockets(self):
+        """Open sockets of all processes together, averaged over the run"""
+        return sum(total / samples for samples, total, _ in self.sockets.values() if samples)
+
+    def peak_sockets(self):
+        """Sum of each process's peak (an upper bound of the simultaneous peak)"""
+        return sum(peak for _, _, peak in self.sockets.values())
+
+    def report_lines(self):
+        lines = [f"Strategy: {STRATEGY}"]
+        if self.sockets:
+            lines.append(f"Open TCP sockets: {self.mean_sockets():.1f} on average, {self.peak_sockets()} at peak "
+                         f"({len(self.sockets)} generator processes)")
+        else:
+            lines.append("Open TCP sockets: not sampled (install psutil)")
+        total = sum(self.versions.values())
+        per_response = f" ({self.opened / total:.2f} per response)" if total else ""
+        lines.append(f"Connections opened: {self.opened}{per_response}")
+        if total:
+            lines.append("Responses by protocol: " + ", ".join(
+                f"{version} {100 * count / total:.1f}%" for version, count in sorted(self.versions.items())))
+        return lines
+
+    def to_dict(self):
+        return {
+            "strategy": STRATEGY,
+            "mean_sockets": self.mean_sockets(),
+            "peak_sockets": self.peak_sockets(),
+            "samples": self.samples(),
+            "opened": self.opened,
+            "versions": self.versions,
+        }
+
+
+stats = ConnectionStats()
+
+_installed = False
+
+
+def install_connection_stats():
+    """Sample sockets and protocol versions if CONNECTION_STRATEGY is set (safe to call from several locustfiles)"""
+    global _installed
+    if not SAMPLING or _installed:
+        return
+    _installed = True
+    share_with_master(stats, "connection_stats")
+    urllib3_connection.create_connection = counting_connects(urllib3_connection.create_connection)
+    sampler = {"greenlet": None}
+    if psutil is None:
+        print("psutil is not installed; open sockets will not be sampled")
+
+    def sample_forever():
+        while True:
+            stats.sample(open_sockets())
+            gevent.sleep(SAMPLE_INTERVAL)
+
+    @events.request.add_listener
+    def on_request(response=None, **kwargs):
+        if response is None or getattr(response, "status_code", 0) == 0:
+            return
+        version = getattr(response, "http_version", None)
+        if version is None:
+            raw = getattr(response, "raw", None)
+            version = {10: "HTTP/1.0", 11: "HTTP/1.1"}.get(getattr(raw, "version", 11), "HTTP/1.1")
+        stats.count_version(version)
+
+    @events.test_start.add_listener
+    def on_test_start(environment, **kwargs):
+        stats.clear()
+        # Workers and standalone processes hold the users' sockets; the master only its own
+        is_master = getattr(environment.runner, "clients", None) is not None
+        if psutil is not None and not is_master and sampler["greenlet"] is None:
+            sampler["greenlet"] = gevent.spawn(sample_forever)
+
+    @events.test_stop.add_listener
+    def on_test_stop(environment, **kwargs):
+        if sampler["greenlet"] is not None:
+            sampler["greenlet"].kill()
+            sampler["greenlet"] = None
+
+    @stats_complete.add_listener
+    def on_stats_complete(environment, **kwargs):
+        print("\n=== Connection Strategy ===")
+        for line in stats.report_lines():
+            print(line)
+        print("===========================\n")
+        if SUMMARY_PATH:
+            with open(SUMMARY_PATH, "w") as f:
+                json.dump(stats.to_dict(), f)
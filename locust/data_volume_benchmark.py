@@ -0,0 +1,241 @@
+"""Measure how getUserTasks scales with the number of tasks an account holds
+
+Seeds one account per size with exactly that many tasks, then runs
+data_volume_test.py against each and reports latency, response size and the
+generator's parse cost per size, as CSV, markdown and an SVG plot. --modes
+repeats every size in other getUserTasks modes (task_list.py) to measure what
+pagination, projection and conditional GETs save:
+
+    LOADTEST_TARGET=local python3 data_volume_benchmark.py --sizes 10,1000,10000,100000 --modes full,page,conditional
+
+Accounts are reused across runs (same --prefix): only missing tasks are seeded
+and tokens are refreshed by logging in. Against the stand-in, tasks are seeded
+in bulk with its POST /seedTasks route; against a real deployment, with
+concurrent validateTask calls.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from compare_clients import column, read_aggregated_row, run_locust
+from provision_accounts import provision, session
+from targets import FUNCTIONS_URL
+from task_list import MODES
+
+SIZES = (10, 1000, 10000, 100000)
+LOCUSTFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_volume_test.py")
+
+
+def task_count(host, token):
+    response = session().get(f"{host}/getUserTasks", headers={"Authorization": f"Bearer {token}"}, timeout=300)
+    response.raise_for_status()
+    return len(response.json())
+
+
+def seed(host, token, count, concurrency):
+    """Add ``count`` tasks to the token's account"""
+    headers = {"Authorization": f"Bearer {token}"}
+    response = session().post(f"{host}/seedTasks", json={"count": count}, headers=headers, timeout=300)
+    if response.status_code == 200:
+        return
+    if response.status_code not in (404, 405):
+        response.raise_for_status()
+
+    # Real deployment: no bulk route, create the tasks one by one
+    def create(i):
+        body = {
+            "title": f"Seeded task {i}",
+            "description": "Created by the data-volume benchmark",
+            "completed": i % 3 == 0,
+            "dueDate": None,
+        }
+        for _ in range(3):
+            try:
+                if session().post(f"{host}/validateTask", json=body, headers=headers, timeout=30).status_code == 200:
+                    return True
+            except Exception:
+                pass
+        return False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        created = sum(executor.map(create, range(count)))
+    if created < count:
+        raise RuntimeError(f"Only {created} of {count} tasks could be seeded")
+
+
+def prepare_account(host, prefix, size, concurrency):
+    """(token, task count) of the account seeded with ``size`` tasks"""
+    account = provision(host, f"{prefix}.{size}@example.com", f"Data Volume {size}")
+    if account is None:
+        raise RuntimeError(f"Could not sign up or log in the {size}-task account")
+    existing = task_count(host, account.token)
+    if existing < size:
+        print(f"Seeding {size - existing} tasks ({existing} present) for the {size}-task account")
+        seed(host, account.token, size - existing, concurrency)
+        existing = task_count(host, account.token)
+    if existing != size:
+        print(f"WARNING: the {size}-task account holds {existing} tasks")
+    return account.token, existing
+
+
+def measure(args, size, token, tasks, mode):
+    prefix = os.path.abspath(os.path.join(args.output_dir, f"tasks_{size}_{mode}"))
+    summary_path = f"{prefix}_summary.json"
+    result = run_locust(
+        LOCUSTFILE, prefix, args.users, args.users, args.run_time, host=args.host,
+        env_overrides={
+            "DATA_VOLUME_TOKEN": token,
+            "DATA_VOLUME_TASKS": str(tasks),
+            "DATA_VOLUME_SUMMARY": summary_path,
+            "TASK_LIST_MODE": mode,
+        },
+    )
+    with open(summary_path) as f:
+        summary = json.load(f)
+    return {
+        "tasks": tasks,
+        "mode": mode,
+        "requests": result["requests"],
+        "failures": result["failures"],
+        "rps": result["rps"],
+        "p50_ms": result["p50"],
+        "p95_ms": result["p95"],
+        "p99_ms": result["p99"],
+        "response_bytes": column(read_aggregated_row(f"{prefix}_stats.csv"), "Average Content Size"),
+        "parse_p50_ms": summary["parse_p50"] * 1000,
+        "parse_p95_ms": summary["parse_p95"] * 1000,
+        "generator_cpu_ms_per_request": 1000 * result["cpu_seconds"] / result["requests"] if result["requests"] else 0.0,
+    }
+
+
+def scaling_exponent(rows, key):
+    """Slope of ``key`` over task count on log-log axes (1 = grows linearly with the list)"""
+    points = [(r["tasks"], r[key]) for r in rows if r["tasks"] > 0 and r[key] > 0]
+    points.sort()
+    if len(points) < 2:
+        return None
+    (n0, v0), (n1, v1) = points[0], points[-1]
+    return math.log(v1 / v0) / math.log(n1 / n0) if n1 != n0 else None
+
+
+def modes_of(rows):
+    return list(dict.fromkeys(r["mode"] for r in rows))
+
+
+def format_markdown(rows, host):
+    lines = [
+        f"# getUserTasks data-volume benchmark ({host})", "",
+        "| Tasks | Mode | Requests | Failures | RPS | p50 (ms) | p95 (ms) | p99 (ms) | Response (KB) | Parse p50 (ms) | Parse p95 (ms) | Generator CPU/request (ms) |",
+        "|-------|------|----------|----------|-----|----------|----------|----------|---------------|----------------|----------------|----------------------------|",
+    ]
+    for r in rows:
+        lines.append(
+            f"| {r['tasks']} | {r['mode']} | {r['requests']} | {r['failures']} | {r['rps']:.1f} | {r['p50_ms']:.0f} | {r['p95_ms']:.0f} "
+            f"| {r['p99_ms']:.0f} | {r['response_bytes'] / 1024:.1f} | {r['parse_p50_ms']:.2f} | {r['parse_p95_ms']:.2f} "
+            f"| {r['generator_cpu_ms_per_request']:.2f} |"
+        )
+    lines.append("")
+    for mode in modes_of(rows):
+        mode_rows = [r for r in rows if r["mode"] == mode]
+        for key, label in (("p50_ms", "p50 latency"), ("response_bytes", "Response size"), ("parse_p50_ms", "Parse time")):
+            exponent = scaling_exponent(mode_rows, key)
+            if exponent is not None:
+                lines.append(f"- {mode}: {label} grows as tasks^{exponent:.2f}")
+    return "\n".join(lines) + "\n"
+
+
+def svg_plot(rows, path, width=720, height=440):
+    """Log-log plot of latency and parse time over the task count, per mode"""
+    colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f"]
+    series = []
+    for mode in modes_of(rows):
+        mode_rows = sorted((r for r in rows if r["mode"] == mode), key=lambda r: r["tasks"])
+        series += [(f"{mode} p50 latency", mode_rows, "p50_ms"), (f"{mode} parse p50", mode_rows, "parse_p50_ms")]
+    left, right, top, bottom = 70, 190, 30, 50
+    values = [r[key] for _, series_rows, key in series for r in series_rows if r[key] > 0]
+    tasks = [r["tasks"] for r in rows if r["tasks"] > 0]
+    if not values or not tasks:
+        return
+    x_lo, x_hi = math.floor(math.log10(min(tasks))), math.ceil(math.log10(max(tasks)))
+    y_lo, y_hi = math.floor(math.log10(min(values))), math.ceil(math.log10(max(values)))
+    x_hi, y_hi = max(x_hi, x_lo + 1), max(y_hi, y_lo + 1)
+
+    def x(value):
+        return left + (math.log10(value) - x_lo) / (x_hi - x_lo) * (width - left - right)
+
+    def y(value):
+        return height - bottom - (math.log10(value) - y_lo) / (y_hi - y_lo) * (height - top - bottom)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="sans-serif" font-size="12">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+    ]
+    for exp in range(x_lo, x_hi + 1):
+        px = x(10 ** exp)
+        parts.append(f'<line x1="{px:.1f}" y1="{top}" x2="{px:.1f}" y2="{height - bottom}" stroke="#ddd"/>')
+        parts.append(f'<text x="{px:.1f}" y="{height - bottom + 18}" text-anchor="middle">{10 ** exp:g}</text>')
+    for exp in range(y_lo, y_hi + 1):
+        py = y(10 ** exp)
+        parts.append(f'<line x1="{left}" y1="{py:.1f}" x2="{width - right}" y2="{py:.1f}" stroke="#ddd"/>')
+        parts.append(f'<text x="{left - 8}" y="{py + 4:.1f}" text-anchor="end">{10 ** exp:g}</text>')
+    parts.append(f'<text x="{(left + width - right) / 2}" y="{height - 12}" text-anchor="middle">tasks per account</text>')
+    parts.append(f'<text x="16" y="{(top + height - bottom) / 2}" text-anchor="middle" '
+                 f'transform="rotate(-90 16 {(top + height - bottom) / 2})">milliseconds</text>')
+    for i, (label, series_rows, key) in enumerate(series):
+        color = colors[i % len(colors)]
+        points = [(x(r["tasks"]), y(r[key])) for r in series_rows if r["tasks"] > 0 and r[key] > 0]
+        if points:
+            path_points = " ".join(f"{px:.1f},{py:.1f}" for px, py in points)
+            parts.append(f'<polyline points="{path_points}" fill="none" stroke="{color}" stroke-width="2"/>')
+            parts += [f'<circle cx="{px:.1f}" cy="{py:.1f}" r="3" fill="{color}"/>' for px, py in points]
+        ly = top + 10 + 20 * i
+        parts.append(f'<line x1="{width - right + 15}" y1="{ly}" x2="{width - right + 35}" y2="{ly}" stroke="{color}" stroke-width="2"/>')
+        parts.append(f'<text x="{width - right + 40}" y="{ly + 4}">{label}</text>')
+    parts.append("</svg>")
+    with open(path, "w") as f:
+        f.write("\n".join(parts) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="Comma-separated task counts")
+    parser.add_argument("--modes", default="full", help=f"Comma-separated getUserTasks modes among {', '.join(MODES)}")
+    parser.add_argument("--host", default=FUNCTIONS_URL, help="Base URL of the functions (or the stand-in)")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent users fetching the list")
+    parser.add_argument("--run-time", default="60s", help="Run time per size")
+    parser.add_argument("--prefix", default="datavolume", help="Email local-part prefix of the seeded accounts")
+    parser.add_argument("--seed-concurrency", type=int, default=32)
+    parser.add_argument("--output-dir", default="data_volume")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    rows = []
+    for size in sorted(int(s) for s in args.sizes.split(",")):
+        try:
+            token, tasks = prepare_account(args.host, args.prefix, size, args.seed_concurrency)
+        except Exception as e:
+            print(f"Skipping {size} tasks: {e}")
+            continue
+        for mode in args.modes.split(","):
+            print(f"=== Measuring getUserTasks with {tasks} tasks ({mode} mode) ===")
+            rows.append(measure(args, size, token, tasks, mode))
+    if not rows:
+        sys.exit(1)
+
+    with open(os.path.join(args.output_dir, "data_volume.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    markdown = format_markdown(rows, args.host)
+    with open(os.path.join(args.output_dir, "data_volume.md"), "w") as f:
+        f.write(markdown)
+    svg_plot(rows, os.path.join(args.output_dir, "data_volume.svg"))
+    print(markdown)
+
+
+if __name__ == "__main__":
+    main()
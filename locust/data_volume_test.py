@@ -0,0 +1,89 @@
+import json
+import os
+import time
+from locust import task, constant, events
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, stats_complete
+from targets import FUNCTIONS_URL
+from clients import ScenarioUser
+from response_checks import check_body
+from task_list import MODE, PAGE_SIZE, TaskListFetcher
+
+# Fetches the task list of one account seeded with a known number of tasks,
+# in the getUserTasks mode TASK_LIST_MODE selects (see task_list.py).
+# data_volume_benchmark.py seeds the accounts and runs this once per size and mode:
+#   DATA_VOLUME_TOKEN=<jwt> DATA_VOLUME_TASKS=10000 locust -f data_volume_test.py --headless -u 10 -t 60s
+TOKEN = os.environ.get("DATA_VOLUME_TOKEN")
+TASKS = int(os.environ.get("DATA_VOLUME_TASKS", "0"))
+# Where the master writes the generator-side results as JSON
+SUMMARY_PATH = os.environ.get("DATA_VOLUME_SUMMARY")
+
+if not TOKEN:
+    raise ValueError("DATA_VOLUME_TOKEN must hold the token of a seeded account (see data_volume_benchmark.py)")
+
+class DataVolumeStats(ScenarioStats):
+    metrics = {
+        "parse_times": "Generator parse time (json.loads of the list)",
+    }
+
+stats = DataVolumeStats()
+share_with_master(stats, "data_volume_stats")
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    stats.clear()
+
+@stats_complete.add_listener
+def on_stats_complete(environment, **kwargs):
+    stats.print_report(f"Data Volume Results ({TASKS} tasks, {MODE} mode)")
+    if SUMMARY_PATH:
+        parse = stats.parse_times
+        with open(SUMMARY_PATH, "w") as f:
+            json.dump({
+                "tasks": TASKS,
+                "mode": MODE,
+                "parses": parse.count,
+                "parse_mean": parse.mean,
+                "parse_p50": parse.percentile(50),
+                "parse_p95": parse.percentile(95),
+                "parse_p99": parse.percentile(99),
+            }, f)
+
+class DataVolumeUser(ScenarioUser):
+    """Closed loop of getUserTasks on the seeded account, parsing every list like the scenarios do"""
+    wait_time = constant(0)
+    host = FUNCTIONS_URL
+
+    def on_start(self):
+        self.task_list = TaskListFetcher()
+
+    @task
+    def get_user_tasks(self):
+        with self.task_list.get(self.client, "/getUserTasks", TOKEN, name=f"/getUserTasks ({TASKS} tasks)") as response:
+            if response.status_code == 304:
+                # Unchanged since this user's last fetch: nothing to download or parse
+                response.success()
+                return
+            if response.status_code != 200:
+                response.failure(f"Failed to get tasks: {response.status_code}")
+                return
+            failure = check_body(response, b"{" if MODE == "page" else b"[")
+            if failure:
+                response.failure(failure)
+                return
+            start = time.perf_counter()
+            try:
+                tasks = json.loads(response.content)
+            except ValueError:
+                response.failure("Invalid JSON in task list")
+                return
+            stats.parse_times.record(time.perf_counter() - start)
+            if MODE == "page":
+                if len(tasks["tasks"]) > PAGE_SIZE:
+                    response.failure(f"Page of {len(tasks['tasks'])} tasks exceeds the page size {PAGE_SIZE}")
+                else:
+                    response.success()
+            elif TASKS and len(tasks) != TASKS:
+                response.failure(f"Expected {TASKS} tasks, got {len(tasks)}")
+            else:
+                response.success()
@@ -0,0 +1,178 @@
+"""Buffered per-request event log, written off the request path
+
+Every request (timestamp, endpoint, status, latency, size) goes into a bounded
+in-memory ring buffer; a background greenlet drains it to disk in batches.
+Configured with environment variables:
+
+    EVENT_SINK=events.jsonl      output file; ``.bin`` selects the binary format
+    EVENT_SINK_SAMPLE=0.1        fraction of requests to keep (default 1)
+    EVENT_SINK_BUFFER=100000     ring buffer size; the oldest events are dropped when full
+    EVENT_SINK_FLUSH=1           seconds between flushes
+
+Worker processes append their pid to the file name.
+"""
+import json
+import os
+import random
+import struct
+import time
+from collections import deque
+
+import gevent
+from locust import events
+from locust.runners import WorkerRunner
+
+BINARY_MAGIC = b"LCEV1\n"
+# Name definition: tag, name id, byte length (followed by the UTF-8 name)
+NAME_RECORD = struct.Struct("<cHH")
+# Event: tag, timestamp, name id, status, latency (ms), response size
+EVENT_RECORD = struct.Struct("<cdHHfI")
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def write(self, batch):
+        self.file.write("".join(
+            json.dumps({"ts": ts, "endpoint": name, "status": status, "latency_ms": latency, "size": size}) + "\n"
+            for ts, name, status, latency, size in batch
+        ))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class BinaryWriter:
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(BINARY_MAGIC)
+        self.name_ids = {}
+
+    def write(self, batch):
+        chunks = []
+        for ts, name, status, latency, size in batch:
+            name_id = self.name_ids.get(name)
+            if name_id is None:
+                name_id = self.name_ids[name] = len(self.name_ids)
+                encoded = name.encode()
+                chunks.append(NAME_RECORD.pack(b"N", name_id, len(encoded)) + encoded)
+            chunks.append(EVENT_RECORD.pack(b"E", ts, name_id, status, latency, min(size, 0xFFFFFFFF)))
+        self.file.write(b"".join(chunks))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def read_events(path):
+    """Yield events from a JSONL or binary event file as dicts"""
+    if not path.endswith(".bin"):
+        with open(path) as f:
+            for line in f:
+                yield json.loads(line)
+        return
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError(f"{path} is not a binary event file")
+    names = {}
+    offset = len(BINARY_MAGIC)
+    while offset < len(data):
+        if data[offset:offset + 1] == b"N":
+            _, name_id, length = NAME_RECORD.unpack_from(data, offset)
+            offset += NAME_RECORD.size
+            names[name_id] = data[offset:offset + length].decode()
+            offset += length
+        else:
+            _, ts, name_id, status, latency, size = EVENT_RECORD.unpack_from(data, offset)
+            offset += EVENT_RECORD.size
+            yield {"ts": ts, "endpoint": names[name_id], "status": status, "latency_ms": latency, "size": size}
+
+
+class EventSink:
+    """Sampled ring buffer of request events, flushed by a background greenlet"""
+
+    def __init__(self, path, sample_rate=1.0, capacity=100_000, flush_interval=1.0):
+        self.writer = BinaryWriter(path) if path.endswith(".bin") else JsonlWriter(path)
+        self.sample_rate = sample_rate
+        self.buffer = deque(maxlen=capacity)
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.dropped = 0
+        self._greenlet = None
+
+    def record(self, timestamp, endpoint, status, latency_ms, size):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append((timestamp, endpoint, status, latency_ms, size))
+        self.recorded += 1
+
+    def flush(self):
+        batch = []
+        while self.buffer:
+            batch.append(self.buffer.popleft())
+        if batch:
+            self.writer.write(batch)
+
+    def _run(self):
+        while True:
+            gevent.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self):
+        if self._greenlet is None:
+            self._greenlet = gevent.spawn(self._run)
+
+    def close(self):
+        if self._greenlet is not None:
+            self._greenlet.kill()
+            self._greenlet = None
+        self.flush()
+        self.writer.close()
+
+
+_installed = False
+
+
+def install_event_sink():
+    """Log every request of this process to EVENT_SINK, if set (safe to call from several locustfiles)"""
+    global _installed
+    path = os.environ.get("EVENT_SINK")
+    if not path or _installed:
+        return
+    _installed = True
+    sink = {}
+
+    @events.init.add_listener
+    def on_init(environment, **kwargs):
+        target = path
+        if isinstance(environment.runner, WorkerRunner):
+            root, ext = os.path.splitext(path)
+            target = f"{root}.{os.getpid()}{ext}"
+        sink["sink"] = EventSink(
+            target,
+            sample_rate=float(os.environ.get("EVENT_SINK_SAMPLE", "1")),
+            capacity=int(os.environ.get("EVENT_SINK_BUFFER", "100000")),
+            flush_interval=float(os.environ.get("EVENT_SINK_FLUSH", "1")),
+        )
+        sink["sink"].start()
+
+    @events.request.add_listener
+    def on_request(name, response_time, response_length, response=None, exception=None, start_time=None, **kwargs):
+        if "sink" not in sink:
+            return
+        status = getattr(response, "status_code", 0) or 0
+        timestamp = start_time or time.time() - response_time / 1000
+        sink["sink"].record(timestamp, name, status, response_time, response_length or 0)
+
+    @events.quitting.add_listener
+    def on_quitting(environment, **kwargs):
+        if "sink" in sink:
+            current = sink.pop("sink")
+            current.close()
+            if current.dropped:
+                print(f"Event sink dropped {current.dropped} of {current.recorded} events; raise EVENT_SINK_BUFFER")
@@ -0,0 +1,231 @@
+"""Bounded failure tracking: failures counted by fingerprint instead of by message
+
+Scenario failure messages often embed response bodies, ids or titles, so every
+failure can become its own row in Locust's failure table (and *_failures.csv)
+and an outage grows both without bound. Every failed request is reduced to a
+fingerprint: method, request name, status and a templated message. Ids,
+tokens, emails and addresses become placeholders everywhere; the scenarios'
+own failure messages also have embedded bodies cut off into a truncated
+sample and quoted strings and numbers replaced, while exception messages keep
+theirs (errno, reason). The templated message is also what Locust's own
+failure table sees.
+
+Fingerprints are counted in a space-saving top-K (FAILURE_TOP_K, default 100):
+the rarest fingerprint makes room for a new one, and counts that can no longer
+be attributed are reported as "other". Results are merged on the master and
+shown at /failure-fingerprints in the web UI and in
+<csv prefix>_failure_fingerprints.csv.
+"""
+import csv
+import html
+import io
+import os
+import re
+
+from locust import events
+from locust.exception import CatchResponseError
+
+from stats_sync import share_with_master, is_worker, stats_complete
+
+TOP_K = int(os.environ.get("FAILURE_TOP_K", "100"))
+SAMPLE_CHARS = 200
+MESSAGE_CHARS = 160
+
+CSV_FIELDS = ("method", "name", "status", "message", "count", "sample")
+
+# Identifiers that differ per request, templated in every message; applied in order
+_ID_TEMPLATES = [
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<uuid>"),
+    (re.compile(r"\beyJ[\w-]+\.[\w-]+\.[\w-]+"), "<token>"),
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.I), "<addr>"),
+    (re.compile(r"\b(?=[0-9a-f]*[a-f])(?=[0-9a-f]*\d)[0-9a-f]{8,}\b", re.I), "<hex>"),
+]
+# Values the scenarios put in their own failure messages (titles, counts); exception
+# messages keep them, since there they are errnos, ports and reasons
+_VALUE_TEMPLATES = [
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\d+(\.\d+)?"), "<n>"),
+]
+# A scenario message embeds a JSON or HTML body after its "status - " or ": " separator
+_BODY_START = re.compile(r"(?: - |: ?)(?=[\[{<])")
+
+
+def shorten(message, limit=MESSAGE_CHARS):
+    """``message`` cut to about ``limit`` characters at word boundaries, keeping its start and its end"""
+    if len(message) <= limit:
+        return message
+    # The end holds the cause of chained exceptions, e.g. "[Errno 111] Connection refused"
+    head = message[:limit // 3].rsplit(" ", 1)[0]
+    tail = message[len(message) - (limit - len(head) - 5):]
+    tail = tail.split(" ", 1)[1] if " " in tail else tail
+    return f"{head} ... {tail}"
+
+
+def template_message(message, scenario=True):
+    """(templated message, sample of the body it embedded or "")
+
+    ``scenario`` messages come from a scenario's response.failure(); others are
+    exception messages, which embed no bodies and keep their quoted strings and numbers.
+    """
+    sample = ""
+    if scenario:
+        body = _BODY_START.search(message)
+        if body:
+            sample = message[body.end():body.end() + SAMPLE_CHARS]
+            message = message[:body.start()].rstrip(" -:") + " <body>"
+    for pattern, placeholder in _ID_TEMPLATES + (_VALUE_TEMPLATES if scenario else []):
+        message = pattern.sub(placeholder, message)
+    return shorten(message), sample
+
+
+class FailureFingerprints:
+    """Space-saving top-K of failure fingerprints (method, name, status, message)
+
+    Each counter holds its count, the part of it possibly inherited from the
+    fingerprint it evicted (error) and the first sample body seen. Counts
+    reported per fingerprint are the guaranteed ones (count - error); the
+    rest is "other", so the reported counts always add up to the total.
+    """
+
+    def __init__(self, capacity=TOP_K):
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self.counters = {}
+        self.other = 0
+
+    def add(self, fingerprint, count=1, sample=""):
+        counter = self.counters.get(fingerprint)
+        if counter is not None:
+            counter[0] += count
+            if not counter[2]:
+                counter[2] = sample
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[fingerprint] = [count, 0, sample]
+            return
+        rarest = min(self.counters, key=lambda key: self.counters[key][0])
+        floor = self.counters.pop(rarest)[0]
+        self.counters[fingerprint] = [floor + count, floor, sample]
+
+    @property
+    def total(self):
+        return self.other + sum(counter[0] for counter in self.counters.values())
+
+    def _other(self):
+        return self.other + sum(min(error, count) for count, error, _ in self.counters.values())
+
+    def _top(self):
+        rows = [
+            {"method": method, "name": name, "status": status, "message": message,
+             "count": count - error, "sample": sample}
+            for (method, name, status, message), (count, error, sample) in self.counters.items()
+            if count > error
+        ]
+        rows.sort(key=lambda row: row["count"], reverse=True)
+        return rows
+
+    def rows(self):
+        """Fingerprints by guaranteed count, then the "other" row if any"""
+        rows = self._top()
+        other = self._other()
+        if other:
+            rows.append({"method": "", "name": "other", "status": "", "message": "(fingerprints beyond the top K)",
+                         "count": other, "sample": ""})
+        return rows
+
+    def pop_summary(self):
+        if not self.counters and not self.other:
+            return None
+        summary = {"items": [[row[field] for field in CSV_FIELDS] for row in self._top()], "other": self._other()}
+        self.clear()
+        return summary
+
+    def merge_summary(self, summary):
+        for method, name, status, message, count, sample in summary["items"]:
+            self.add((method, name, status, message), count, sample)
+        self.other += summary["other"]
+
+    def write_csv(self, f):
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(self.rows())
+
+    def html(self):
+        rows = "".join(
+            "<tr>" + "".join(f"<td>{html.escape(str(row[field]))}</td>" for field in CSV_FIELDS) + "</tr>"
+            for row in self.rows()
+        )
+        head = "".join(f"<th>{field}</th>" for field in CSV_FIELDS)
+        return (
+            "<!doctype html><html><head><meta charset='utf-8'><title>Failure fingerprints</title>"
+            "<style>body{font-family:sans-serif}td,th{border:1px solid #ccc;padding:4px;text-align:left}"
+            "table{border-collapse:collapse}td:last-child{font-family:monospace;font-size:small}</style></head>"
+            f"<body><h2>Failure fingerprints ({self.total} failures, top {self.capacity})</h2>"
+            f"<p><a href='failure-fingerprints.csv'>Download CSV</a></p><table><tr>{head}</tr>{rows}</table></body></html>"
+        )
+
+
+fingerprints = FailureFingerprints()
+
+_installed = False
+
+
+def install_failure_fingerprints():
+    """Fingerprint every failed request of the run (safe to call from several locustfiles)"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    share_with_master(fingerprints, "failure_fingerprints")
+
+    @events.request.add_listener
+    def on_request(request_type, name, response=None, exception=None, **kwargs):
+        if exception is None:
+            return
+        status = getattr(response, "status_code", 0) or 0
+        message, sample = template_message(str(exception), isinstance(exception, CatchResponseError))
+        if not sample and response is not None:
+            try:
+                sample = (response.text or "")[:SAMPLE_CHARS]
+            except Exception:
+                sample = ""
+        fingerprints.add((request_type, name, status, message), 1, sample)
+        # Registered before Locust's stats listener (at import), so its failure table gets the template too
+        try:
+            exception.args = (f"HTTP {status}: {message}" if status else message,)
+        except (AttributeError, TypeError):
+            pass
+
+    @events.init.add_listener
+    def on_init(environment, **kwargs):
+        web_ui = environment.web_ui
+        if web_ui is None or is_worker(environment):
+            return
+        protect = getattr(web_ui, "auth_required_if_enabled", lambda view: view)
+
+        @web_ui.app.route("/failure-fingerprints")
+        @protect
+        def failure_fingerprints_page():
+            return fingerprints.html()
+
+        @web_ui.app.route("/failure-fingerprints.csv")
+        @protect
+        def failure_fingerprints_csv():
+            f = io.StringIO()
+            fingerprints.write_csv(f)
+            return f.getvalue(), 200, {"Content-Type": "text/csv"}
+
+    @events.test_start.add_listener
+    def on_test_start(environment, **kwargs):
+        fingerprints.clear()
+
+    @stats_complete.add_listener
+    def on_stats_complete(environment, **kwargs):
+        options = environment.parsed_options
+        prefix = getattr(options, "csv_prefix", None) if options else None
+        if prefix:
+            with open(f"{prefix}_failure_fingerprints.csv", "w", newline="") as f:
+                fingerprints.write_csv(f)
@@ -0,0 +1,274 @@
+"""Offline model of the frontend HPA, replaying a recorded request-rate curve
+
+Reads the Deployment and HorizontalPodAutoscaler from
+k8s/frontend-deployment.yaml and feeds the aggregated Requests/s of a Locust
+``*_stats_history.csv`` through a per-second model of the cluster:
+
+- every request costs ``--cpu-ms`` of pod CPU; a ready pod serves up to its
+  CPU limit, the rest waits in a fluid queue and what would wait longer than
+  ``--timeout`` is dropped;
+- every sync period (15 s) the HPA compares the average CPU use of the ready
+  pods (relative to the CPU request) with the target, with the usual 10 %
+  tolerance, unready pods counted as idle, the scale-up/scale-down policies
+  and stabilisation windows of ``behavior`` (Kubernetes defaults if unset);
+- new pods serve after the readiness delay (readinessProbe initialDelaySeconds).
+
+Every parameter list given on the command line is swept as a grid, all
+combinations simulated at once with numpy, so thousands of them take seconds:
+
+    python3 hpa_simulator.py combined_results_stats_history.csv --rps-scale 20 \\
+        --cpu-ms 1,2,5 --target 50,60,75 --scale-down-window 60,300 --readiness 10,30 --output hpa_sweep
+
+writes hpa_sweep_sweep.csv (one row per combination) and hpa_sweep_timeline.csv
+(replicas, utilisation, queueing and drops over time of the first combination).
+"""
+import argparse
+import csv
+import itertools
+import os
+
+import numpy as np
+import yaml
+
+MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "k8s", "frontend-deployment.yaml")
+SYNC_PERIOD = 15
+TOLERANCE = 0.1
+DEFAULT_CPU_MS = 2.0
+# autoscaling/v2 defaults when the HPA has no behavior section
+DEFAULT_SCALE_UP = {"stabilizationWindowSeconds": 0, "selectPolicy": "Max",
+                    "policies": [{"type": "Percent", "value": 100, "periodSeconds": 15},
+                                 {"type": "Pods", "value": 4, "periodSeconds": 15}]}
+DEFAULT_SCALE_DOWN = {"stabilizationWindowSeconds": 300, "selectPolicy": "Max",
+                      "policies": [{"type": "Percent", "value": 100, "periodSeconds": 15}]}
+# Swept parameter -> (command-line option, help)
+PARAMETERS = {
+    "cpu_ms": ("--cpu-ms", "Pod CPU milliseconds per request"),
+    "target": ("--target", "Target average CPU utilisation (%% of the request)"),
+    "min_replicas": ("--min-replicas", "HPA minReplicas"),
+    "max_replicas": ("--max-replicas", "HPA maxReplicas"),
+    "readiness": ("--readiness", "Seconds from pod creation until it serves"),
+    "scale_up_window": ("--scale-up-window", "Scale-up stabilisation window in seconds"),
+    "scale_down_window": ("--scale-down-window", "Scale-down stabilisation window in seconds"),
+}
+
+
+def parse_cpu(value):
+    """Cores of a Kubernetes CPU quantity ("100m", "0.5", 1)"""
+    value = str(value)
+    return int(value[:-1]) / 1000 if value.endswith("m") else float(value)
+
+
+def load_manifest(path=MANIFEST):
+    """Autoscaling-relevant settings of the frontend Deployment and its HPA"""
+    with open(path) as f:
+        documents = [doc for doc in yaml.safe_load_all(f) if doc]
+    deployment = next(doc for doc in documents if doc["kind"] == "Deployment")
+    hpa = next(doc for doc in documents if doc["kind"] == "HorizontalPodAutoscaler")
+    container = deployment["spec"]["template"]["spec"]["containers"][0]
+    resources = container.get("resources", {})
+    cpu_metric = next(m["resource"]["target"] for m in hpa["spec"]["metrics"]
+                      if m["type"] == "Resource" and m["resource"]["name"] == "cpu")
+    behavior = hpa["spec"].get("behavior", {})
+    return {
+        "replicas": deployment["spec"].get("replicas", 1),
+        "cpu_request": parse_cpu(resources["requests"]["cpu"]),
+        "cpu_limit": parse_cpu(resources.get("limits", resources["requests"])["cpu"]),
+        "readiness": container.get("readinessProbe", {}).get("initialDelaySeconds", 0),
+        "min_replicas": hpa["spec"].get("minReplicas", 1),
+        "max_replicas": hpa["spec"]["maxReplicas"],
+        "target": cpu_metric["averageUtilization"],
+        "scale_up": {**DEFAULT_SCALE_UP, **behavior.get("scaleUp", {})},
+        "scale_down": {**DEFAULT_SCALE_DOWN, **behavior.get("scaleDown", {})},
+    }
+
+
+def load_rps(path):
+    """Aggregated Requests/s of a stats history, resampled to one value per second"""
+    times, rps = [], []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row["Name"] == "Aggregated":
+                times.append(float(row["Timestamp"]))
+                rps.append(float(row["Requests/s"]) if row["Requests/s"] not in ("", "N/A") else 0.0)
+    if not times:
+        raise ValueError(f"No Aggregated rows in {path}")
+    times = np.array(times) - times[0]
+    return np.interp(np.arange(int(times[-1]) + 1), times, np.array(rps))
+
+
+def policy_limit(behavior, history, up):
+    """Replica bound the scale-up (or scale-down) policies allow, per combination
+
+    ``history`` holds the replica count of every sync period so far; a policy
+    over periodSeconds allows its change relative to the count that long ago.
+    """
+    limits = []
+    for policy in behavior["policies"]:
+        base = history[max(0, len(history) - policy["periodSeconds"] // SYNC_PERIOD)]
+        if policy["type"] == "Pods":
+            limits.append(base + policy["value"] if up else base - policy["value"])
+        else:
+            limits.append(np.ceil(base * (1 + policy["value"] / 100 if up else 1 - policy["value"] / 100)))
+    select = behavior.get("selectPolicy", "Max")
+    if select == "Disabled":
+        return history[-1]
+    # Max: the policy allowing the biggest change
+    pick = np.maximum if (select == "Max") == up else np.minimum
+    return pick.reduce(limits)
+
+
+def simulate(rps, manifest, params, timeout=30.0, trace=False):
+    """Run every parameter combination (arrays of equal length in ``params``) over the rps curve
+
+    Returns per-combination summary arrays and, with ``trace``, the per-second
+    timeline of the first combination.
+    """
+    n = len(params["cpu_ms"])
+    cost = params["cpu_ms"] / 1000  # CPU seconds per request
+    capacity_per_pod = manifest["cpu_limit"] / cost
+    min_r, max_r = params["min_replicas"], params["max_replicas"]
+    replicas = np.clip(np.full(n, float(manifest["replicas"])), min_r, max_r)
+    # Replica counts of the last sync periods, enough to cover the longest readiness delay and window
+    history = [replicas.copy()]
+    readiness_periods = int(params["readiness"].max()) // SYNC_PERIOD + 2
+    window_periods = int(max(params["scale_up_window"].max(), params["scale_down_window"].max())) // SYNC_PERIOD + 1
+    policy_periods = max(p["periodSeconds"] for b in (manifest["scale_up"], manifest["scale_down"]) for p in b["policies"])
+    keep = max(readiness_periods, policy_periods // SYNC_PERIOD + 1)
+    periods = 0
+    recommendations = []
+    backlog = np.zeros(n)
+    cpu_used = np.zeros(n)
+    ready_seconds = np.zeros(n)
+    totals = {key: np.zeros(n) for key in ("served", "dropped", "delay_sum", "overload_seconds", "pod_seconds")}
+    peak_delay, peak_replicas = np.zeros(n), replicas.copy()
+    timeline = []
+
+    for t, arrivals in enumerate(rps):
+        # Pods are removed newest first, so the ready ones are those that existed throughout
+        # the last readiness delay: the lowest count of every sync period overlapping it.
+        # The initial pods are ready from the start.
+        recent = np.array(history[-readiness_periods:])
+        ends = SYNC_PERIOD * np.arange(periods - len(recent) + 2, periods + 2, dtype=float)
+        ends[-1] = np.inf
+        overlaps = ends[:, None] > t - params["readiness"][None, :]
+        ready = np.where(overlaps, recent, np.inf).min(axis=0)
+        capacity = ready * capacity_per_pod
+        demand = backlog + arrivals
+        served = np.minimum(demand, capacity)
+        backlog = demand - served
+        # What would wait longer than the timeout is dropped
+        dropped = np.maximum(backlog - capacity * timeout, 0)
+        backlog -= dropped
+        delay = backlog / capacity
+
+        totals["served"] += served
+        totals["dropped"] += dropped
+        totals["delay_sum"] += delay * served
+        totals["overload_seconds"] += backlog > 0
+        totals["pod_seconds"] += replicas
+        peak_delay = np.maximum(peak_delay, delay)
+        cpu_used += served * cost
+        ready_seconds += ready
+        if trace:
+            timeline.append({
+                "t": t, "rps": arrivals, "replicas": replicas[0], "ready": ready[0],
+                "utilisation": 100 * served[0] * cost[0] / (ready[0] * manifest["cpu_request"]),
+                "queue_delay_ms": 1000 * delay[0], "dropped": dropped[0],
+            })
+
+        if (t + 1) % SYNC_PERIOD == 0:
+            # Average utilisation of the ready pods over the sync period; the proposal spreads the
+            # total usage over all pods, so unready pods count as idle
+            utilisation = 100 * cpu_used / ready_seconds / manifest["cpu_request"]
+            usage = 100 * cpu_used / SYNC_PERIOD / manifest["cpu_request"]
+            proposal = np.maximum(np.ceil(usage / params["target"]), 1)
+            proposal = np.where(np.abs(utilisation / params["target"] - 1) <= TOLERANCE, replicas, proposal)
+            recommendations = [proposal, *recommendations[:window_periods - 1]]
+            # Stabilisation: the lowest recommendation of the scale-up window, highest of the scale-down window
+            age = SYNC_PERIOD * np.arange(len(recommendations))[:, None]
+            stacked = np.array(recommendations)
+            up_to = np.where(age <= params["scale_up_window"], stacked, np.inf).min(axis=0)
+            down_to = np.where(age <= params["scale_down_window"], stacked, -np.inf).max(axis=0)
+            desired = np.where(proposal > replicas, np.minimum(proposal, up_to),
+                               np.where(proposal < replicas, np.maximum(proposal, down_to), replicas))
+            desired = np.minimum(desired, policy_limit(manifest["scale_up"], history, True))
+            desired = np.maximum(desired, policy_limit(manifest["scale_down"], history, False))
+            replicas = np.clip(desired, min_r, max_r)
+            history = [*history[-keep:], replicas.copy()]
+            periods += 1
+            cpu_used[:] = 0
+            ready_seconds[:] = 0
+            peak_replicas = np.maximum(peak_replicas, replicas)
+
+    offered = max(rps.sum(), 1e-9)
+    summary = {
+        "peak_replicas": peak_replicas,
+        "pod_hours": totals["pod_seconds"] / 3600,
+        "overload_seconds": totals["overload_seconds"],
+        "dropped_pct": 100 * totals["dropped"] / offered,
+        "mean_queue_ms": 1000 * totals["delay_sum"] / np.maximum(totals["served"], 1e-9),
+        "peak_queue_ms": 1000 * peak_delay,
+    }
+    return summary, timeline
+
+
+def parameter_grid(args, manifest):
+    """Arrays of every combination of the swept values (the manifest's value where none given)"""
+    values = {}
+    for name, (option, _) in PARAMETERS.items():
+        given = getattr(args, name)
+        if given:
+            values[name] = [float(v) for v in given.split(",")]
+        elif name == "scale_up_window":
+            values[name] = [manifest["scale_up"]["stabilizationWindowSeconds"]]
+        elif name == "scale_down_window":
+            values[name] = [manifest["scale_down"]["stabilizationWindowSeconds"]]
+        else:
+            values[name] = [manifest[name]] if name in manifest else [DEFAULT_CPU_MS]
+    combinations = list(itertools.product(*values.values()))
+    return {name: np.array([c[i] for c in combinations], dtype=float) for i, name in enumerate(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("history", help="Locust *_stats_history.csv whose request rate is replayed")
+    parser.add_argument("--manifest", default=MANIFEST)
+    parser.add_argument("--rps-scale", type=float, default=1.0, help="Multiply the recorded request rate")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds a request may queue before it is dropped")
+    for name, (option, help_text) in PARAMETERS.items():
+        parser.add_argument(option, dest=name, help=f"{help_text}; comma-separated values are swept")
+    parser.add_argument("--top", type=int, default=15, help="Combinations printed, best first")
+    parser.add_argument("--output", default="hpa_simulation", help="Prefix of the sweep and timeline CSVs")
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+    rps = load_rps(args.history) * args.rps_scale
+    params = parameter_grid(args, manifest)
+    summary, _ = simulate(rps, manifest, params, args.timeout)
+    _, timeline = simulate(rps, manifest, {k: v[:1] for k, v in params.items()}, args.timeout, trace=True)
+
+    rows = [{**{k: v[i] for k, v in params.items()}, **{k: v[i] for k, v in summary.items()}} for i in range(len(params["cpu_ms"]))]
+    rows.sort(key=lambda r: (round(r["dropped_pct"], 3), round(r["mean_queue_ms"]), r["pod_hours"]))
+    with open(f"{args.output}_sweep.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(f"{args.output}_timeline.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(timeline[0]))
+        writer.writeheader()
+        writer.writerows(timeline)
+
+    print(f"{len(rps)} s of load (peak {rps.max():.0f} req/s), {len(rows)} combinations; "
+          f"HPA {manifest['min_replicas']}-{manifest['max_replicas']} replicas, "
+          f"CPU {manifest['cpu_request'] * 1000:.0f}m/{manifest['cpu_limit'] * 1000:.0f}m")
+    print(f"{'cpu ms':>6} {'target':>6} {'min':>4} {'max':>4} {'ready s':>7} {'up win':>6} {'down win':>8} "
+          f"{'peak pods':>9} {'pod h':>6} {'overload s':>10} {'dropped %':>9} {'queue ms':>8} {'peak q ms':>9}")
+    for r in rows[:args.top]:
+        print(f"{r['cpu_ms']:>6g} {r['target']:>6g} {r['min_replicas']:>4g} {r['max_replicas']:>4g} {r['readiness']:>7g} "
+              f"{r['scale_up_window']:>6g} {r['scale_down_window']:>8g} {r['peak_replicas']:>9g} {r['pod_hours']:>6.2f} "
+              f"{r['overload_seconds']:>10g} {r['dropped_pct']:>9.2f} {r['mean_queue_ms']:>8.0f} {r['peak_queue_ms']:>9.0f}")
+    print(f"Wrote {args.output}_sweep.csv and {args.output}_timeline.csv")
+
+
+if __name__ == "__main__":
+    main()
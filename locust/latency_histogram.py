@@ -0,0 +1,204 @@
+"""Fixed-memory latency histograms shared by the load test scenarios"""
+from array import array
+
+# Percentiles printed for every custom metric
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """HDR-style log-bucketed histogram of integer values (microseconds by default)
+
+    The first 2**precision_bits values get a bucket each; every power of two above
+    that is split into 2**(precision_bits - 1) linear sub-buckets. Memory is fixed
+    at construction, recording is O(1) and the relative error of any reported
+    percentile stays below 2**-(precision_bits - 1) (0.8% with the default of 8).
+    Values above 2**max_bits - 1 (about 19 hours in microseconds) are clamped.
+    """
+
+    def __init__(self, precision_bits=8, max_bits=36):
+        self.precision_bits = precision_bits
+        self.max_bits = max_bits
+        self._sub_count = 1 << precision_bits
+        self._half = self._sub_count >> 1
+        self._max_value = (1 << max_bits) - 1
+        self.bucket_count = self._sub_count + (max_bits - precision_bits) * self._half
+        self.reset()
+
+    def reset(self):
+        """Forget every recorded value"""
+        self.counts = array("Q", bytes(8 * self.bucket_count))
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value):
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return self._sub_count + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def bucket_bounds(self, index):
+        """Lowest and highest value that land in bucket ``index``"""
+        if index < self._sub_count:
+            return index, index
+        offset = index - self._sub_count
+        shift = offset // self._half + 1
+        low = (offset % self._half + self._half) << shift
+        return low, low + (1 << shift) - 1
+
+    def record_value(self, value, count=1):
+        """Record an integer value (in the histogram's unit) ``count`` times"""
+        value = min(max(int(value), 0), self._max_value)
+        self.counts[self._index(value)] += count
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += count
+        self.total += value * count
+
+    def record(self, seconds):
+        """Record a duration given in seconds"""
+        self.record_value(seconds * 1_000_000)
+
+    def merge(self, other):
+        """Add every value recorded in ``other`` to this histogram"""
+        if other.bucket_count != self.bucket_count:
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        if not other.count:
+            return
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        if not self.count or other.min < self.min:
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def to_dict(self):
+        """Compact, mergeable summary: non-empty buckets as a flat [index, count, ...] list"""
+        buckets = []
+        for i, c in enumerate(self.counts):
+            if c:
+                buckets += (i, c)
+        return {
+            "precision_bits": self.precision_bits,
+            "max_bits": self.max_bits,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+    def merge_dict(self, data):
+        """Merge a summary produced by ``to_dict``"""
+        if (data["precision_bits"], data["max_bits"]) != (self.precision_bits, self.max_bits):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        if not data["count"]:
+            return
+        buckets = data["buckets"]
+        counts = self.counts
+        for i in range(0, len(buckets), 2):
+            counts[buckets[i]] += buckets[i + 1]
+        if not self.count or data["min"] < self.min:
+            self.min = data["min"]
+        self.max = max(self.max, data["max"])
+        self.count += data["count"]
+        self.total += data["total"]
+
+    def value_at_percentile(self, percentile):
+        """Highest value equivalent to the given percentile (0-100), in histogram units"""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percentile // 100))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.bucket_bounds(i)[1], self.max)
+        return self.max
+
+    def percentile(self, percentile):
+        """Percentile in seconds"""
+        return self.value_at_percentile(percentile) / 1_000_000
+
+    @property
+    def mean_value(self):
+        return self.total / self.count if self.count else 0
+
+    @property
+    def mean(self):
+        """Mean in seconds"""
+        return self.mean_value / 1_000_000
+
+
+class ScenarioStats:
+    """Named latency histograms holding a scenario's custom timings
+
+    Subclasses declare ``metrics`` (attribute name -> report label); each one
+    becomes a LatencyHistogram attribute, so scenarios call
+    ``stats.signup_times.record(elapsed)``. Extra histograms can be created on
+    demand with ``histogram(name)``, optionally coarser (fewer precision bits)
+    where many of them are kept.
+    """
+    metrics = {}
+
+    def __init__(self):
+        self.histograms = {}
+        for name in self.metrics:
+            setattr(self, name, self.histogram(name))
+
+    def histogram(self, name, precision_bits=8):
+        """Return the histogram called ``name``, creating it if needed"""
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram(precision_bits)
+        return hist
+
+    def clear(self):
+        for hist in self.histograms.values():
+            hist.reset()
+
+    def merge(self, other):
+        for name, hist in other.histograms.items():
+            self.histogram(name).merge(hist)
+
+    def summary(self):
+        """Summaries of every non-empty histogram, keyed by name"""
+        return {name: hist.to_dict() for name, hist in self.histograms.items() if hist.count}
+
+    def pop_summary(self):
+        """Return the summary and clear, so repeated calls yield non-overlapping deltas"""
+        summary = self.summary()
+        self.clear()
+        return summary
+
+    def merge_summary(self, summary):
+        for name, data in summary.items():
+            self.histogram(name, data["precision_bits"]).merge_dict(data)
+
+    def total_count(self):
+        return sum(hist.count for hist in self.histograms.values())
+
+    def report_lines(self):
+        lines = []
+        for name, hist in self.histograms.items():
+            label = self.metrics.get(name, name)
+            if not hist.count:
+                lines.append(f"{label}: no samples")
+                continue
+            percentiles = " ".join(f"p{p:g}={hist.percentile(p):.4f}s" for p in REPORT_PERCENTILES)
+            lines.append(
+                f"{label}: n={hist.count} avg={hist.mean:.4f}s {percentiles} max={hist.max / 1_000_000:.4f}s"
+            )
+        return lines
+
+    def print_report(self, title, extra_lines=()):
+        print(f"\n=== {title} ===")
+        for line in [*extra_lines, *self.report_lines()]:
+            print(line)
+        print("=" * (len(title) + 8) + "\n")
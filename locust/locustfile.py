@@ -1,36 +1,50 @@
 import json
-import random
-from locust import HttpUser, task, between
+from locust import task, between
+from targets import API_URL
+from clients import ScenarioUser
+from payload_pool import JSON_HEADERS, PayloadPool
+from response_checks import random_object, string_field, toggle_completed
 
-class TodoUser(HttpUser):
+TASK_TITLES = [
+    "Buy groceries",
+    "Finish project report",
+    "Call dentist",
+    "Schedule team meeting",
+    "Pay bills",
+    "Clean the garage",
+    "Go for a run",
+    "Read book chapter",
+    "Water plants",
+    "Review code PR"
+]
+
+TASK_DESCRIPTIONS = [
+    "Need to get milk, eggs, and bread",
+    "The quarterly report is due next week",
+    "Schedule regular checkup",
+    "Discuss project timeline with team",
+    "Electricity and internet bills",
+    "It's getting messy in there",
+    "Aim for 5k today",
+    "Chapter 7 of 'Clean Code'",
+    "Don't forget the plants on the balcony",
+    "Review the bug fix PR from John"
+]
+
+def _paired_task(rng):
+    idx = rng.randrange(len(TASK_TITLES))
+    return {
+        "title": TASK_TITLES[idx],
+        "description": TASK_DESCRIPTIONS[idx],
+        "completed": False,
+        "dueDate": None
+    }
+
+task_payloads = PayloadPool(_paired_task)
+
+class TodoUser(ScenarioUser):
     wait_time = between(1, 5)  # Wait between 1 and 5 seconds between tasks
-    
-    def on_start(self):
-        # Initialize user-specific data
-        self.task_titles = [
-            "Buy groceries",
-            "Finish project report",
-            "Call dentist",
-            "Schedule team meeting",
-            "Pay bills",
-            "Clean the garage",
-            "Go for a run",
-            "Read book chapter",
-            "Water plants",
-            "Review code PR"
-        ]
-        self.descriptions = [
-            "Need to get milk, eggs, and bread",
-            "The quarterly report is due next week",
-            "Schedule regular checkup",
-            "Discuss project timeline with team",
-            "Electricity and internet bills",
-            "It's getting messy in there",
-            "Aim for 5k today",
-            "Chapter 7 of 'Clean Code'",
-            "Don't forget the plants on the balcony",
-            "Review the bug fix PR from John"
-        ]
+    host = API_URL  # None unless LOADTEST_TARGET=local; --host takes precedence
     
     @task(10)
     def get_tasks(self):
@@ -40,24 +54,19 @@ class TodoUser(HttpUser):
     @task(5)
     def add_task(self):
         """Simulate a user adding a new task"""
-        idx = random.randint(0, len(self.task_titles) - 1)
-        task_data = {
-            "title": self.task_titles[idx],
-            "description": self.descriptions[idx],
-            "completed": False,
-            "dueDate": None
-        }
+        index, body = task_payloads.checkout()
         
         # First call the validation function
         with self.client.post(
             "/api/validate-task",
-            json=task_data,
+            data=body,
+            context=task_payloads.context(index),
+            headers=JSON_HEADERS,
             catch_response=True
         ) as response:
             if response.status_code == 200:
-                validated_task = response.json()
-                # Then create the task with the validated data
-                self.client.post("/api/tasks", json=validated_task)
+                # Then create the task with the validated data, forwarded as received
+                self.client.post("/api/tasks", data=response.content, headers=JSON_HEADERS)
             else:
                 response.failure(f"Failed to validate task: {response.text}")
     
@@ -67,15 +76,12 @@ class TodoUser(HttpUser):
         # First get all tasks to find one to toggle
         with self.client.get("/api/tasks", catch_response=True) as response:
             if response.status_code == 200:
-                tasks = response.json()
-                if tasks:
-                    # Pick a random task
-                    task = random.choice(tasks)
-                    task_id = task["id"]
-                    # Toggle the completed status
-                    task["completed"] = not task["completed"]
-                    # Update the task
-                    self.client.put(f"/api/tasks/{task_id}", json=task)
+                # Pick a random task straight from the bytes; the list is never parsed
+                task = random_object(response.content)
+                if task:
+                    task_id = string_field(task, b"id")
+                    # Update the task with its completed status toggled
+                    self.client.put(f"/api/tasks/{task_id}", data=toggle_completed(task), headers=JSON_HEADERS)
     
     @task(1)
     def delete_task(self):
@@ -83,10 +89,7 @@ class TodoUser(HttpUser):
         # First get all tasks to find one to delete
         with self.client.get("/api/tasks", catch_response=True) as response:
             if response.status_code == 200:
-                tasks = response.json()
-                if tasks:
-                    # Pick a random task
-                    task = random.choice(tasks)
-                    task_id = task["id"]
+                task = random_object(response.content)
+                if task:
                     # Delete the task
-                    self.client.delete(f"/api/tasks/{task_id}") 
\ No newline at end of file
+                    self.client.delete(f"/api/tasks/{string_field(task, b'id')}") 
\ No newline at end of file
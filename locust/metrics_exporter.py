@@ -0,0 +1,149 @@
+"""Live OpenMetrics (Prometheus) endpoint on the master, to line generator-side numbers up with GKE/Cloud metrics
+
+Set METRICS_PORT (e.g. 9646) and scrape http://<master>:<port>/metrics. It
+exposes, per request type and name, cumulative request and failure counters
+and a latency histogram with fixed buckets (METRICS_BUCKETS, milliseconds),
+plus active users and the CPU usage of the master and every worker.
+
+Workers bucket their requests as they complete and ship the deltas with their
+regular reports (whether or not METRICS_PORT is set on them, only the master
+needs it); the master adds them to cumulative counters. A scrape only
+formats those counters, so its cost does not grow with the number of requests.
+"""
+import bisect
+import os
+
+import gevent
+from gevent.pywsgi import WSGIServer
+from locust import events
+
+from stats_sync import share_with_master, is_worker
+
+PORT = int(os.environ.get("METRICS_PORT", "0"))
+HOST = os.environ.get("METRICS_HOST", "0.0.0.0")
+BUCKETS_MS = [float(b) for b in os.environ.get(
+    "METRICS_BUCKETS", "5,10,25,50,100,250,500,1000,2500,5000,10000,30000"
+).split(",")]
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class EndpointMetrics:
+    """Per (request type, name): request count, failures, latency sum and per-bucket counts"""
+
+    def __init__(self):
+        self.endpoints = {}
+
+    def _endpoint(self, key):
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            # [requests, failures, sum of ms, non-cumulative counts per bucket (+Inf last)]
+            endpoint = self.endpoints[key] = [0, 0, 0.0, [0] * (len(BUCKETS_MS) + 1)]
+        return endpoint
+
+    def observe(self, request_type, name, response_time, failed):
+        endpoint = self._endpoint((request_type, name))
+        endpoint[0] += 1
+        endpoint[1] += failed
+        endpoint[2] += response_time
+        endpoint[3][bisect.bisect_left(BUCKETS_MS, response_time)] += 1
+
+    def pop_summary(self):
+        summary = [[request_type, name, *values] for (request_type, name), values in self.endpoints.items()]
+        self.endpoints = {}
+        return summary
+
+    def merge_summary(self, summary):
+        for request_type, name, requests, failures, total, counts in summary:
+            endpoint = self._endpoint((request_type, name))
+            endpoint[0] += requests
+            endpoint[1] += failures
+            endpoint[2] += total
+            endpoint[3] = [a + b for a, b in zip(endpoint[3], counts)]
+
+    def render(self):
+        lines = [
+            "# TYPE locust_requests counter",
+            "# HELP locust_requests Requests completed, by request type and name",
+        ]
+        labels = {key: f'method="{_label(key[0])}",name="{_label(key[1])}"' for key in self.endpoints}
+        for key, (requests, _, _, _) in self.endpoints.items():
+            lines.append(f"locust_requests_total{{{labels[key]}}} {requests}")
+        lines += ["# TYPE locust_request_failures counter", "# HELP locust_request_failures Failed requests"]
+        for key, (_, failures, _, _) in self.endpoints.items():
+            lines.append(f"locust_request_failures_total{{{labels[key]}}} {failures}")
+        lines += ["# TYPE locust_request_duration_seconds histogram", "# UNIT locust_request_duration_seconds seconds"]
+        bounds = [f"{b / 1000:g}" for b in BUCKETS_MS] + ["+Inf"]
+        for key, (requests, _, total, counts) in self.endpoints.items():
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f'locust_request_duration_seconds_bucket{{{labels[key]},le="{bound}"}} {cumulative}')
+            lines.append(f"locust_request_duration_seconds_sum{{{labels[key]}}} {total / 1000}")
+            lines.append(f"locust_request_duration_seconds_count{{{labels[key]}}} {requests}")
+        return lines
+
+
+metrics = EndpointMetrics()
+
+
+def runner_lines(runner):
+    """Active users and generator CPU gauges"""
+    lines = [
+        "# TYPE locust_users gauge",
+        "# HELP locust_users Simulated users currently running",
+        f"locust_users {runner.user_count if runner else 0}",
+        "# TYPE locust_cpu_percent gauge",
+        "# HELP locust_cpu_percent CPU usage of each load generator process",
+    ]
+    if runner is not None:
+        role = "master" if getattr(runner, "clients", None) is not None else "local"
+        lines.append(f'locust_cpu_percent{{process="{role}"}} {runner.current_cpu_usage}')
+        for worker_id, worker in (getattr(runner, "clients", None) or {}).items():
+            lines.append(f'locust_cpu_percent{{process="worker",worker="{_label(worker_id)}"}} {worker.cpu_usage}')
+    return lines
+
+
+_installed = False
+
+
+def install_metrics_exporter():
+    """Bucket requests and serve /metrics on METRICS_PORT from the master or standalone process, if set
+
+    The bucketing is installed everywhere, since workers cannot tell whether
+    their master serves the endpoint; only the master's METRICS_PORT matters.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    share_with_master(metrics, "endpoint_metrics")
+
+    @events.request.add_listener
+    def on_request(request_type, name, response_time, exception=None, **kwargs):
+        metrics.observe(request_type, name, response_time, exception is not None)
+
+    @events.init.add_listener
+    def on_init(environment, **kwargs):
+        if not PORT or is_worker(environment):
+            return
+
+        def app(environ, start_response):
+            if environ["PATH_INFO"] != "/metrics":
+                start_response("404 Not Found", [("Content-Type", "text/plain")])
+                return [b"Not found, see /metrics\n"]
+            body = "\n".join([*metrics.render(), *runner_lines(environment.runner), "# EOF"]) + "\n"
+            start_response("200 OK", [("Content-Type", CONTENT_TYPE)])
+            return [body.encode()]
+
+        server = WSGIServer((HOST, PORT), app, log=None)
+        gevent.spawn(server.serve_forever)
+        print(f"Serving OpenMetrics on http://{HOST}:{PORT}/metrics")
+
+        @events.quitting.add_listener
+        def on_quitting(**kwargs):
+            server.stop(timeout=1)
@@ -0,0 +1,164 @@
+import os
+import time
+import uuid
+
+import gevent
+from locust import LoadTestShape, task, events
+from locust.exception import StopUser
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, stats_complete
+from targets import FUNCTIONS_URL
+from clients import ScenarioUser
+from account_pool import load_default_pool
+from token_manager import TokenManager, token_manager
+from payload_pool import JSON_HEADERS, TIMESTAMP, PayloadPool
+from response_checks import auth_result
+from task_list import OK_STATUSES, TaskListFetcher
+from arrival_shapes import ArrivalPacer, EndpointAssigner, parse_rates, profile_from_env
+
+# Open-model load: requests/sec per endpoint, shaped over time by ARRIVAL_PROFILE
+#   ARRIVAL_RATES="validateTask=50,getUserTasks=20,verifyToken=10" ARRIVAL_PROFILE=spike \
+#   locust -f open_model_test.py --headless
+ARRIVAL_RATES = parse_rates(os.environ.get("ARRIVAL_RATES", "validateTask=50,getUserTasks=20,verifyToken=10"))
+# Users sharing the arrivals; needs to exceed peak rate x latency or the schedule slips
+ARRIVAL_USERS = int(os.environ.get("ARRIVAL_USERS", "200"))
+# poisson (exponential gaps) or uniform (fixed gaps)
+POISSON = os.environ.get("ARRIVAL_PROCESS", "poisson") == "poisson"
+
+profile = profile_from_env()
+task_payloads = PayloadPool(lambda rng: {
+    "title": f"{rng.choice(['task', 'Task', 'TASK'])} {rng.randint(1, 1000)}",
+    "description": f"Open-model arrival at {TIMESTAMP}",
+    "completed": rng.choice([True, False]),
+    "dueDate": None
+})
+assigner = EndpointAssigner(ARRIVAL_RATES)
+account_pool = load_default_pool()
+
+class OpenModelStats(ScenarioStats):
+    """Per endpoint: service time from the actual send, and response time from the intended start"""
+    metrics = {
+        "schedule_lag": "Schedule lag (send - intended start)",
+    }
+
+stats = OpenModelStats()
+share_with_master(stats, "open_model_stats")
+
+# Epoch second the arrival schedule of this process started at
+schedule = {"start": None}
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    print(f"Starting open-model test: {ARRIVAL_RATES} req/s, {os.environ.get('ARRIVAL_PROFILE', 'constant')} profile")
+    schedule["start"] = time.time()
+    stats.clear()
+
+@stats_complete.add_listener
+def on_stats_complete(environment, **kwargs):
+    lag_p99 = stats.schedule_lag.percentile(99)
+    extra = []
+    if lag_p99 > 1:
+        extra.append(f"WARNING: p99 schedule lag {lag_p99:.2f}s - the generator fell behind, raise ARRIVAL_USERS")
+    stats.print_report("Open-Model Test Results", extra)
+
+class ArrivalRateShape(LoadTestShape):
+    """Keeps a fixed pool of ARRIVAL_USERS for the profile's duration; the pacers set the request rate"""
+
+    def tick(self):
+        if self.get_run_time() >= profile.duration:
+            return None
+        return ARRIVAL_USERS, ARRIVAL_USERS
+
+class OpenModelUser(ScenarioUser):
+    """Issues its endpoint's requests at intended arrival times instead of after a think time"""
+    host = FUNCTIONS_URL
+
+    def wait_time(self):
+        # Pacing happens in next_arrival()
+        return 0
+
+    def on_start(self):
+        self.endpoint = assigner.assign()
+        self.task_list = TaskListFetcher()
+        # This user's slice of the endpoint's rate
+        per_user = ARRIVAL_RATES[self.endpoint] / (ARRIVAL_USERS * assigner.shares[self.endpoint])
+        self.pacer = ArrivalPacer(
+            lambda t: per_user * profile.multiplier(t),
+            schedule["start"] or time.time(),
+            end=profile.duration,
+            poisson=POISSON,
+        )
+        if account_pool:
+            account = account_pool.checkout()
+            self.email, self.password = account.email, account.password
+            self.tokens = token_manager(self.email)
+            if not self.tokens.token:
+                self.tokens.update(account.token, account.user_id)
+        else:
+            self.email, self.password = f"open.model.{uuid.uuid4().hex[:12]}@example.com", "TestPassword123!"
+            # Nobody else uses this account, so keep it out of the shared registry
+            self.tokens = TokenManager(self.email)
+
+    def authenticate(self):
+        """Log in (signing up first-time accounts): (token, user_id) or None"""
+        credentials = {"name": "Open Model", "email": self.email, "password": self.password}
+        for endpoint in ("login", "signup"):
+            with self.client.post(f"/{endpoint}", json=credentials, catch_response=True, name=f"/{endpoint} (setup)") as response:
+                if response.status_code in (200, 201):
+                    try:
+                        return auth_result(response)
+                    except ValueError:
+                        response.failure(f"Invalid JSON response from {endpoint}")
+                        return None
+                elif response.status_code in (401, 409):
+                    # A missing account is expected on first login
+                    response.success()
+                else:
+                    response.failure(f"{endpoint} failed: {response.status_code}")
+                    return None
+        return None
+
+    @task
+    def next_arrival(self):
+        intended = self.pacer.next_intended(profile.next_change)
+        if intended is None:
+            raise StopUser()
+        delay = intended - time.time()
+        if delay > 0:
+            gevent.sleep(delay)
+
+        sent = time.time()
+        getattr(self, f"request_{self.endpoint}")()
+        done = time.time()
+        stats.schedule_lag.record(sent - intended)
+        stats.histogram(f"{self.endpoint} service time").record(done - sent)
+        stats.histogram(f"{self.endpoint} response time (from intended start)").record(done - intended)
+
+    def request_validateTask(self):
+        index, body = task_payloads.checkout()
+        with self.client.post("/validateTask", data=body, headers=JSON_HEADERS, context=task_payloads.context(index), catch_response=True) as response:
+            if response.status_code != 200:
+                response.failure(f"validateTask failed: {response.status_code}")
+
+    def request_getUserTasks(self):
+        token = self.tokens.get_token(self.authenticate)
+        if token:
+            with self.task_list.get(self.client, "/getUserTasks", token) as response:
+                self._check_authorized(response, token, "/getUserTasks")
+
+    def request_verifyToken(self):
+        token = self.tokens.get_token(self.authenticate)
+        if token:
+            with self.client.get("/verifyToken", headers={"Authorization": f"Bearer {token}"}, catch_response=True) as response:
+                self._check_authorized(response, token, "/verifyToken")
+
+    def _check_authorized(self, response, token, path):
+        if response.status_code == 401:
+            self.tokens.invalidate(token)
+            response.failure("Token rejected")
+        elif response.status_code not in OK_STATUSES:
+            response.failure(f"{path} failed: {response.status_code}")
+
+_unknown = [name for name in ARRIVAL_RATES if not hasattr(OpenModelUser, f"request_{name}")]
+if _unknown:
+    raise ValueError(f"No open-model request for endpoint(s): {', '.join(_unknown)}")
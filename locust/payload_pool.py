@@ -0,0 +1,74 @@
+"""Pre-encoded request bodies for the scenarios' task payloads
+
+Building a task dict and re-serialising it with ``json=`` on every request
+costs more generator CPU than sending it. A PayloadPool encodes a large set
+of bodies once, at import, in the distribution the scenario asks for; users
+then cycle through the same bytes objects and send them with ``data=`` and
+JSON_HEADERS. A body containing the TIMESTAMP placeholder is stored split
+around it, and only the send time is patched in per request.
+
+Bodies are addressable by index and generated from a fixed seed
+(PAYLOAD_SEED), so the same pool can be rebuilt to replay a recorded run.
+"""
+import json
+import os
+import random
+import time
+
+# Bodies per pool
+POOL_SIZE = int(os.environ.get("PAYLOAD_POOL_SIZE", "4096"))
+POOL_SEED = int(os.environ.get("PAYLOAD_SEED", "1"))
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Stand-in for the send time inside a generated string field
+TIMESTAMP = "\x00timestamp\x00"
+_ENCODED_TIMESTAMP = json.dumps(TIMESTAMP)[1:-1].encode()
+
+
+class PayloadPool:
+    """Fixed set of encoded bodies; ``make_body(rng)`` returns one JSON-serialisable body"""
+
+    def __init__(self, make_body, size=POOL_SIZE, seed=POOL_SEED):
+        rng = random.Random(seed)
+        # (head, tail) around the timestamp, or (body, None) for bodies without one
+        self._parts = []
+        for _ in range(size):
+            encoded = json.dumps(make_body(rng), separators=(",", ":")).encode()
+            head, found, tail = encoded.partition(_ENCODED_TIMESTAMP)
+            self._parts.append((head, tail) if found else (encoded, None))
+        # Users of one process share a cursor; start it anywhere so workers differ
+        self._next = random.randrange(size)
+
+    def __len__(self):
+        return len(self._parts)
+
+    def body(self, index, timestamp=None):
+        """Body ``index`` with ``timestamp`` (default: now) patched in"""
+        head, tail = self._parts[index]
+        if tail is None:
+            return head
+        return b"%s%.6f%s" % (head, timestamp or time.time(), tail)
+
+    def checkout(self):
+        """(index, body) of the next payload"""
+        index = self._next % len(self._parts)
+        self._next = index + 1
+        return index, self.body(index)
+
+    def context(self, index):
+        """Request context naming payload ``index``, so listeners (the trace recorder) can refer to it"""
+        return {"payload": (self, index)}
+
+    def template(self, index):
+        """Body ``index`` with the timestamp placeholder still in place"""
+        head, tail = self._parts[index]
+        return head if tail is None else head + _ENCODED_TIMESTAMP + tail
+
+
+def fill_template(template, timestamp=None):
+    """Body of a ``template()``, with ``timestamp`` (default: now) patched in"""
+    head, found, tail = template.partition(_ENCODED_TIMESTAMP)
+    if not found:
+        return template
+    return b"%s%.6f%s" % (head, timestamp or time.time(), tail)
@@ -0,0 +1,182 @@
+"""Per-phase latency of each request: DNS, TCP connect, TLS, send, time to first byte, body
+
+Set PHASE_TIMING=1 (python-requests client only) to mount PhaseTimingAdapter
+on every scenario user. Its connections time each phase of the request they
+carry; the phases land in per-endpoint histograms ("<name> TTFB", ...) that
+are merged across workers like the scenarios' own stats. DNS, connect and TLS
+are only paid by requests that open a new connection, so the share of
+requests with a "connect" sample is the connection reuse rate.
+"""
+import os
+import socket
+import threading
+import time
+
+from locust import events
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, stats_complete
+
+ENABLED = os.environ.get("PHASE_TIMING", "0") == "1"
+
+PHASES = ("DNS", "connect", "TLS", "send", "TTFB", "body")
+
+# Timing record of the request the current greenlet is sending
+_current = threading.local()
+
+
+def _record():
+    return getattr(_current, "record", None)
+
+
+def _setup_time(record):
+    return record.get("DNS", 0) + record.get("connect", 0) + record.get("TLS", 0)
+
+
+class _TimedConnection:
+    """Mixin timing DNS and connect of new connections and send/TTFB of every request"""
+
+    def _new_conn(self):
+        record = _record()
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            address = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except socket.gaierror:
+            # Let urllib3 raise its own error for the unresolvable host
+            address = host
+        resolved = time.perf_counter()
+        # Connect to the resolved address so the resolution is not repeated (and timed) again
+        self._dns_host = address
+        try:
+            conn = super()._new_conn()
+        finally:
+            self._dns_host = host
+        if record is not None:
+            record["DNS"] = resolved - start
+            record["connect"] = time.perf_counter() - resolved
+        return conn
+
+    def request(self, *args, **kwargs):
+        record = _record()
+        if record is None:
+            return super().request(*args, **kwargs)
+        setup_before = _setup_time(record)
+        start = time.perf_counter()
+        super().request(*args, **kwargs)
+        sent = time.perf_counter()
+        # http.client may open the connection lazily inside request(); that is not send time
+        record["send"] = max(0.0, sent - start - (_setup_time(record) - setup_before))
+        record["sent_at"] = sent
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        record = _record()
+        if record is not None and "sent_at" in record:
+            record["TTFB"] = time.perf_counter() - record.pop("sent_at")
+        return response
+
+
+class TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    def connect(self):
+        record = _record()
+        start = time.perf_counter()
+        super().connect()
+        if record is not None:
+            record["TLS"] = time.perf_counter() - start - record.get("DNS", 0) - record.get("connect", 0)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PhaseTimingAdapter(HTTPAdapter):
+    """requests adapter whose responses carry ``phase_timings`` (phase -> seconds)"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+    def send(self, request, stream=False, **kwargs):
+        record = _current.record = {}
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+            if not stream:
+                # Read the body here (requests would right after) to time the download
+                start = time.perf_counter()
+                response.content
+                record["body"] = time.perf_counter() - start
+        finally:
+            _current.record = None
+        record.pop("sent_at", None)
+        response.phase_timings = record
+        return response
+
+
+class PhaseStats(ScenarioStats):
+    """Histograms named "<request name> <phase>" """
+
+    def endpoints(self):
+        return sorted({
+            name[:-len(phase) - 1] for name in self.histograms for phase in PHASES if name.endswith(f" {phase}")
+        })
+
+    def reuse_lines(self):
+        lines = []
+        for endpoint in self.endpoints():
+            total = self.histograms.get(f"{endpoint} TTFB")
+            opened = self.histograms.get(f"{endpoint} connect")
+            total, opened = (total.count if total else 0), (opened.count if opened else 0)
+            if total:
+                lines.append(
+                    f"{endpoint}: {opened} of {total} requests opened a new connection "
+                    f"({100 * (total - opened) / total:.1f}% reused)"
+                )
+        return lines
+
+
+stats = PhaseStats()
+
+
+def mount_phase_timing(session):
+    adapter = PhaseTimingAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+_installed = False
+
+
+def install_phase_timing():
+    """Collect and report phase timings if PHASE_TIMING=1 (safe to call from several locustfiles)"""
+    global _installed
+    if not ENABLED or _installed:
+        return
+    _installed = True
+    share_with_master(stats, "phase_stats")
+
+    @events.request.add_listener
+    def on_request(name, response=None, **kwargs):
+        timings = getattr(response, "phase_timings", None)
+        if timings:
+            for phase, seconds in timings.items():
+                stats.histogram(f"{name} {phase}").record(seconds)
+
+    @events.test_start.add_listener
+    def on_test_start(environment, **kwargs):
+        stats.clear()
+
+    @stats_complete.add_listener
+    def on_stats_complete(environment, **kwargs):
+        stats.print_report("Request Phases", stats.reuse_lines())
@@ -0,0 +1,81 @@
+"""Bulk-create test accounts before a run and store them for account_pool.py
+
+    python3 provision_accounts.py --count 5000 --output accounts.tsv
+    ACCOUNT_POOL=accounts.tsv locust -f ../auth_load_test.py ...
+
+Each account costs one signup (or a login if it already exists), so the
+auth service's password hashing is paid here rather than during ramp-up.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from account_pool import Account, write_accounts
+from targets import FUNCTIONS_URL
+
+FIRST_NAMES = ["Alex", "Jamie", "Taylor", "Jordan", "Casey", "Riley", "Morgan", "Avery", "Peyton", "Quinn", "Blake", "Dakota"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Wilson", "Anderson", "Taylor", "Thomas", "Garcia"]
+PASSWORD = "TestPassword123!"
+
+_sessions = threading.local()
+
+
+def session():
+    if not hasattr(_sessions, "session"):
+        _sessions.session = requests.Session()
+    return _sessions.session
+
+
+def provision(base_url, email, name, password=PASSWORD, retries=3):
+    """Sign up ``email`` (logging in if it exists) and return its Account, or None"""
+    for attempt in range(retries):
+        try:
+            response = session().post(
+                f"{base_url}/signup", json={"name": name, "email": email, "password": password}, timeout=30
+            )
+            if response.status_code == 409:
+                response = session().post(
+                    f"{base_url}/login", json={"email": email, "password": password}, timeout=30
+                )
+            if response.status_code in (200, 201):
+                data = response.json()
+                return Account(email, password, name, str(data["user"]["id"]), data["token"])
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(2 ** attempt)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-create load test accounts")
+    parser.add_argument("--count", type=int, required=True, help="Number of accounts to create")
+    parser.add_argument("--output", default="accounts.tsv")
+    parser.add_argument("--host", default=FUNCTIONS_URL, help="Base URL of the auth functions")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--prefix", default=f"loadtest.{uuid.uuid4().hex[:8]}", help="Email local-part prefix")
+    args = parser.parse_args()
+
+    def create(i):
+        name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
+        return provision(args.host, f"{args.prefix}.{i}@example.com", name)
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(create, range(args.count)))
+    accounts = [account for account in results if account]
+
+    write_accounts(args.output, accounts)
+    elapsed = time.time() - started
+    print(f"Provisioned {len(accounts)}/{args.count} accounts in {elapsed:.1f}s -> {args.output}")
+    if len(accounts) < args.count:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import glob
+import os
+import time
+from urllib.parse import urlsplit
+
+import gevent
+from gevent.event import AsyncResult
+from locust import LoadTestShape, task, events
+from locust.exception import StopUser
+from latency_histogram import ScenarioStats
+from stats_sync import share_with_master, is_worker, stats_complete
+from targets import FUNCTIONS_URL
+from clients import ScenarioUser
+from account_pool import load_default_pool
+from token_manager import token_manager
+from payload_pool import JSON_HEADERS, fill_template
+from request_trace import read_traces
+from response_checks import auth_result
+
+# Replays a trace recorded with RECORD_TRACE=run.trace (see request_trace.py), open-loop:
+#   REPLAY_TRACE="run*.trace" REPLAY_SPEED=5 locust -f replay_test.py --headless
+# Requests keep their recorded spacing divided by REPLAY_SPEED, whatever the responses take.
+TRACE_FILES = sorted(path for pattern in os.environ.get("REPLAY_TRACE", "run.trace").split(",") for path in glob.glob(pattern))
+SPEED = float(os.environ.get("REPLAY_SPEED", "1"))
+# Users issuing the trace (across all workers); needs to exceed the peak request rate x latency
+REPLAY_USERS = int(os.environ.get("REPLAY_USERS", "200"))
+# Distributed runs: recorded users are split over REPLAY_WORKERS workers by user id
+REPLAY_WORKERS = int(os.environ.get("REPLAY_WORKERS", "1"))
+# Send the trace to another origin than it was recorded against, e.g. http://127.0.0.1:8090
+REPLAY_HOST = os.environ.get("REPLAY_HOST")
+# Seconds the test keeps running after the last request is due
+REPLAY_TAIL = float(os.environ.get("REPLAY_TAIL", "10"))
+
+if not TRACE_FILES:
+    raise ValueError(f"No trace files match REPLAY_TRACE={os.environ.get('REPLAY_TRACE', 'run.trace')}")
+
+trace = read_traces(TRACE_FILES)
+if REPLAY_HOST:
+    for request in trace:
+        parts = urlsplit(request["url"])
+        if parts.netloc:
+            request["url"] = REPLAY_HOST.rstrip("/") + request["url"][len(f"{parts.scheme}://{parts.netloc}"):]
+duration = (trace[-1]["offset"] if trace else 0) / SPEED
+
+# Authorized requests use the token a replayed login/signup of the same recorded user returned,
+# or else a provisioned account (ACCOUNT_POOL) standing in for that user.
+# Recorded user -> [(trace index, AsyncResult of the token or None)] of its replayed logins/signups
+account_pool = load_default_pool()
+tokens = {}
+
+def returns_token(request):
+    return request["url"].endswith(("/login", "/signup"))
+
+class ReplayStats(ScenarioStats):
+    """Response time from each request's scheduled start, per request name"""
+    metrics = {
+        "schedule_lag": "Schedule lag (send - scheduled start)",
+    }
+
+stats = ReplayStats()
+share_with_master(stats, "replay_stats")
+
+# This process's share of the trace and where its users are in it
+schedule = {"start": None, "next": 0, "requests": []}
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    worker_index = getattr(environment.runner, "worker_index", None)
+    if worker_index is None:
+        worker_index = int(os.environ.get("REPLAY_WORKER_INDEX", "0"))
+    schedule["requests"] = [r for r in trace if r["user"] % REPLAY_WORKERS == worker_index % REPLAY_WORKERS]
+    schedule["next"] = 0
+    schedule["start"] = time.time()
+    tokens.clear()
+    stats.clear()
+    if not is_worker(environment):
+        print(f"Replaying {len(trace)} requests from {len(TRACE_FILES)} trace file(s) at {SPEED:g}x ({duration:.0f}s)")
+
+@stats_complete.add_listener
+def on_stats_complete(environment, **kwargs):
+    extra = []
+    if stats.schedule_lag.percentile(99) > 1:
+        extra.append("WARNING: the replay fell behind its schedule, raise REPLAY_USERS")
+    stats.print_report("Replay Results", extra)
+
+class ReplayShape(LoadTestShape):
+    """REPLAY_USERS users until the whole trace has been issued"""
+
+    def tick(self):
+        if self.get_run_time() >= duration + REPLAY_TAIL:
+            return None
+        return REPLAY_USERS, REPLAY_USERS
+
+class ReplayUser(ScenarioUser):
+    """Takes the next due request of the trace, waits for its scheduled time and issues it"""
+    host = FUNCTIONS_URL
+
+    def wait_time(self):
+        # Pacing happens in replay_next()
+        return 0
+
+    @task
+    def replay_next(self):
+        index = schedule["next"]
+        if index >= len(schedule["requests"]):
+            raise StopUser()
+        schedule["next"] = index + 1
+        request = schedule["requests"][index]
+        pending = None
+        if returns_token(request):
+            # Claimed in trace order, so the user's later requests find it and wait for its token
+            pending = AsyncResult()
+            tokens.setdefault(request["user"], []).append((index, pending))
+
+        intended = schedule["start"] + request["offset"] / SPEED
+        delay = intended - time.time()
+        if delay > 0:
+            gevent.sleep(delay)
+        stats.schedule_lag.record(time.time() - intended)
+        self.issue(request, index, pending)
+        stats.histogram(f"{request['name']} (from scheduled start)").record(time.time() - intended)
+
+    def issue(self, request, index, pending=None):
+        """Send the ``index``-th request of the schedule; ``pending`` receives the token a login/signup returns"""
+        headers = dict(JSON_HEADERS) if request["body"] else {}
+        if request["authorized"]:
+            token = self.token_for(request["user"], index)
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+        body = fill_template(request["body"]) if request["body"] else None
+        token = None
+        try:
+            with self.client.request(
+                request["method"], request["url"], data=body, headers=headers, name=request["name"], catch_response=True
+            ) as response:
+                recorded, status = request["status"], response.status_code
+                if status // 100 == recorded // 100 or (recorded == 201 and status == 409):
+                    # Same outcome as recorded; a repeated signup finds the account it created last time
+                    response.success()
+                    if status in (200, 201) and pending is not None:
+                        try:
+                            token, _ = auth_result(response)
+                        except ValueError:
+                            pass
+                else:
+                    response.failure(f"Status {status}, recorded {recorded}")
+        finally:
+            if pending is not None:
+                pending.set(token)
+
+    def token_for(self, recorded_user, index):
+        """Token of the user's last login/signup before request ``index`` (waiting for it if in flight), else a pool account's"""
+        token = None
+        # Logins claimed later (up to REPLAY_USERS requests ahead) belong to later requests
+        for claimed, result in reversed(tokens.get(recorded_user, ())):
+            if claimed < index:
+                token = result.get()
+                break
+        if token or not account_pool:
+            return token
+        account = account_pool.accounts[recorded_user % len(account_pool)]
+        manager = token_manager(account.email)
+        if not manager.token:
+            manager.update(account.token, account.user_id)
+        return manager.get_token(lambda: self.login(account))
+
+    def login(self, account):
+        credentials = {"email": account.email, "password": account.password}
+        with self.client.post(f"{FUNCTIONS_URL}/login", json=credentials, catch_response=True, name="/login (replay setup)") as response:
+            if response.status_code != 200:
+                response.failure(f"Login failed: {response.status_code}")
+                return None
+            try:
+                return auth_result(response)
+            except ValueError:
+                response.failure("Invalid JSON response from login")
+                return None
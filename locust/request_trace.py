@@ -0,0 +1,166 @@
+"""Compact binary traces of every request a run issues, for exact replay (replay_test.py)
+
+Set RECORD_TRACE=run.trace to record. Each request is stored with its start
+time, the issuing user, method, URL, request name, whether it carried an
+Authorization header, its response status and a reference to its body.
+Strings and bodies are written once as definition records and referenced by
+id afterwards; bodies from a PayloadPool are stored as their template, so the
+send time is patched in again on replay. Worker processes append their pid to the file name;
+read_traces() merges the files of one run.
+"""
+import os
+import struct
+import time
+
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+TRACE_MAGIC = b"LCTR1\n"
+# String definition: tag, id, byte length (followed by the UTF-8 string)
+STRING_RECORD = struct.Struct("<cII")
+# Body definition: tag, id, byte length (followed by the body)
+BODY_RECORD = struct.Struct("<cII")
+# Request: tag, start (epoch seconds), user, method id, url id, name id, body id (-1: none), flags, status
+REQUEST_RECORD = struct.Struct("<cdIIIIiBH")
+AUTHORIZED = 1
+
+
+class TraceWriter:
+    def __init__(self, path):
+        self.file = open(path, "wb", buffering=1 << 20)
+        self.file.write(TRACE_MAGIC)
+        self.strings = {}
+        self.pool_bodies = {}
+        self.body_count = 0
+
+    def _string(self, value):
+        string_id = self.strings.get(value)
+        if string_id is None:
+            string_id = self.strings[value] = len(self.strings)
+            encoded = value.encode()
+            self.file.write(STRING_RECORD.pack(b"S", string_id, len(encoded)) + encoded)
+        return string_id
+
+    def _body(self, body):
+        body_id = self.body_count
+        self.body_count += 1
+        self.file.write(BODY_RECORD.pack(b"B", body_id, len(body)) + body)
+        return body_id
+
+    def write(self, start, user, method, url, name, status, payload=None, body=None, authorized=False):
+        """``payload`` is a (PayloadPool, index) reference; ``body`` the raw bytes of any other body"""
+        if payload is not None:
+            pool, index = payload
+            body_id = self.pool_bodies.get((id(pool), index))
+            if body_id is None:
+                body_id = self.pool_bodies[(id(pool), index)] = self._body(pool.template(index))
+        elif body:
+            body_id = self._body(body if isinstance(body, bytes) else str(body).encode())
+        else:
+            body_id = -1
+        self.file.write(REQUEST_RECORD.pack(
+            b"R", start, user, self._string(method), self._string(url), self._string(name), body_id,
+            AUTHORIZED if authorized else 0, status,
+        ))
+
+    def close(self):
+        self.file.close()
+
+
+def _read_trace(path):
+    """Yield (start, user, method, url, name, body template or None, authorized, status) of one trace file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(TRACE_MAGIC):
+        raise ValueError(f"{path} is not a request trace")
+    strings, bodies = {}, {}
+    offset = len(TRACE_MAGIC)
+    while offset < len(data):
+        tag = data[offset:offset + 1]
+        if tag in (b"S", b"B"):
+            _, item_id, length = STRING_RECORD.unpack_from(data, offset)
+            offset += STRING_RECORD.size
+            value = data[offset:offset + length]
+            offset += length
+            if tag == b"S":
+                strings[item_id] = value.decode()
+            else:
+                bodies[item_id] = value
+        elif tag == b"R":
+            _, start, user, method, url, name, body_id, flags, status = REQUEST_RECORD.unpack_from(data, offset)
+            offset += REQUEST_RECORD.size
+            yield (
+                start, user, strings[method], strings[url], strings[name],
+                bodies[body_id] if body_id >= 0 else None, bool(flags & AUTHORIZED), status,
+            )
+        else:
+            raise ValueError(f"Corrupt trace {path} at byte {offset}")
+
+
+def read_traces(paths):
+    """Requests of one run's trace files as dicts sorted by ``offset`` (seconds since the first request)
+
+    Users are renumbered 0..n-1 across files, as each process counts its own.
+    """
+    requests, users = [], {}
+    for file_index, path in enumerate(paths):
+        for start, user, method, url, name, body, authorized, status in _read_trace(path):
+            user_id = users.setdefault((file_index, user), len(users))
+            requests.append({
+                "start": start, "user": user_id, "method": method, "url": url, "name": name,
+                "body": body, "authorized": authorized, "status": status,
+            })
+    requests.sort(key=lambda r: r["start"])
+    first = requests[0]["start"] if requests else 0
+    for request in requests:
+        request["offset"] = request.pop("start") - first
+    return requests
+
+
+_installed = False
+
+
+def install_trace_recorder():
+    """Record every request of this process to RECORD_TRACE, if set (safe to call from several locustfiles)"""
+    global _installed
+    path = os.environ.get("RECORD_TRACE")
+    if not path or _installed:
+        return
+    _installed = True
+    recorder = {}
+
+    @events.init.add_listener
+    def on_init(environment, **kwargs):
+        if isinstance(environment.runner, MasterRunner):
+            # The workers issue (and record) the requests
+            return
+        target = path
+        if isinstance(environment.runner, WorkerRunner):
+            root, ext = os.path.splitext(path)
+            target = f"{root}.{os.getpid()}{ext}"
+        recorder["writer"] = TraceWriter(target)
+
+    @events.request.add_listener
+    def on_request(request_type, name, response_time, response=None, context=None, url=None, start_time=None, **kwargs):
+        writer = recorder.get("writer")
+        if writer is None:
+            return
+        context = context or {}
+        request = getattr(response, "request", None)
+        headers = getattr(request, "headers", None) or {}
+        writer.write(
+            start_time or time.time() - response_time / 1000,
+            context.get("user_id", 0),
+            request_type,
+            url or getattr(request, "url", None) or name,
+            name,
+            getattr(response, "status_code", 0) or 0,
+            payload=context.get("payload"),
+            body=None if "payload" in context else getattr(request, "body", None),
+            authorized="Authorization" in headers,
+        )
+
+    @events.quitting.add_listener
+    def on_quitting(environment, **kwargs):
+        if "writer" in recorder:
+            recorder.pop("writer").close()
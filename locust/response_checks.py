@@ -0,0 +1,108 @@
+"""Response verification that does not grow with the response size
+
+Every response gets byte-level checks (length, a prefix match); the full JSON
+parse and field checks run only on a sample (RESPONSE_VERIFY_SAMPLE, default
+1%) or when a value like the auth token cannot be read from the bytes
+directly. The helpers rely on the key order our backends emit: validated
+tasks start with ``"title"``, task list entries are flat objects with an
+``"id"``.
+"""
+import json
+import os
+import random
+
+VERIFY_SAMPLE = float(os.environ.get("RESPONSE_VERIFY_SAMPLE", "0.01"))
+
+# Start of a validateTask response body
+TASK_PREFIX = b'{"title":"'
+
+
+def sampled():
+    return random.random() < VERIFY_SAMPLE
+
+
+def check_body(response, prefix=None, min_length=1):
+    """Failure message if the body fails the byte-level checks, else None"""
+    content = response.content
+    if len(content) < min_length:
+        return "Empty response body"
+    # Content-Length counts encoded bytes; only comparable for identity-encoded bodies
+    declared = response.headers.get("Content-Length")
+    if declared and declared.isdigit() and not response.headers.get("Content-Encoding") and int(declared) != len(content):
+        return f"Truncated response body: {len(content)} of {declared} bytes"
+    if prefix is not None and not content.startswith(prefix):
+        return f"Unexpected response body: {content[:40]!r}"
+    return None
+
+
+def string_field(content, key, start=0):
+    """Value of the first ``"key":"..."`` at or after ``start``, read from the bytes (None if absent)"""
+    marker = b'"%s":"' % key
+    pos = content.find(marker, start)
+    if pos < 0:
+        return None
+    pos += len(marker)
+    end = content.find(b'"', pos)
+    return content[pos:end].decode() if end >= 0 else None
+
+
+def validated_task_failure(response):
+    """Failure message for a 200 validateTask response whose title is not capitalized, else None"""
+    failure = check_body(response, TASK_PREFIX)
+    if failure:
+        return failure
+    content = response.content
+    if not content[len(TASK_PREFIX):len(TASK_PREFIX) + 1].isupper():
+        return f"Task title not properly capitalized: {string_field(content, b'title')!r}"
+    if sampled():
+        try:
+            task = json.loads(content)
+        except ValueError:
+            return "Invalid JSON in validated task"
+        if not task["title"][0].isupper() or "id" not in task or "createdAt" not in task:
+            return f"Validated task is incomplete or not capitalized: {task}"
+    return None
+
+
+def auth_result(response):
+    """(token, user_id) of a signup/login response; ValueError if the body holds no token"""
+    content = response.content
+    token = string_field(content, b"token")
+    user = content.find(b'"user":')
+    user_id = string_field(content, b"id", user) if user >= 0 else None
+    if token is None or sampled():
+        data = json.loads(content)
+        parsed = data.get("token"), data.get("user", {}).get("id")
+        if parsed[0] is None:
+            raise ValueError("No token in response")
+        if token is not None and parsed != (token, user_id):
+            raise ValueError("Token or user id read from the bytes does not match the parsed body")
+        token, user_id = parsed
+    return token, user_id
+
+
+def random_object(content, key=b'"id":"'):
+    """Bytes of a random flat object containing ``key`` in a JSON array, or None
+
+    Jumps to a random offset and takes the next object there, so the cost
+    does not depend on the length of the list.
+    """
+    if len(content) < 2:
+        return None
+    pos = content.find(key, random.randrange(len(content)))
+    if pos < 0:
+        pos = content.find(key)
+        if pos < 0:
+            return None
+    start = content.rfind(b"{", 0, pos)
+    end = content.find(b"}", pos)
+    if start < 0 or end < 0:
+        return None
+    return content[start:end + 1]
+
+
+def toggle_completed(task):
+    """Task object bytes with its completed flag flipped"""
+    if b'"completed":true' in task:
+        return task.replace(b'"completed":true', b'"completed":false', 1)
+    return task.replace(b'"completed":false', b'"completed":true', 1)
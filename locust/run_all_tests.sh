@@ -24,6 +24,9 @@ show_help() {
   echo "  users      - Number of concurrent users (default: 30)"
   echo "  spawn_rate - User spawn rate per second (default: 10)"
   echo
+  echo "Environment:"
+  echo "  LOADTEST_TARGET=local  - Test the local stand-in (npm run standin) instead of GCP"
+  echo
   echo "Examples:"
   echo "  $0 cloud 60 50 10     # Run Cloud Function test for 60s with 50 users"
   echo "  $0 cluster            # Run GKE test with default settings"
@@ -58,18 +61,27 @@ if ! [[ "$SPAWN_RATE" =~ ^[0-9]+$ ]]; then
   exit 1
 fi
 
+# Hosts under test
+if [[ "${LOADTEST_TARGET:-gcp}" == "local" ]]; then
+  FUNCTIONS_HOST=${STANDIN_URL:-http://127.0.0.1:8090}
+  FRONTEND_HOST=$FUNCTIONS_HOST
+else
+  FUNCTIONS_HOST=https://us-central1-todo-cloud-app-20250521.cloudfunctions.net
+  FRONTEND_HOST=http://35.239.33.10
+fi
+
 # Run cloud function test
 run_cloud_test() {
   echo -e "\n${GREEN}======= Running Cloud Function Test =======${NC}"
   echo "Duration: $DURATION seconds, Users: $USERS, Spawn Rate: $SPAWN_RATE users/second"
-  python3 -m locust -f cloud_function_test.py --host=https://us-central1-todo-cloud-app-20250521.cloudfunctions.net --headless --users $USERS --spawn-rate $SPAWN_RATE --run-time ${DURATION}s
+  python3 -m locust -f cloud_function_test.py --host=$FUNCTIONS_HOST --headless --users $USERS --spawn-rate $SPAWN_RATE --run-time ${DURATION}s
 }
 
 # Run cluster test
 run_cluster_test() {
   echo -e "\n${GREEN}======= Running GKE Cluster Test =======${NC}"
   echo "Duration: $DURATION seconds, Users: $USERS, Spawn Rate: $SPAWN_RATE users/second"
-  python3 -m locust -f cluster_test.py --host=http://35.239.33.10 --headless --users $USERS --spawn-rate $SPAWN_RATE --run-time ${DURATION}s
+  python3 -m locust -f cluster_test.py --host=$FRONTEND_HOST --headless --users $USERS --spawn-rate $SPAWN_RATE --run-time ${DURATION}s
 }
 
 # Run combined test
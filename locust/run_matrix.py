@@ -0,0 +1,219 @@
+"""Run a matrix of distributed Locust tests: one master plus one worker per core each
+
+A single Locust process drives one core, so every test here gets a master
+and a worker per core it is given. Tests run one after another on all cores,
+or with --parallel side by side on disjoint core sets (each pinned with
+sched_setaffinity). Every run's CSVs and logs land in one results directory
+with a combined summary:
+
+    python3 run_matrix.py test_matrix.json --parallel
+
+The matrix is JSON; ``defaults`` apply to every entry of ``tests``:
+
+    {
+      "defaults": {"users": 100, "spawn_rate": 10, "run_time": "60s"},
+      "tests": [
+        {"name": "cloud", "locustfile": "cloud_function_test.py", "users": 500, "cores": 8},
+        {"name": "cluster", "locustfile": "cluster_test.py", "env": {"LOADTEST_CLIENT": "fast"}}
+      ]
+    }
+
+``cores`` caps a test's worker count (default: an equal share with
+--parallel, every core otherwise); ``host`` and ``env`` are optional.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from compare_clients import column, read_aggregated_row
+
+DEFAULTS = {"users": 100, "spawn_rate": 10, "run_time": "60s", "host": None, "env": {}, "cores": None}
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def load_matrix(path):
+    with open(path) as f:
+        matrix = json.load(f)
+    defaults = {**DEFAULTS, **matrix.get("defaults", {})}
+    tests = []
+    for i, entry in enumerate(matrix["tests"]):
+        test = {**defaults, **entry}
+        if "locustfile" not in test:
+            raise ValueError(f"Test #{i + 1} of {path} has no locustfile")
+        test.setdefault("name", f"{os.path.splitext(os.path.basename(test['locustfile']))[0]}-{i + 1}")
+        tests.append(test)
+    names = [test["name"] for test in tests]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Test names in {path} must be unique")
+    return tests
+
+
+def pinned(cores):
+    """preexec_fn restricting the child to ``cores`` (no-op where affinity is unsupported)"""
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    return lambda: os.sched_setaffinity(0, cores)
+
+
+class Run:
+    """A master and its workers for one matrix entry, pinned to ``cores``"""
+
+    def __init__(self, test, cores, port, output_dir):
+        self.test = test
+        self.cores = cores
+        self.port = port
+        self.dir = os.path.abspath(os.path.join(output_dir, test["name"]))
+        self.master = None
+        self.workers = []
+        self.logs = []
+        self.started = None
+
+    def _spawn(self, args, log_name, cores):
+        log = open(os.path.join(self.dir, log_name), "w")
+        self.logs.append(log)
+        env = {**os.environ, **{k: str(v) for k, v in self.test["env"].items()}}
+        # Run in the results directory: Locust always reads ./locust.conf, and the one next to
+        # the locustfiles would override every scenario's host
+        return subprocess.Popen(
+            [sys.executable, "-m", "locust", "-f", os.path.abspath(self.test["locustfile"]), *args],
+            stdout=log, stderr=subprocess.STDOUT, env=env, preexec_fn=pinned(cores), cwd=self.dir,
+        )
+
+    def start(self):
+        os.makedirs(self.dir, exist_ok=True)
+        test = self.test
+        master_args = [
+            "--master", "--headless", "--master-bind-port", str(self.port),
+            "--expect-workers", str(len(self.cores)),
+            "--users", str(test["users"]), "--spawn-rate", str(test["spawn_rate"]), "--run-time", str(test["run_time"]),
+            "--csv", os.path.join(self.dir, "results"), "--csv-full-history",
+        ]
+        if test["host"]:
+            master_args += ["--host", test["host"]]
+        # The master only aggregates; it shares the first core with a worker
+        self.master = self._spawn(master_args, "master.log", self.cores[:1])
+        for i, core in enumerate(self.cores):
+            worker_args = ["--worker", "--master-host", "127.0.0.1", "--master-port", str(self.port)]
+            self.workers.append(self._spawn(worker_args, f"worker-{i}.log", [core]))
+        self.started = time.time()
+        print(f"Started {test['name']}: {len(self.cores)} workers on cores {self.cores[0]}-{self.cores[-1]}, port {self.port}")
+
+    def finished(self):
+        return self.master.poll() is not None
+
+    def stop(self, grace=30):
+        """Wait for the workers to follow the master out, then collect the results"""
+        deadline = time.time() + grace
+        for worker in self.workers:
+            try:
+                worker.wait(timeout=max(0.1, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                worker.terminate()
+        for log in self.logs:
+            log.close()
+        return self.summary()
+
+    def summary(self):
+        result = {
+            "name": self.test["name"],
+            "locustfile": self.test["locustfile"],
+            "users": self.test["users"],
+            "workers": len(self.cores),
+            "exit_code": self.master.returncode,
+            "wall_seconds": time.time() - self.started,
+        }
+        try:
+            row = read_aggregated_row(os.path.join(self.dir, "results_stats.csv"))
+        except (OSError, ValueError) as e:
+            result["error"] = str(e)
+            return result
+        result.update({
+            "requests": int(column(row, "Request Count", "# requests")),
+            "failures": int(column(row, "Failure Count", "# failures")),
+            "rps": column(row, "Requests/s"),
+            "p50": column(row, "50%", "Median Response Time"),
+            "p95": column(row, "95%"),
+            "p99": column(row, "99%"),
+        })
+        return result
+
+
+def write_summary(output_dir, results):
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(results, f, indent=2)
+    lines = [
+        "| Test | Workers | Users | Requests | Failures | RPS | p50 (ms) | p95 (ms) | p99 (ms) |",
+        "|------|---------|-------|----------|----------|-----|----------|----------|----------|",
+    ]
+    for r in results:
+        if "error" in r:
+            lines.append(f"| {r['name']} | {r['workers']} | {r['users']} | no results (exit {r['exit_code']}) | | | | | |")
+            continue
+        lines.append(
+            f"| {r['name']} | {r['workers']} | {r['users']} | {r['requests']} | {r['failures']} | {r['rps']:.1f} "
+            f"| {r['p50']:.0f} | {r['p95']:.0f} | {r['p99']:.0f} |"
+        )
+    table = "\n".join(lines)
+    with open(os.path.join(output_dir, "summary.md"), "w") as f:
+        f.write(f"# Test matrix results\n\n{table}\n")
+    print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("matrix", help="Test matrix JSON file")
+    parser.add_argument("--output-dir", default=time.strftime("matrix_results/%Y-%m-%d_%H-%M-%S"))
+    parser.add_argument("--parallel", action="store_true", help="Run tests side by side on disjoint core sets")
+    parser.add_argument("--cores", type=int, help="Cores to use (default: all available)")
+    parser.add_argument("--base-port", type=int, default=5557, help="First master port; each concurrent run gets its own")
+    args = parser.parse_args()
+
+    tests = load_matrix(args.matrix)
+    cores = available_cores()[:args.cores]
+    os.makedirs(args.output_dir, exist_ok=True)
+    share = max(1, len(cores) // len(tests)) if args.parallel else len(cores)
+
+    pending = list(tests)
+    running, results = [], []
+    free = list(cores)
+    next_port = args.base_port
+    try:
+        while pending or running:
+            # Start every pending test that fits on the free cores (only one at a time without --parallel)
+            while pending and (args.parallel or not running):
+                wanted = min(pending[0]["cores"] or share, len(cores))
+                if wanted > len(free):
+                    break
+                test = pending.pop(0)
+                run = Run(test, free[:wanted], next_port, args.output_dir)
+                free = free[wanted:]
+                next_port += 2
+                run.start()
+                running.append(run)
+            time.sleep(1)
+            for run in [r for r in running if r.finished()]:
+                running.remove(run)
+                results.append(run.stop())
+                free = sorted(free + run.cores)
+                print(f"Finished {run.test['name']} (exit {run.master.returncode})")
+    finally:
+        for run in running:
+            run.master.terminate()
+            results.append(run.stop(grace=5))
+
+    order = [test["name"] for test in tests]
+    results.sort(key=lambda r: order.index(r["name"]))
+    write_summary(args.output_dir, results)
+    print(f"Results in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,27 @@
-import random
-import time
 import uuid
-from locust import HttpUser, task, between
+from locust import task, between
+from targets import FUNCTIONS_URL
+from clients import ScenarioUser
+from payload_pool import JSON_HEADERS, TIMESTAMP, PayloadPool
 
-class CloudFunctionUser(HttpUser):
+task_payloads = PayloadPool(lambda rng: {
+    "title": f"task {rng.randint(1, 1000)}",
+    "description": f"Test task created at {TIMESTAMP}",
+    "completed": False,
+    "dueDate": None
+})
+
+class CloudFunctionUser(ScenarioUser):
     """This user tests the Cloud Function directly"""
     wait_time = between(1, 3)
-    # This will be set by --host parameter
+    # Overridden by the --host parameter
+    host = FUNCTIONS_URL
     
     @task
     def validate_task(self):
         """Test our serverless validation function"""
-        # Generate random task data
-        task_data = {
-            "title": f"task {random.randint(1, 1000)}",
-            "description": f"Test task created at {time.time()}",
-            "completed": False,
-            "dueDate": None
-        }
-        
-        # Call the Cloud Function
-        response = self.client.post("/validateTask", json=task_data)
+        index, body = task_payloads.checkout()
         
-        # Log the result
-        if response.status_code == 200:
-            validated_task = response.json()
-            print(f"Task validated: {validated_task['title']}")
-        else:
-            print(f"Error: {response.status_code} - {response.text}") 
\ No newline at end of file
+        # Call the Cloud Function; non-2xx responses are counted as failures by Locust
+        # and every request can be logged with EVENT_SINK=path (see event_sink.py)
+        self.client.post("/validateTask", data=body, headers=JSON_HEADERS, context=task_payloads.context(index))
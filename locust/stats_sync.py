@@ -0,0 +1,116 @@
+"""Aggregate custom scenario stats across Locust worker processes"""
+import gevent
+from locust import events
+from locust.event import EventHook
+from locust.runners import MasterRunner, WorkerRunner
+
+# Custom message a stopping worker sends its last deltas in
+FINAL_REPORT = "stats_sync_final"
+# Seconds the master waits for the stopped workers' final deltas before reporting without them
+FINAL_REPORT_TIMEOUT = 10
+
+# Fired with environment= once a test's custom stats are complete: on test stop in a
+# standalone process, on the master once every worker that ran users has sent its
+# final deltas (or the wait timed out), never on workers. Reports belong here rather
+# than in test_stop, which fires on the master before the workers' last report.
+stats_complete = EventHook()
+
+# key -> stats shared with the master
+_shared = {}
+# Tests started so far, workers that ran users in the current one, those that sent their
+# final deltas, and whether the test has stopped but stats_complete not fired yet
+_run = {"environment": None, "test": 0, "workers": set(), "finished": set(), "pending": False}
+
+
+def share_with_master(stats, key):
+    """Ship ``stats`` from every worker to the master and merge it there
+
+    Workers attach the delta recorded since their previous report to each
+    regular stats report (every few seconds), and send the rest when their test
+    stops, so the master ends up with the cluster-wide totals by the time
+    ``stats_complete`` fires. ``stats`` only needs ``pop_summary()`` and
+    ``merge_summary(summary)``; ``key`` must be unique among the locustfiles
+    loaded in one run.
+    """
+    _shared[key] = stats
+
+    @events.report_to_master.add_listener
+    def on_report_to_master(client_id, data, **kwargs):
+        summary = stats.pop_summary()
+        if summary:
+            data[key] = summary
+
+    @events.worker_report.add_listener
+    def on_worker_report(client_id, data, **kwargs):
+        if key in data:
+            stats.merge_summary(data[key])
+
+
+def is_worker(environment):
+    """True in a --worker process, whose numbers are reported by the master instead"""
+    return isinstance(environment.runner, WorkerRunner)
+
+
+def _complete(force=False):
+    if _run["pending"] and (force or _run["workers"] <= _run["finished"]):
+        _run["pending"] = False
+        stats_complete.fire(environment=_run["environment"])
+
+
+def _timed_out(test):
+    if test == _run["test"]:
+        _complete(force=True)
+
+
+def _on_final_report(environment, msg, **kwargs):
+    for key, summary in msg.data.items():
+        if key in _shared:
+            _shared[key].merge_summary(summary)
+    _run["finished"].add(msg.node_id)
+    _complete()
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    _run["environment"] = environment
+    if isinstance(environment.runner, MasterRunner):
+        environment.runner.register_message(FINAL_REPORT, _on_final_report)
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    _run.update(environment=environment, test=_run["test"] + 1, workers=set(), finished=set(), pending=False)
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data, **kwargs):
+    if data.get("user_count"):
+        _run["workers"].add(client_id)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    runner = environment.runner
+    _run["environment"] = environment
+    if isinstance(runner, WorkerRunner):
+        # Without this the last interval would only reach the master on quit, after its test_stop
+        summaries = {}
+        for key, stats in _shared.items():
+            summary = stats.pop_summary()
+            if summary:
+                summaries[key] = summary
+        runner.send_message(FINAL_REPORT, summaries)
+        return
+    _run["pending"] = True
+    if isinstance(runner, MasterRunner):
+        # On quit the master stops before telling the workers, so their final deltas arrive later
+        _complete()
+        gevent.spawn_later(FINAL_REPORT_TIMEOUT, _timed_out, _run["test"])
+    else:
+        _complete(force=True)
+
+
+@events.quit.add_listener
+def _on_quit(**kwargs):
+    # The process is exiting: report with whatever arrived
+    _complete(force=True)
@@ -0,0 +1,23 @@
+"""Base URLs of the system under test
+
+Set LOADTEST_TARGET=local to point every scenario at the bundled stand-in
+(``npm run standin``, listening on STANDIN_URL) instead of the GCP deployment.
+"""
+import os
+
+GCP_FRONTEND_URL = "http://35.239.33.10"  # GKE deployed frontend
+GCP_FUNCTIONS_URL = "https://us-central1-todo-cloud-app-20250521.cloudfunctions.net"  # Cloud Functions base URL
+STANDIN_URL = os.environ.get("STANDIN_URL", "http://127.0.0.1:8090")
+
+TARGET = os.environ.get("LOADTEST_TARGET", "gcp")
+
+if TARGET == "local":
+    FRONTEND_URL = STANDIN_URL
+    FUNCTIONS_URL = STANDIN_URL
+    API_URL = STANDIN_URL
+elif TARGET == "gcp":
+    FRONTEND_URL = GCP_FRONTEND_URL
+    FUNCTIONS_URL = GCP_FUNCTIONS_URL
+    API_URL = None  # the /api/* mock only exists locally; pass --host
+else:
+    raise ValueError(f"Unknown LOADTEST_TARGET '{TARGET}', expected 'gcp' or 'local'")
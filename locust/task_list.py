@@ -0,0 +1,73 @@
+"""How the scenarios fetch a user's task list from getUserTasks
+
+TASK_LIST_MODE picks one of the endpoint's modes, so runs can be compared on
+bandwidth (Locust's content size column) and latency:
+
+    full         the whole list, as the frontend did before pagination
+    page         pages of TASK_LIST_PAGE_SIZE tasks: the first page, then with
+                 probability TASK_LIST_MORE the next one (scrolling on)
+    fields       the whole list with only TASK_LIST_FIELDS (plus id)
+    conditional  the whole list with If-None-Match, so unchanged lists come
+                 back as an empty 304
+
+Request names get a " [mode]" suffix in every mode but full.
+"""
+import os
+import random
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from response_checks import string_field
+
+MODES = ("full", "page", "fields", "conditional")
+MODE = os.environ.get("TASK_LIST_MODE", "full")
+PAGE_SIZE = int(os.environ.get("TASK_LIST_PAGE_SIZE", "50"))
+MORE = float(os.environ.get("TASK_LIST_MORE", "0.2"))
+FIELDS = os.environ.get("TASK_LIST_FIELDS", "title,completed")
+
+if MODE not in MODES:
+    raise ValueError(f"Unknown TASK_LIST_MODE '{MODE}', expected one of {', '.join(MODES)}")
+
+# Statuses a task list request may succeed with
+OK_STATUSES = (200, 304)
+
+
+class TaskListFetcher:
+    """One user's task-list requests, keeping the ETag or cursor its mode needs"""
+
+    def __init__(self, mode=MODE):
+        self.mode = mode
+        self.etag = None
+        self.cursor = None
+
+    def _params(self):
+        if self.mode == "fields":
+            return {"fields": FIELDS}
+        if self.mode == "page":
+            params = {"limit": PAGE_SIZE}
+            if self.cursor and random.random() < MORE:
+                params["cursor"] = self.cursor
+            return params
+        return None
+
+    @contextmanager
+    def get(self, client, url, token, name=None):
+        """catch_response request for the list; 304 (conditional mode) is a successful status"""
+        headers = {"Authorization": f"Bearer {token}"}
+        if self.mode == "conditional" and self.etag:
+            headers["If-None-Match"] = self.etag
+        name = name or url
+        if self.mode != "full":
+            name = f"{name} [{self.mode}]"
+        params = self._params()
+        # Query string built here, as both clients take it in the URL
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        with client.get(url, headers=headers, name=name, catch_response=True) as response:
+            if response.status_code == 200:
+                if self.mode == "conditional":
+                    self.etag = response.headers.get("ETag")
+                elif self.mode == "page":
+                    # nextCursor leads the page object; null at the end of the list
+                    self.cursor = string_field(response.content[:512], b"nextCursor")
+            yield response
@@ -0,0 +1,108 @@
+"""Per-account auth tokens with proactive renewal and single-flight refresh"""
+import base64
+import json
+import random
+import time
+
+import gevent
+from gevent.event import AsyncResult
+
+# Renew this many seconds before the token's exp claim (tokens live 24h)
+REFRESH_MARGIN = 300
+# Authentication rounds per refresh, with exponential backoff and jitter in between
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+
+def token_expiry(token):
+    """``exp`` claim of a JWT in epoch seconds, or None if it cannot be decoded"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenManager:
+    """Token state of one account, shared by every user logged in as it
+
+    ``get_token`` returns the cached token and renews it once it is within
+    REFRESH_MARGIN of expiring. Concurrent renewals collapse into one in-flight
+    authentication whose result every caller receives. After a 401, callers
+    ``invalidate`` the token they used; that only clears it if it is still
+    current, so a burst of 401s leads to a single refresh.
+    """
+
+    def __init__(self, email):
+        self.email = email
+        self.token = None
+        self.user_id = None
+        self.expires_at = None
+        self._inflight = None
+
+    def update(self, token, user_id=None):
+        self.token = token
+        self.expires_at = token_expiry(token)
+        if user_id:
+            self.user_id = user_id
+
+    def is_fresh(self, now=None):
+        if not self.token:
+            return False
+        if self.expires_at is None:
+            # Opaque tokens are used until the server rejects them
+            return True
+        return (now or time.time()) < self.expires_at - REFRESH_MARGIN
+
+    def invalidate(self, token):
+        if token is not None and token == self.token:
+            self.token = None
+            self.expires_at = None
+
+    def get_token(self, authenticate):
+        """Current token, refreshed with ``authenticate`` if missing or about to expire"""
+        if self.is_fresh():
+            return self.token
+        return self.refresh(authenticate)
+
+    def refresh(self, authenticate):
+        """Obtain a new token, joining the refresh already in flight if there is one
+
+        ``authenticate()`` runs one bounded login/signup round and returns
+        ``(token, user_id)`` or None. Returns the new token, or None once all
+        attempts have failed.
+        """
+        if self._inflight is not None:
+            return self._inflight.get()
+
+        self._inflight = result = AsyncResult()
+        try:
+            for attempt in range(MAX_ATTEMPTS):
+                outcome = authenticate()
+                if outcome:
+                    self.update(*outcome)
+                    break
+                if attempt + 1 < MAX_ATTEMPTS:
+                    gevent.sleep(min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5))
+            result.set(self.token)
+            return self.token
+        finally:
+            if not result.ready():
+                # The refreshing user was stopped or raised; release the waiters
+                result.set(None)
+            self._inflight = None
+
+
+# Never pruned: only for accounts several users share (the provisioned pool), not for
+# one-off signups, whose users keep their own TokenManager
+_managers = {}
+
+
+def token_manager(email):
+    """The process-wide TokenManager for ``email``, a shared (provisioned) account"""
+    manager = _managers.get(email)
+    if manager is None:
+        manager = _managers[email] = TokenManager(email)
+    return manager
@@ -8,34 +8,45 @@ const PORT = process.env.PORT || 8080;
 
 // Middleware
 app.use(cors());
-app.use(bodyParser.json());
+// Batches of MAX_BATCH_SIZE tasks exceed the default 100kb limit
+app.use(bodyParser.json({ limit: '1mb' }));
 
-// Task validation endpoint
-app.post('/api/validate-task', (req, res) => {
-  try {
-    const taskData = req.body;
-    
-    // Basic validation
-    if (!taskData.title || taskData.title.trim() === '') {
-      return res.status(400).json({ error: 'Task title is required' });
+// Most tasks one /api/validate-tasks call accepts
+const MAX_BATCH_SIZE = 500;
+
+// Validate and format one task: { task } or { error }
+function validateTaskData(taskData) {
+  // Basic validation
+  if (!taskData || typeof taskData.title !== 'string' || taskData.title.trim() === '') {
+    return { error: 'Task title is required' };
+  }
+  
+  // Check if due date is valid
+  if (taskData.dueDate) {
+    const dueDate = new Date(taskData.dueDate);
+    if (isNaN(dueDate.getTime())) {
+      return { error: 'Invalid due date format' };
     }
-    
-    // Format and validate the task
-    const validatedTask = {
+  }
+  
+  return {
+    task: {
       id: `task_${uuidv4()}`,
       title: taskData.title.trim(),
       description: taskData.description ? taskData.description.trim() : '',
       completed: taskData.completed || false,
       createdAt: new Date().toISOString(),
       dueDate: taskData.dueDate,
-    };
-    
-    // Check if due date is valid
-    if (taskData.dueDate) {
-      const dueDate = new Date(taskData.dueDate);
-      if (isNaN(dueDate.getTime())) {
-        return res.status(400).json({ error: 'Invalid due date format' });
-      }
+    }
+  };
+}
+
+// Task validation endpoint
+app.post('/api/validate-task', (req, res) => {
+  try {
+    const { task: validatedTask, error } = validateTaskData(req.body);
+    if (error) {
+      return res.status(400).json({ error });
     }
     
     // Simulate some processing delay
@@ -49,6 +60,31 @@ app.post('/api/validate-task', (req, res) => {
   }
 });
 
+// Batch validation endpoint: { tasks: [...] } -> { created, failed, results: [{ index, task } | { index, error }] }
+app.post('/api/validate-tasks', (req, res) => {
+  try {
+    const tasks = req.body && req.body.tasks;
+    if (!Array.isArray(tasks) || tasks.length === 0) {
+      return res.status(400).json({ error: 'tasks must be a non-empty array' });
+    }
+    if (tasks.length > MAX_BATCH_SIZE) {
+      return res.status(413).json({ error: `At most ${MAX_BATCH_SIZE} tasks per batch` });
+    }
+    
+    const results = tasks.map((taskData, index) => ({ index, ...validateTaskData(taskData) }));
+    const created = results.filter(result => result.task).length;
+    
+    // Same processing delay as a single task: it is paid per invocation
+    setTimeout(() => {
+      res.status(200).json({ created, failed: results.length - created, results });
+    }, 300);
+    
+  } catch (error) {
+    console.error('Error validating tasks:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
 // Health check endpoint
 app.get('/health', (req, res) => {
   res.status(200).json({ status: 'OK' });
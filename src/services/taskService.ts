@@ -51,20 +51,72 @@ export const validateTask = async (
   }
 };
 
+// Last task list per token and its ETag, so unchanged lists come back as an empty 304
+const taskListCache = new Map<string, { etag: string; tasks: Task[] }>();
+
 /**
  * Fetches all tasks for the authenticated user
  */
 export const fetchUserTasks = async (authToken: string): Promise<Task[]> => {
   try {
+    const cached = taskListCache.get(authToken);
+    const headers: Record<string, string> = {
+      'Authorization': `Bearer ${authToken}`
+    };
+    if (cached) {
+      headers['If-None-Match'] = cached.etag;
+    }
+
+    const response = await axios.get(GET_TASKS_URL, {
+      headers,
+      validateStatus: (status) => (status >= 200 && status < 300) || status === 304
+    });
+    if (response.status === 304 && cached) {
+      return cached.tasks;
+    }
+
+    const etag = response.headers['etag'];
+    if (etag) {
+      taskListCache.set(authToken, { etag, tasks: response.data });
+    }
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching user tasks:', error);
+    throw error;
+  }
+};
+
+export interface TaskPage {
+  tasks: Partial<Task>[];
+  nextCursor: string | null;
+}
+
+/**
+ * Fetches one page of the user's tasks, newest first; pass the previous
+ * page's nextCursor to continue and `fields` to receive only those fields (plus id)
+ */
+export const fetchUserTasksPage = async (
+  authToken: string,
+  options: { limit?: number; cursor?: string | null; fields?: (keyof Task)[] } = {}
+): Promise<TaskPage> => {
+  try {
+    const params: Record<string, string> = { limit: String(options.limit || 50) };
+    if (options.cursor) {
+      params.cursor = options.cursor;
+    }
+    if (options.fields) {
+      params.fields = options.fields.join(',');
+    }
+
     const response = await axios.get(GET_TASKS_URL, {
+      params,
       headers: {
         'Authorization': `Bearer ${authToken}`
       }
     });
-    
     return response.data;
   } catch (error) {
-    console.error('Error fetching user tasks:', error);
+    console.error('Error fetching user tasks page:', error);
     throw error;
   }
-}; 
\ No newline at end of file
+};